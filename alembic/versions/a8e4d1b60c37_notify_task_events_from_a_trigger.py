@@ -0,0 +1,66 @@
+"""notify task events from a trigger
+
+Revision ID: a8e4d1b60c37
+Revises: e5a93c7d1f24
+Create Date: 2026-10-18 19:41:27.903516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e4d1b60c37'
+down_revision: Union[str, None] = 'e5a93c7d1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Publishing from the database keeps every write a single statement and also covers the users cascade.
+    # Status and priority from before and after the write let subscribers hear about tasks leaving their filter
+    op.execute("""
+        CREATE FUNCTION notify_task_events() RETURNS trigger AS $$
+        DECLARE
+            task_id integer;
+            statuses text[];
+            priorities text[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                task_id := NEW.id;
+                statuses := ARRAY[NEW.status::text];
+                priorities := ARRAY[NEW.priority::text];
+            ELSIF TG_OP = 'UPDATE' THEN
+                task_id := NEW.id;
+                statuses := ARRAY(SELECT DISTINCT unnest(ARRAY[OLD.status::text, NEW.status::text]));
+                priorities := ARRAY(SELECT DISTINCT unnest(ARRAY[OLD.priority::text, NEW.priority::text]));
+            ELSE
+                task_id := OLD.id;
+                statuses := ARRAY[OLD.status::text];
+                priorities := ARRAY[OLD.priority::text];
+            END IF;
+
+            PERFORM pg_notify('task_events', json_build_object(
+                'event', CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END,
+                'id', task_id,
+                'status', statuses,
+                'priority', priorities
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_notify_events
+        AFTER INSERT OR UPDATE OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION notify_task_events()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_notify_events ON tasks")
+    op.execute("DROP FUNCTION notify_task_events()")
@@ -0,0 +1,47 @@
+"""add filter and sort indexes to tasks
+
+Revision ID: d2f8a6c41b97
+Revises: b7d41e9a2c63
+Create Date: 2026-10-18 15:20:44.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a6c41b97'
+down_revision: Union[str, None] = 'b7d41e9a2c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every list query ends its ORDER BY with id, so each index carries it to serve the ordering without a sort
+    op.create_index('ix_tasks_due_date_id', 'tasks', ['due_date', 'id'], unique=False)
+    op.create_index('ix_tasks_start_date_id', 'tasks', ['start_date', 'id'], unique=False)
+    op.create_index('ix_tasks_name_id', 'tasks', ['name', 'id'], unique=False)
+    op.create_index('ix_tasks_priority_id', 'tasks', ['priority', 'id'], unique=False)
+    op.create_index('ix_tasks_status_id', 'tasks', ['status', 'id'], unique=False)
+    op.create_index('ix_tasks_status_due_date_id', 'tasks', ['status', 'due_date', 'id'], unique=False)
+    op.create_index('ix_tasks_priority_due_date_id', 'tasks', ['priority', 'due_date', 'id'], unique=False)
+    # Open tasks by due date is the default board view, completed tasks pile up and stay out of this index
+    op.create_index(
+        'ix_tasks_open_due_date_id', 'tasks', ['due_date', 'id'], unique=False,
+        postgresql_where=sa.text("status <> 'completed'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_open_due_date_id', table_name='tasks', postgresql_where=sa.text("status <> 'completed'"))
+    op.drop_index('ix_tasks_priority_due_date_id', table_name='tasks')
+    op.drop_index('ix_tasks_status_due_date_id', table_name='tasks')
+    op.drop_index('ix_tasks_status_id', table_name='tasks')
+    op.drop_index('ix_tasks_priority_id', table_name='tasks')
+    op.drop_index('ix_tasks_name_id', table_name='tasks')
+    op.drop_index('ix_tasks_start_date_id', table_name='tasks')
+    op.drop_index('ix_tasks_due_date_id', table_name='tasks')
@@ -0,0 +1,32 @@
+"""stamp created_at with clock_timestamp
+
+Revision ID: d8a3f6b2c194
+Revises: b9e2d4f7a613
+Create Date: 2026-10-18 16:58:21.093417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f6b2c194'
+down_revision: Union[str, None] = 'b9e2d4f7a613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is the transaction start, a task inserted late in a long transaction would sort behind sync cursors
+    # already handed out. The settle window still has to cover the gap between the insert and its commit
+    op.alter_column('tasks', 'created_at', server_default=sa.text('clock_timestamp()'))
+    op.alter_column('users', 'created_at', server_default=sa.text('clock_timestamp()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('users', 'created_at', server_default=sa.text('now()'))
+    op.alter_column('tasks', 'created_at', server_default=sa.text('now()'))
@@ -0,0 +1,99 @@
+"""shard task stats counters
+
+Revision ID: e1b7c3d9f462
+Revises: d8a3f6b2c194
+Create Date: 2026-10-18 17:21:40.662105
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7c3d9f462'
+down_revision: Union[str, None] = 'd8a3f6b2c194'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+STATS_SHARDS = 16
+
+
+def apply_changes(changes: str, shard: Optional[str]) -> str:
+    # Groups whose rows cancel out, like an update that leaves status alone, are skipped, and rows are
+    # upserted in key order so concurrent statements lock them in the same order
+    shard_column = ", shard" if shard else ""
+    shard_value = f", {shard}" if shard else ""
+    return f"""
+            INSERT INTO task_stats (dimension, value{shard_column}, count)
+            SELECT dimension, value{shard_value}, sum(delta) FROM ({changes}) AS changes
+            CROSS JOIN LATERAL (VALUES
+                ('status', status::text),
+                ('priority', priority::text),
+                ('assignee', coalesce(assignee_id::text, ''))
+            ) AS stat(dimension, value)
+            GROUP BY dimension, value
+            HAVING sum(delta) <> 0
+            ORDER BY dimension, value
+            ON CONFLICT (dimension, value{shard_column}) DO UPDATE SET count = task_stats.count + EXCLUDED.count;
+
+            INSERT INTO task_open_due_counts (due_date{shard_column}, count)
+            SELECT due_date{shard_value}, sum(delta) FROM ({changes}) AS changes
+            WHERE status <> 'completed'
+            GROUP BY due_date
+            HAVING sum(delta) <> 0
+            ORDER BY due_date
+            ON CONFLICT (due_date{shard_column}) DO UPDATE SET count = task_open_due_counts.count + EXCLUDED.count;
+    """
+
+
+ADDED = "SELECT status, priority, assignee_id, due_date, 1 AS delta FROM new_tasks"
+REMOVED = "SELECT status, priority, assignee_id, due_date, -1 AS delta FROM old_tasks"
+
+
+def stats_function(shard: Optional[str]) -> str:
+    return f"""
+        CREATE OR REPLACE FUNCTION update_task_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {apply_changes(ADDED, shard)}
+            ELSIF TG_OP = 'UPDATE' THEN
+                {apply_changes(f"{REMOVED} UNION ALL {ADDED}", shard)}
+            ELSE
+                {apply_changes(REMOVED, shard)}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # With one row per counter every task write queued on the same status row until commit. Each connection
+    # now adds to its own shard, so concurrent transactions rarely share a counter row and a transaction's
+    # statements never lock rows in two shards. Reads sum the shards
+    for table, key in (('task_stats', ['dimension', 'value']), ('task_open_due_counts', ['due_date'])):
+        op.add_column(table, sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.create_primary_key(f'{table}_pkey', table, [*key, 'shard'])
+    op.execute(stats_function(f"pg_backend_pid() % {STATS_SHARDS}"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, key in (('task_stats', ['dimension', 'value']), ('task_open_due_counts', ['due_date'])):
+        columns = ", ".join(key)
+        op.execute(f"""
+            CREATE TEMPORARY TABLE merged AS
+            SELECT {columns}, sum(count) AS count FROM {table} GROUP BY {columns}
+        """)
+        op.execute(f"DELETE FROM {table}")
+        op.execute(f"INSERT INTO {table} ({columns}, count) SELECT {columns}, count FROM merged")
+        op.execute("DROP TABLE merged")
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.drop_column(table, 'shard')
+        op.create_primary_key(f'{table}_pkey', table, key)
+    op.execute(stats_function(None))
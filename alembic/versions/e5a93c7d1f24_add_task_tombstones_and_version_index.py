@@ -0,0 +1,59 @@
+"""add task tombstones and version index
+
+Revision ID: e5a93c7d1f24
+Revises: d2f8a6c41b97
+Create Date: 2026-10-18 17:02:13.550841
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a93c7d1f24'
+down_revision: Union[str, None] = 'd2f8a6c41b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Delta sync seeks on the same expression the ETags version tasks by
+    op.create_index('ix_tasks_version_id', 'tasks', [sa.text('coalesce(updated_on, created_at)'), 'id'], unique=False)
+
+    op.create_table(
+        'task_tombstones',
+        sa.Column('task_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'), nullable=False),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index('ix_task_tombstones_deleted_at_task_id', 'task_tombstones', ['deleted_at', 'task_id'], unique=False)
+
+    # A statement level trigger also covers bulk deletes and tasks removed by the users cascade, with one insert per statement
+    op.execute("""
+        CREATE FUNCTION record_task_tombstones() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO task_tombstones (task_id)
+            SELECT id FROM deleted_tasks
+            ON CONFLICT (task_id) DO NOTHING;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_record_tombstones
+        AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS deleted_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION record_task_tombstones()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_record_tombstones ON tasks")
+    op.execute("DROP FUNCTION record_task_tombstones()")
+    op.drop_index('ix_task_tombstones_deleted_at_task_id', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_version_id', table_name='tasks')
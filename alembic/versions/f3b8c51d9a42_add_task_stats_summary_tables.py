@@ -0,0 +1,112 @@
+"""add task stats summary tables
+
+Revision ID: f3b8c51d9a42
+Revises: c4f9e2a7b815
+Create Date: 2026-10-18 23:05:51.607214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8c51d9a42'
+down_revision: Union[str, None] = 'c4f9e2a7b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def apply_changes(changes: str) -> str:
+    # Groups whose rows cancel out, like an update that leaves status alone, are skipped, and rows are
+    # upserted in key order so concurrent statements lock them in the same order
+    return f"""
+            INSERT INTO task_stats (dimension, value, count)
+            SELECT dimension, value, sum(delta) FROM ({changes}) AS changes
+            CROSS JOIN LATERAL (VALUES
+                ('status', status::text),
+                ('priority', priority::text),
+                ('assignee', coalesce(assignee_id::text, ''))
+            ) AS stat(dimension, value)
+            GROUP BY dimension, value
+            HAVING sum(delta) <> 0
+            ORDER BY dimension, value
+            ON CONFLICT (dimension, value) DO UPDATE SET count = task_stats.count + EXCLUDED.count;
+
+            INSERT INTO task_open_due_counts (due_date, count)
+            SELECT due_date, sum(delta) FROM ({changes}) AS changes
+            WHERE status <> 'completed'
+            GROUP BY due_date
+            HAVING sum(delta) <> 0
+            ORDER BY due_date
+            ON CONFLICT (due_date) DO UPDATE SET count = task_open_due_counts.count + EXCLUDED.count;
+    """
+
+
+ADDED = "SELECT status, priority, assignee_id, due_date, 1 AS delta FROM new_tasks"
+REMOVED = "SELECT status, priority, assignee_id, due_date, -1 AS delta FROM old_tasks"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_stats',
+        sa.Column('dimension', sa.String(length=16), nullable=False),
+        sa.Column('value', sa.String(length=32), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'value')
+    )
+    op.create_table(
+        'task_open_due_counts',
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('due_date')
+    )
+
+    # Statement level triggers see every row a statement touched at once, so bulk writes and the users
+    # cascade update each counter once. Transition tables need one trigger per event
+    op.execute(f"""
+        CREATE FUNCTION update_task_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {apply_changes(ADDED)}
+            ELSIF TG_OP = 'UPDATE' THEN
+                {apply_changes(f"{REMOVED} UNION ALL {ADDED}")}
+            ELSE
+                {apply_changes(REMOVED)}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_insert
+        AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION update_task_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_update
+        AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION update_task_stats()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_stats_delete
+        AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION update_task_stats()
+    """)
+
+    op.execute(apply_changes(ADDED.replace("new_tasks", "tasks")))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_stats_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_stats_update ON tasks")
+    op.execute("DROP TRIGGER tasks_stats_insert ON tasks")
+    op.execute("DROP FUNCTION update_task_stats()")
+    op.drop_table('task_open_due_counts')
+    op.drop_table('task_stats')
@@ -0,0 +1,43 @@
+"""stamp task updates from a trigger
+
+Revision ID: f5c2a8e1d7b3
+Revises: e1b7c3d9f462
+Create Date: 2026-10-18 18:12:37.408251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c2a8e1d7b3'
+down_revision: Union[str, None] = 'e1b7c3d9f462'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLAlchemy's onupdate only covers UPDATEs it sends. The database's own writes, like ON DELETE SET NULL
+    # unassigning the tasks of a removed user, have to move the version too for ETags and delta sync
+    op.execute("""
+        CREATE FUNCTION touch_task_updated_on() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_on := clock_timestamp();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_touch_updated_on
+        BEFORE UPDATE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION touch_task_updated_on()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_touch_updated_on ON tasks")
+    op.execute("DROP FUNCTION touch_task_updated_on()")
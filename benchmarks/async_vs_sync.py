@@ -0,0 +1,102 @@
+"""Compare requests/sec and latency of the sync and async stacks.
+
+Starts the app under uvicorn once per mode (DB_ASYNC_ENABLED=false/true)
+against the database configured in .env, then drives authenticated task
+reads at a fixed concurrency.
+
+    python -m benchmarks.async_vs_sync --concurrency 500 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.common import fake, percentile, start_server, wait_until_ready, register_and_login
+
+
+def prepare(base_url: str) -> tuple[str, int]:
+    with httpx.Client(base_url=base_url) as client:
+        token = register_and_login(client)
+        task_id = client.post("/task/add", json={
+            "name": "Benchmark task",
+            "description": fake.paragraph(),
+            "dueDate": str(date.today() + timedelta(days=7)),
+        }).json()["taskId"]
+    return token, task_id
+
+
+async def drive(base_url: str, token: str, task_id: int, concurrency: int, total_requests: int) -> dict:
+    latencies, errors = [], 0
+    paths = [f"/task/{task_id}", "/task/list?records_per_page=10"]
+    counter = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, cookies={"access_token": token}, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_mode(async_enabled: bool, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, args.workers, {"DB_ASYNC_ENABLED": "true" if async_enabled else "false"})
+    try:
+        wait_until_ready(base_url)
+        token, task_id = prepare(base_url)
+        return asyncio.run(drive(base_url, token, task_id, args.concurrency, args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "concurrency": args.concurrency,
+        "sync": run_mode(False, args),
+        "async": run_mode(True, args),
+    }
+
+    print(f"{'stack':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode in ("sync", "async"):
+        r = results[mode]
+        print(f"{mode:<8}{r['requests_per_sec']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
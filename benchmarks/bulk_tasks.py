@@ -0,0 +1,95 @@
+"""Compare task import throughput of /task/add against /task/bulk.
+
+Starts the app under uvicorn against the database configured in .env and
+creates, updates and deletes the same number of tasks through the single
+item endpoints and through the bulk endpoints.
+
+    python -m benchmarks.bulk_tasks --tasks 2000 --batch-size 500
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.common import fake, start_server, wait_until_ready, register_and_login
+
+
+def make_tasks(count: int) -> list[dict]:
+    return [
+        {
+            "name": fake.sentence(nb_words=4),
+            "description": fake.paragraph(),
+            "dueDate": str(date.today() + timedelta(days=i % 30)),
+            "priority": ("low", "medium", "high")[i % 3],
+        }
+        for i in range(count)
+    ]
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run_single(client: httpx.Client, tasks: list[dict]) -> dict:
+    task_ids = []
+    create = timed(lambda: task_ids.extend(client.post("/task/add", json=task).json()["taskId"] for task in tasks))
+    update = timed(lambda: [client.put(f"/task/{task_id}", json={"status": "in_progress"}) for task_id in task_ids])
+    remove = timed(lambda: [client.delete(f"/task/{task_id}") for task_id in task_ids])
+    return {"create_s": create, "update_s": update, "delete_s": remove}
+
+
+def run_bulk(client: httpx.Client, tasks: list[dict], batch_size: int) -> dict:
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    task_ids = []
+
+    def create():
+        for batch in batches:
+            task_ids.extend(r["taskId"] for r in client.post("/task/bulk", json=batch).json()["results"])
+
+    def update():
+        for i in range(0, len(task_ids), batch_size):
+            client.put("/task/bulk", json=[{"id": task_id, "status": "in_progress"} for task_id in task_ids[i:i + batch_size]])
+
+    def remove():
+        for i in range(0, len(task_ids), batch_size):
+            client.request("DELETE", "/task/bulk", json={"ids": task_ids[i:i + batch_size]})
+
+    return {"create_s": timed(create), "update_s": timed(update), "delete_s": timed(remove)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port)
+    try:
+        wait_until_ready(base_url)
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            register_and_login(client)
+            tasks = make_tasks(args.tasks)
+            results = {"tasks": args.tasks, "single": run_single(client, tasks), "bulk": run_bulk(client, tasks, args.batch_size)}
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'mode':<8}{'create/s':>12}{'update/s':>12}{'delete/s':>12}")
+    for mode in ("single", "bulk"):
+        r = results[mode]
+        print(f"{mode:<8}" + "".join(f"{args.tasks / r[key]:>12.0f}" for key in ("create_s", "update_s", "delete_s")))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
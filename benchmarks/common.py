@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from faker import Faker
+
+fake = Faker()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def start_server(port: int, workers: int = 1, env: dict | None = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        env={**os.environ, **(env or {})},
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/hello-world").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def register_and_login(client: httpx.Client, password: str = "benchmark123") -> str:
+    email = fake.unique.email()
+    client.post("/user/register", json={
+        "firstName": fake.first_name(),
+        "lastName": fake.last_name(),
+        "email": email,
+        "password": password,
+    })
+    token = client.post("/user/login", json={"email": email, "password": password}).json()["accessToken"]
+    client.cookies.set("access_token", token)
+    return token
@@ -0,0 +1,232 @@
+"""Reproducible load test of the task and user endpoints.
+
+Seeds users and tasks into the database configured in .env, starts the app
+with its lifespan, drives each scenario against it in-process through
+httpx's ASGI transport at the given concurrency levels and records
+requests/sec, p50/p95/p99 latency and database queries per request.
+Seeded rows are removed afterwards.
+
+    python -m benchmarks.load --concurrency 10 50 --requests 2000 --output baseline.json
+    python -m benchmarks.load --concurrency 10 50 --requests 2000 --compare baseline.json
+
+With --compare the run exits with status 1 when any scenario is slower,
+handles fewer requests/sec or issues more queries per request than the
+baseline by more than --threshold.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import delete, event, insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import fake, percentile
+from coe.db.session import get_engine, get_async_engine
+from coe.models.task import Task
+from coe.models.user import User
+from coe.utils.metrics_utils import request_db_stats
+from coe.utils.password_utils import hash_password
+from config import settings
+
+PASSWORD = "benchmark123"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        for bind in (get_engine(), get_async_engine().sync_engine):
+            bind.echo = False
+            event.listen(bind, "before_cursor_execute", self.increment)
+
+    def increment(self, *args):
+        # The lifespan's background syncs query the same engines, only queries made for a request count
+        if request_db_stats.get() is not None:
+            self.count += 1
+
+
+def seed(users: int, tasks: int) -> dict:
+    # The tag keeps emails unique across runs even though the rest of the dataset is seeded
+    tag = f"load{time.time_ns()}"
+    hashed_password = hash_password(PASSWORD)
+    with Session(get_engine()) as db:
+        user_ids = db.scalars(insert(User).returning(User.id), [
+            {"first_name": fake.first_name(), "last_name": fake.last_name(), "email": f"{tag}.{i}@example.com", "password": hashed_password}
+            for i in range(users)
+        ]).all()
+        task_ids = db.scalars(insert(Task).returning(Task.id), [
+            {
+                "name": f"{tag} {fake.sentence(nb_words=4)}",
+                "description": fake.paragraph(),
+                "created_by_id": random.choice(user_ids),
+                "assignee_id": random.choice(user_ids),
+                "due_date": date.today() + timedelta(days=random.randint(0, 60)),
+                "priority": random.choice(("low", "medium", "high")),
+                "status": random.choice(("pending", "in_progress", "completed")),
+            }
+            for _ in range(tasks)
+        ]).all()
+        db.commit()
+    return {"tag": tag, "emails": [f"{tag}.{i}@example.com" for i in range(users)], "user_ids": user_ids, "task_ids": task_ids}
+
+
+def cleanup(dataset: dict):
+    with Session(get_engine()) as db:
+        db.execute(delete(Task).where(Task.created_by_id.in_(dataset["user_ids"])))
+        db.execute(delete(User).where(User.id.in_(dataset["user_ids"])))
+        db.commit()
+
+
+def build_scenarios(dataset: dict) -> dict:
+    task_ids, emails = dataset["task_ids"], dataset["emails"]
+
+    def task_list(client, rng):
+        return client.get("/task/list", params={"records_per_page": 20, "page": rng.randint(1, 5), "sortBy": "dueDate"})
+
+    def task_get(client, rng):
+        return client.get(f"/task/{rng.choice(task_ids)}")
+
+    def user_me(client, rng):
+        return client.get("/user/me")
+
+    def user_login(client, rng):
+        return client.post("/user/login", json={"email": rng.choice(emails), "password": PASSWORD})
+
+    def task_write(client, rng):
+        return client.put(f"/task/{rng.choice(task_ids)}", json={"status": rng.choice(("pending", "in_progress", "completed"))})
+
+    def mixed(client, rng):
+        return rng.choices((task_list, task_get, user_me, task_write), weights=(4, 4, 1, 1))[0](client, rng)
+
+    return {
+        "task_list": task_list,
+        "task_get": task_get,
+        "user_me": user_me,
+        "user_login": user_login,
+        "mixed": mixed,
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str):
+    res = await client.post("/user/login", json={"email": email, "password": PASSWORD})
+    res.raise_for_status()
+    client.cookies.set("access_token", res.cookies.get("access_token"))
+
+
+async def run_scenario(app, request, email: str, concurrency: int, total_requests: int, random_seed: int, counter: QueryCounter) -> dict:
+    latencies, errors = [], 0
+    remaining = iter(range(total_requests))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        # Logging in per scenario keeps runs independent of ACCESS_TOKEN_EXPIRE_MINUTES
+        await login(client, email)
+
+        async def worker(worker_id: int):
+            nonlocal errors
+            rng = random.Random(random_seed * 1000 + worker_id)
+            for _ in remaining:
+                started = time.perf_counter()
+                res = await request(client, rng)
+                latencies.append(time.perf_counter() - started)
+                if res.status_code >= 400:
+                    errors += 1
+
+        queries_before = counter.count
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "rps": total_requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "queries_per_request": (counter.count - queries_before) / total_requests,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for scenario, levels in results.items():
+        for concurrency, current in levels.items():
+            previous = baseline.get(scenario, {}).get(concurrency)
+            if previous is None:
+                continue
+            checks = (
+                ("p95_ms", current["p95_ms"] > previous["p95_ms"] * (1 + threshold)),
+                ("p99_ms", current["p99_ms"] > previous["p99_ms"] * (1 + threshold)),
+                ("rps", current["rps"] < previous["rps"] * (1 - threshold)),
+                ("queries_per_request", current["queries_per_request"] > previous["queries_per_request"] * (1 + threshold)),
+            )
+            for metric, regressed in checks:
+                if regressed:
+                    regressions.append(f"{scenario} @ {concurrency}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+    return regressions
+
+
+async def run(args) -> dict:
+    random.seed(args.seed)
+    fake.seed_instance(args.seed)
+
+    from main import app
+
+    # Every virtual client comes from the same address and logs in far more often than real users do
+    settings.rate_limit_enabled = False
+
+    counter = QueryCounter()
+    dataset = seed(args.users, args.tasks)
+    try:
+        # ASGITransport doesn't send lifespan events, so the warm-up and background tasks are started here
+        # as uvicorn would, and measured requests don't pay for them
+        async with app.router.lifespan_context(app):
+            scenarios = build_scenarios(dataset)
+            selected = args.scenarios or list(scenarios)
+            results = {}
+            for name in selected:
+                results[name] = {}
+                for concurrency in args.concurrency:
+                    result = await run_scenario(app, scenarios[name], dataset["emails"][0], concurrency, args.requests, args.seed, counter)
+                    results[name][str(concurrency)] = result
+                    print(f"{name:<12}{concurrency:>6}{result['rps']:>10.0f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['queries_per_request']:>10.2f}{result['errors']:>8}")
+    finally:
+        cleanup(dataset)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario and concurrency level")
+    parser.add_argument("--scenarios", nargs="+", help="Subset of task_list, task_get, user_me, user_login, mixed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to check this run against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>10}{'errors':>8}")
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")}, "db_async_enabled": settings.db_async_enabled, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
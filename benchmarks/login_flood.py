@@ -0,0 +1,150 @@
+"""Check that /user/login stays responsive for real users during a credential stuffing flood.
+
+Starts the app under uvicorn with RATE_LIMIT_ENABLED=false/true against the
+database configured in .env. Attackers replay wrong passwords for existing
+accounts from a few addresses. Meanwhile legitimate users log in once each
+from their own address. Addresses are simulated with X-Forwarded-For, which
+uvicorn trusts from 127.0.0.1 by default. The server inherits the environment,
+so limits can be lowered for a short run on a small machine.
+
+    python -m benchmarks.login_flood --concurrency 50 --duration 20
+    LOGIN_RATE_LIMIT_PER_IP=5 python -m benchmarks.login_flood --attacker-ips 2
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import fake, percentile, start_server, wait_until_ready
+
+PASSWORD = "benchmark123"
+
+
+def register_users(client: httpx.Client, count: int, addresses) -> list:
+    emails = []
+    for _ in range(count):
+        email = fake.unique.email()
+        client.post("/user/register", headers={"X-Forwarded-For": next(addresses)}, json={
+            "firstName": fake.first_name(),
+            "lastName": fake.last_name(),
+            "email": email,
+            "password": PASSWORD,
+        }).raise_for_status()
+        emails.append(email)
+    return emails
+
+
+async def flood(client: httpx.AsyncClient, victims: list, attacker_ips: int, concurrency: int, stop: asyncio.Event) -> dict:
+    statuses = {}
+    attempts = itertools.count()
+
+    async def worker():
+        while not stop.is_set():
+            i = next(attempts)
+            try:
+                response = await client.post(
+                    "/user/login",
+                    headers={"X-Forwarded-For": f"203.0.113.{i % attacker_ips + 1}"},
+                    json={"email": victims[i % len(victims)], "password": fake.password()},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            except httpx.HTTPError:
+                statuses["error"] = statuses.get("error", 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses
+
+
+async def probe(client: httpx.AsyncClient, users: list, interval: float) -> tuple[list, int]:
+    latencies, succeeded = [], 0
+    for i, email in enumerate(users):
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                "/user/login",
+                headers={"X-Forwarded-For": f"198.51.100.{i % 250 + 1}"},
+                json={"email": email, "password": PASSWORD},
+            )
+            succeeded += response.status_code == 200
+        except httpx.HTTPError:
+            pass
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies, succeeded
+
+
+async def drive(base_url: str, victims: list, users: list, args) -> dict:
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    # Legitimate users get their own connections, as they would from their own machines
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as flood_client, \
+            httpx.AsyncClient(base_url=base_url, timeout=120) as probe_client:
+        started = time.monotonic()
+        flood_task = asyncio.create_task(flood(flood_client, victims, args.attacker_ips, args.concurrency, stop))
+        # Give the flood a head start so probes land on a saturated server
+        await asyncio.sleep(1)
+        latencies, succeeded = await probe(probe_client, users, args.interval)
+        stop.set()
+        statuses = await flood_task
+        elapsed = time.monotonic() - started
+
+    attempts = sum(statuses.values())
+    return {
+        "flood_requests_per_sec": round(attempts / elapsed, 1),
+        "flood_statuses": {str(code): count for code, count in sorted(statuses.items(), key=str)},
+        "probe_success_rate": round(succeeded / len(latencies), 3),
+        "probe_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "probe_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_mode(limited: bool, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, args.workers, {"RATE_LIMIT_ENABLED": "true" if limited else "false"})
+    try:
+        wait_until_ready(base_url)
+        addresses = (f"192.0.2.{i % 250 + 1}" for i in itertools.count())
+        probes = max(1, int(args.duration / args.interval))
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            victims = register_users(client, args.victims, addresses)
+            users = register_users(client, probes, addresses)
+        return asyncio.run(drive(base_url, victims, users, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20, help="Sets the number of legitimate logins, the flood lasts until they are done")
+    parser.add_argument("--attacker-ips", type=int, default=4)
+    parser.add_argument("--victims", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between legitimate logins")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "concurrency": args.concurrency,
+        "unlimited": run_mode(False, args),
+        "limited": run_mode(True, args),
+    }
+
+    print(f"{'limits':<11}{'flood req/s':>12}{'probe ok':>10}{'p50 ms':>10}{'p99 ms':>10}  flood statuses")
+    for mode in ("unlimited", "limited"):
+        r = results[mode]
+        print(f"{mode:<11}{r['flood_requests_per_sec']:>12}{r['probe_success_rate']:>10}{r['probe_p50_ms']:>10}{r['probe_p99_ms']:>10}  {r['flood_statuses']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Compare per-row CPU time and allocations of the task read paths.
+
+"orm" rebuilds the previous path: tasks are loaded as Task objects, validated
+into the response model and then validated and encoded a second time the way
+FastAPI handles a response_model. "rows" is the current path: plain column
+rows validated once and rendered by ModelResponse. "list_full" reads every
+column the way /task/list did before fields=, "list_rows" reads its default
+fields, and "list_sparse" only the fields of a compact list view.
+
+    python -m benchmarks.serialization --rows 100 --iterations 200
+    python -m benchmarks.serialization --description-chars 5000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import Session
+
+from benchmarks.common import fake
+from coe.models.task import Task
+from coe.models.user import User
+from coe.schemas.task import GetTaskListResponseSchema, GetTaskResponseSchema, TaskFilters, TaskSort, task_list_schema
+from coe.services.task_service import apply_task_filters, get_tasks_list, parse_fields, select_task_columns, LIST_FIELDS, TASK_COLUMNS
+from coe.utils.response_utils import ModelResponse
+from config import settings
+
+list_adapter = TypeAdapter(GetTaskListResponseSchema)
+task_adapter = TypeAdapter(GetTaskResponseSchema)
+
+
+def seed(db: Session, rows: int, description_chars: int) -> tuple[User, str]:
+    tag = fake.unique.lexify("bench??????")
+    user = User(first_name="Bench", last_name="Mark", email=fake.unique.email(), password="x")
+    db.add(user)
+    db.flush()
+    db.add_all(
+        Task(name=f"{tag} {i}", description=fake.text(max(description_chars, 5)), created_by_id=user.id, due_date=date.today() + timedelta(days=i % 30))
+        for i in range(rows)
+    )
+    db.commit()
+    return user, tag
+
+
+def render_twice(model, adapter: TypeAdapter) -> bytes:
+    # What FastAPI does with a returned model when the route declares response_model
+    revalidated = adapter.validate_python(model, from_attributes=True)
+    return json.dumps(jsonable_encoder(revalidated, by_alias=True)).encode("utf-8")
+
+
+def list_orm(db: Session, filters: TaskFilters, limit: int) -> bytes:
+    tasks = apply_task_filters(db.query(Task), filters).order_by(Task.id).limit(limit).all()
+    model = GetTaskListResponseSchema.model_validate({"message": "ok", "tasks": tasks, "pagination": {"limit": limit, "count": len(tasks)}})
+    db.expunge_all()
+    return render_twice(model, list_adapter)
+
+
+def list_rows(db: Session, filters: TaskFilters, limit: int, fields=None) -> bytes:
+    columns = select_task_columns(fields, TaskSort()) if fields else TASK_COLUMNS
+    schema = task_list_schema(fields) if fields else GetTaskListResponseSchema
+    tasks, _ = get_tasks_list(db, filters, TaskSort(), limit=limit, count_strategy="none", columns=columns)
+    model = schema.model_validate({"message": "ok", "tasks": tasks, "pagination": {"limit": limit, "count": len(tasks)}})
+    return ModelResponse(model).body
+
+
+def get_orm(db: Session, task_id: int) -> bytes:
+    model = GetTaskResponseSchema.model_validate(db.query(Task).filter(Task.id == task_id).first())
+    db.expunge_all()
+    return render_twice(model, task_adapter)
+
+
+def get_rows(db: Session, task_id: int) -> bytes:
+    return ModelResponse(GetTaskResponseSchema.model_validate(db.query(*TASK_COLUMNS).filter(Task.id == task_id).first())).body
+
+
+def measure(fn, iterations: int, rows_per_call: int) -> dict:
+    body = fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu = time.process_time() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cpu_us_per_row": cpu / (iterations * rows_per_call) * 1e6,
+        "peak_kib_per_call": peak / 1024,
+        "bytes_per_row": len(body) / rows_per_call,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--description-chars", type=int, default=200, help="Length of the seeded task descriptions")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url)
+    with Session(engine) as db:
+        user, tag = seed(db, args.rows, args.description_chars)
+        task_id = db.query(Task.id).filter(Task.created_by_id == user.id).first().id
+        filters = TaskFilters(search=tag)
+        try:
+            results = {
+                "list_orm": measure(lambda: list_orm(db, filters, args.rows), args.iterations, args.rows),
+                "list_full": measure(lambda: list_rows(db, filters, args.rows), args.iterations, args.rows),
+                "list_rows": measure(lambda: list_rows(db, filters, args.rows, LIST_FIELDS), args.iterations, args.rows),
+                "list_sparse": measure(lambda: list_rows(db, filters, args.rows, parse_fields("name,status,dueDate")), args.iterations, args.rows),
+                "get_orm": measure(lambda: get_orm(db, task_id), args.iterations, 1),
+                "get_rows": measure(lambda: get_rows(db, task_id), args.iterations, 1),
+            }
+        finally:
+            db.execute(delete(Task).where(Task.created_by_id == user.id))
+            db.execute(delete(User).where(User.id == user.id))
+            db.commit()
+
+    print(f"{'path':<12}{'cpu us/row':>12}{'peak KiB':>12}{'bytes/row':>12}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['cpu_us_per_row']:>12.1f}{r['peak_kib_per_call']:>12.1f}{r['bytes_per_row']:>12.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure time to first successful request with and without the startup warm-up.
+
+Starts the app under uvicorn repeatedly with STARTUP_WARMUP=false/true against
+the database configured in .env. Each run records how long the process takes
+to answer /hello-world, then the latency of the first /openapi.json, register,
+login and /task/list requests, which is where lazy initialisation used to land.
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.common import fake, start_server
+
+
+def wait_for_first_response(base_url: str, timeout: float) -> float:
+    started = time.perf_counter()
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/hello-world").status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def timed(request) -> float:
+    started = time.perf_counter()
+    response = request()
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def first_requests(base_url: str) -> dict:
+    email, password = fake.unique.email(), "benchmark123"
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        results = {
+            "openapi": timed(lambda: client.get("/openapi.json")),
+            "register": timed(lambda: client.post("/user/register", json={
+                "firstName": fake.first_name(),
+                "lastName": fake.last_name(),
+                "email": email,
+                "password": password,
+            })),
+        }
+        started = time.perf_counter()
+        response = client.post("/user/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        results["login"] = time.perf_counter() - started
+        client.cookies.set("access_token", response.json()["accessToken"])
+        results["task_list"] = timed(lambda: client.get("/task/list?records_per_page=10"))
+    return results
+
+
+def run_once(warmup: bool, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, env={"STARTUP_WARMUP": "true" if warmup else "false"})
+    try:
+        return {"first_response": wait_for_first_response(base_url, args.timeout), **first_requests(base_url)}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_mode(warmup: bool, args) -> dict:
+    runs = [run_once(warmup, args) for _ in range(args.runs)]
+    return {step: round(statistics.median(run[step] for run in runs) * 1000, 2) for step in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {
+        "runs": args.runs,
+        "cold": run_mode(False, args),
+        "warm": run_mode(True, args),
+    }
+
+    steps = list(results["cold"])
+    print(f"{'median ms':<16}{'cold':>10}{'warm':>10}")
+    for step in steps:
+        print(f"{step:<16}{results['cold'][step]:>10}{results['warm'][step]:>10}")
+    for mode in ("cold", "warm"):
+        results[mode]["total"] = round(sum(results[mode][step] for step in steps), 2)
+    print(f"{'total':<16}{results['cold']['total']:>10}{results['warm']['total']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
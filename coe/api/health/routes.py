@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, status, HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from coe.db.session import get_db, created_engines
+from coe.db.pool import pool_stats
+from coe.schemas.health import DBHealthResponseSchema, PoolStatsResponseSchema
+from coe.schemas.task import ErrorResponse
+import time
+
+router = APIRouter(tags=["Health"], prefix="/health")
+
+@router.get(
+    "/db",
+    summary="Check that the database answers",
+    response_model=DBHealthResponseSchema,
+    responses={503: {"model": ErrorResponse}},
+    openapi_extra={"is_public": True}
+)
+def db_health(db: Session = Depends(get_db)):
+    started = time.perf_counter()
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+
+    result = {"status": "ok", "latency_ms": (time.perf_counter() - started) * 1000}
+    return DBHealthResponseSchema.model_validate(result)
+
+@router.get(
+    "/db/pool",
+    summary="Connection pool usage of the engines this worker has opened",
+    response_model=PoolStatsResponseSchema,
+    openapi_extra={"is_public": True}
+)
+def db_pool_stats():
+    result = {"pools": {name: pool_stats(engine) for name, engine in created_engines().items()}}
+    return PoolStatsResponseSchema.model_validate(result)
@@ -1,7 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from coe.utils.metrics_utils import metrics_registry
 
 router = APIRouter(tags=["Generic"])
 
 @router.get("/hello-world", openapi_extra={"is_public": True})
 def hello():
-    return {"message": "Hello World from COE app"}
\ No newline at end of file
+    return {"message": "Hello World from COE app"}
+
+@router.get("/metrics", summary="Prometheus metrics", openapi_extra={"is_public": True})
+def metrics():
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, Request, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from coe.db.session import get_async_db, AsyncSessionLocal
+from coe.models.user import User
+from coe.services.auth_service import get_current_user_async
+from coe.services.async_task_service import create_task, find_task_by_id, get_task_version, get_tasks_version, update_task_details, remove_task, get_tasks_page, get_task_changes, get_task_stats, bulk_create_tasks, bulk_update_tasks, bulk_remove_tasks, stream_tasks
+from coe.services.task_service import SyncCursorExpiredError, resolve_task_filters
+from coe.schemas.task import CreateTaskRequestSchema, UpdateTaskRequestSchema, TaskFilters, TaskSort, BulkCreateTaskRequestSchema, BulkUpdateTaskRequestSchema, BulkDeleteTaskRequestSchema, ExportFormat
+from coe.api.task.routes import CREATE_ROUTE, LIST_ROUTE, STATS_ROUTE, CHANGES_ROUTE, STREAM_ROUTE, EXPORT_ROUTE, BULK_CREATE_ROUTE, BULK_UPDATE_ROUTE, BULK_DELETE_ROUTE, GET_ROUTE, UPDATE_ROUTE, DELETE_ROUTE, EXPORT_FIELDS, TaskListQuery, TaskReadQuery, bad_request, cursor_expired, task_list_etag, task_not_modified, created_response, task_list_response, stats_response, changes_response, stream_response, export_response, bulk_response, task_response, updated_response, removed_response
+from coe.utils.response_utils import has_validators, is_not_modified, not_modified_response
+from coe.utils.export_utils import export_header, serialize_rows
+from config import settings
+from typing import Optional
+
+def get_task_filters(filters: TaskFilters = Depends(), current_user: User = Depends(get_current_user_async)) -> TaskFilters:
+    return resolve_task_filters(filters, current_user.id)
+
+router = APIRouter(tags=["Tasks"], prefix="/task", dependencies=[Depends(get_current_user_async)])
+
+@router.post("/add", **CREATE_ROUTE)
+async def create(task_data: CreateTaskRequestSchema, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    return created_response(await create_task(task_data, db, current_user))
+
+@router.get("/list", **LIST_ROUTE)
+async def get_task_list(request: Request, db: AsyncSession = Depends(get_async_db), query: TaskListQuery = Depends(), filters: TaskFilters = Depends(get_task_filters), sort: TaskSort = Depends()):
+    try:
+        etag = None
+        if query.versioned:
+            etag = task_list_etag(request, filters, await get_tasks_version(db, filters))
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+
+        tasks, pagination = await get_tasks_page(db, filters, sort, page=query.page, limit=query.records_per_page, cursor=query.cursor, count_strategy=query.count_strategy, includes=query.includes, fields=query.fields)
+    except ValueError as e:
+        raise bad_request(e)
+
+    return task_list_response(request, query, tasks, pagination, etag)
+
+@router.get("/stats", **STATS_ROUTE)
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
+    return stats_response(await get_task_stats(db))
+
+@router.get("/changes", **CHANGES_ROUTE)
+async def get_changes(
+    db: AsyncSession = Depends(get_async_db),
+    since: Optional[str] = Query(None, description="nextCursor from the previous sync, omit for a full sync"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes returned")
+):
+    try:
+        return changes_response(await get_task_changes(db, since=since, limit=limit))
+    except SyncCursorExpiredError:
+        raise cursor_expired()
+    except ValueError as e:
+        raise bad_request(e)
+
+@router.get("/stream", **STREAM_ROUTE)
+async def stream_task_changes(filters: TaskFilters = Depends(get_task_filters)):
+    return stream_response(filters)
+
+@router.get("/export", **EXPORT_ROUTE)
+async def export_tasks(
+    db: AsyncSession = Depends(get_async_db),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    filters: TaskFilters = Depends(get_task_filters),
+    sort: TaskSort = Depends()
+):
+    export_db = AsyncSessionLocal(bind=db.bind)
+
+    async def generate():
+        try:
+            yield export_header(EXPORT_FIELDS, export_format)
+            async for rows in stream_tasks(export_db, filters, sort, batch_size=settings.task_export_batch_size):
+                yield serialize_rows(rows, EXPORT_FIELDS, export_format)
+        finally:
+            await export_db.close()
+
+    return export_response(generate(), export_format)
+
+@router.post("/bulk", **BULK_CREATE_ROUTE)
+async def bulk_create(tasks_data: BulkCreateTaskRequestSchema, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user_async)):
+    return bulk_response("create", await bulk_create_tasks(tasks_data, db, current_user))
+
+@router.put("/bulk", **BULK_UPDATE_ROUTE)
+async def bulk_update(tasks_data: BulkUpdateTaskRequestSchema, db: AsyncSession = Depends(get_async_db)):
+    return bulk_response("update", await bulk_update_tasks(tasks_data, db))
+
+@router.delete("/bulk", **BULK_DELETE_ROUTE)
+async def bulk_delete(task_data: BulkDeleteTaskRequestSchema, db: AsyncSession = Depends(get_async_db)):
+    return bulk_response("delete", await bulk_remove_tasks(task_data.ids, db))
+
+@router.get("/{task_id}", **GET_ROUTE)
+async def get_task(request: Request, task_id: int, db: AsyncSession = Depends(get_async_db), query: TaskReadQuery = Depends()):
+    if not query.includes and has_validators(request):
+        not_modified = task_not_modified(request, task_id, query, await get_task_version(task_id, db))
+        if not_modified is not None:
+            return not_modified
+
+    return task_response(request, task_id, query, await find_task_by_id(task_id, db, includes=query.includes))
+
+@router.put("/{task_id}", **UPDATE_ROUTE)
+async def update_task(task_id: int, task_data: UpdateTaskRequestSchema, db: AsyncSession = Depends(get_async_db)):
+    return updated_response(await update_task_details(task_id, task_data, db))
+
+@router.delete("/{task_id}", **DELETE_ROUTE)
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    return removed_response(await remove_task(task_id, db))
@@ -1,105 +1,254 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi import APIRouter, Depends, Request, status, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from coe.db.session import get_db
+from coe.db.session import get_db, SessionLocal
 from coe.models.user import User
 from coe.services.auth_service import get_current_user
-from coe.services.task_service import create_task, find_task_by_id, update_task_details, remove_task, get_tasks_list, get_total_tasks
-from coe.schemas.task import CreateTaskRequestSchema, CreateTaskResponseSchema, GetTaskResponseSchema, ErrorResponse, UpdateTaskRequestSchema, UpdateTaskResponseSchema, DeleteTaskResponseSchema, GetTaskListResponseSchema, TaskFilters, TaskSort
-import math
+from coe.services.task_service import create_task, find_task_by_id, get_task_version, get_tasks_version, update_task_details, remove_task, get_tasks_page, get_task_changes, get_task_stats, bulk_create_tasks, bulk_update_tasks, bulk_remove_tasks, get_total_tasks, stream_tasks, parse_includes, parse_fields, response_fields, TASK_COLUMNS, LIST_FIELDS, VERSIONED_COUNT_STRATEGIES, SyncCursorExpiredError, resolve_task_filters
+from coe.schemas.task import CreateTaskRequestSchema, CreateTaskResponseSchema, GetTaskResponseSchema, ErrorResponse, UpdateTaskRequestSchema, UpdateTaskResponseSchema, DeleteTaskResponseSchema, GetTaskListResponseSchema, TaskChangesResponseSchema, TaskStatsResponseSchema, TaskFilters, task_fields_schema, task_list_schema, TaskSort, CountStrategy, BulkCreateTaskRequestSchema, BulkUpdateTaskRequestSchema, BulkDeleteTaskRequestSchema, BulkTaskResponseSchema, ExportFormat
+from coe.services.task_stream_service import task_event_hub, stream_task_events, STREAM_HEADERS
+from coe.utils.response_utils import ModelResponse, conditional_response, has_validators, is_not_modified, make_etag, not_modified_response
+from coe.utils.export_utils import EXPORT_MEDIA_TYPES, export_header, export_headers, serialize_rows
+from config import settings
+from datetime import datetime
+from typing import Optional, List, Tuple
 
-router = APIRouter(tags=["Tasks"], prefix="/task", dependencies=[Depends(get_current_user)])
+INCLUDE_DESCRIPTION = "Comma separated related users to embed: assignee, createdBy"
+FIELDS_DESCRIPTION = "Comma separated task fields to return, id is always included"
 
-@router.post(
-    "/add",
-    summary="Create a new task",
-    response_model=CreateTaskResponseSchema,
-    status_code=status.HTTP_201_CREATED
-)
-def create(task_data: CreateTaskRequestSchema, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    new_task = create_task(task_data, db, current_user)
-    
-    result = {"message": "Task created successfully", "task_id": new_task.id}
+# The sync and the async routers publish the same API, so the route options, parameters and response
+# building below are shared and each router only supplies its own database and service calls
+CREATE_ROUTE = dict(summary="Create a new task", response_model=CreateTaskResponseSchema, status_code=status.HTTP_201_CREATED)
+LIST_ROUTE = dict(summary="Get all the tasks", response_model=GetTaskListResponseSchema, responses={400: {"model": ErrorResponse}})
+STATS_ROUTE = dict(summary="Get task counts by status, priority and assignee, and the overdue count", response_model=TaskStatsResponseSchema)
+CHANGES_ROUTE = dict(summary="Get the tasks changed and removed since a sync cursor", response_model=TaskChangesResponseSchema, responses={400: {"model": ErrorResponse}, 410: {"model": ErrorResponse}})
+STREAM_ROUTE = dict(summary="Stream task changes as Server-Sent Events", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}, 503: {"model": ErrorResponse}})
+EXPORT_ROUTE = dict(summary="Export the filtered tasks as NDJSON or CSV", response_class=StreamingResponse, responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}})
+BULK_CREATE_ROUTE = dict(summary="Create tasks in bulk", response_model=BulkTaskResponseSchema)
+BULK_UPDATE_ROUTE = dict(summary="Update tasks in bulk", response_model=BulkTaskResponseSchema)
+BULK_DELETE_ROUTE = dict(summary="Remove tasks in bulk", response_model=BulkTaskResponseSchema)
+GET_ROUTE = dict(summary="Fetch a task by ID", response_model=GetTaskResponseSchema, responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}})
+UPDATE_ROUTE = dict(summary="Update a task details", response_model=UpdateTaskResponseSchema, responses={404: {"model": ErrorResponse}})
+DELETE_ROUTE = dict(summary="Remove a task by ID", response_model=DeleteTaskResponseSchema, responses={404: {"model": ErrorResponse}})
+
+class TaskListQuery:
+    def __init__(
+        self,
+        page: int = Query(1, ge=1, description="Page number (starts at 1)"),
+        records_per_page: int = Query(10, le=100, description="Number of items per page"),
+        cursor: Optional[str] = Query(None, description="Opaque nextCursor/prevCursor from a previous response; switches to keyset pagination"),
+        count_strategy: CountStrategy = Query("exact", description="How total is computed: exact count, planner estimate, per-worker cached count, or none to skip it"),
+        include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+        fields: Optional[str] = Query(None, description=f"{FIELDS_DESCRIPTION}, defaults to all but description")
+    ):
+        self.page = page
+        self.records_per_page = records_per_page
+        self.cursor = cursor
+        self.count_strategy = count_strategy
+        try:
+            self.includes = parse_includes(include)
+            self.fields = parse_fields(fields, LIST_FIELDS)
+        except ValueError as e:
+            raise bad_request(e)
+
+    @property
+    def versioned(self) -> bool:
+        return not self.includes and self.count_strategy in VERSIONED_COUNT_STRATEGIES
+
+class TaskReadQuery:
+    def __init__(self, include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION), fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+        try:
+            self.includes = parse_includes(include)
+            self.fields = parse_fields(fields)
+        except ValueError as e:
+            raise bad_request(e)
+
+def bad_request(error: ValueError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=str(error)
+    )
+
+def task_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Task not found"
+    )
+
+def cursor_expired() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Cursor too old, full resync required"
+    )
+
+def get_task_filters(filters: TaskFilters = Depends(), current_user: User = Depends(get_current_user)) -> TaskFilters:
+    return resolve_task_filters(filters, current_user.id)
+
+def task_etag(task_id: int, version, fields=()) -> str:
+    return make_etag("task", task_id, version.isoformat(), *fields)
+
+def task_list_etag(request: Request, filters: TaskFilters, version: Tuple[int, Optional[datetime]]) -> str:
+    # The same query means other tasks to another user when it filters by me
+    return make_etag("tasks", request.url.query, filters.assignee_id, filters.created_by_id, *version)
+
+def task_not_modified(request: Request, task_id: int, query: TaskReadQuery, last_modified: Optional[datetime]):
+    etag = task_etag(task_id, last_modified, query.fields) if last_modified else None
+    if etag and is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return None
+
+def created_response(task) -> CreateTaskResponseSchema:
+    result = {"message": "Task created successfully", "task_id": task.id}
     return CreateTaskResponseSchema.model_validate(result)
 
-@router.get(
-    "/list",
-    summary="Get all the tasks",
-    response_model=GetTaskListResponseSchema,
-)
-def get_task_list(
-    db: Session = Depends(get_db),
-    page: int = Query(1, ge=1, description="Page number (starts at 1)"),
-    records_per_page: int = Query(10, le=100, description="Number of items per page"),
-    filters: TaskFilters = Depends(),
-    sort: TaskSort = Depends()
-):
-    skip = (page - 1) * records_per_page
-    tasks, total_records = get_tasks_list(db, filters, sort, skip=skip, limit=records_per_page)
-    
+def task_list_response(request: Request, query: TaskListQuery, tasks: list, pagination: dict, etag: Optional[str]):
     result = {
         "message": "Task fetched successfully",
         "tasks": tasks,
-        "pagination": {
-            "page": page,
-            "limit": records_per_page,
-            "count": len(tasks),
-            "total": total_records,
-            "total_pages": math.ceil(total_records / records_per_page) if records_per_page else 1
-        }
+        "pagination": pagination
     }
 
-    return GetTaskListResponseSchema.model_validate(result)
+    return conditional_response(request, task_list_schema(response_fields(query.fields, query.includes)).model_validate(result), etag)
 
+def stats_response(stats: dict) -> ModelResponse:
+    result = {"message": "Task stats fetched successfully", **stats}
+    return ModelResponse(TaskStatsResponseSchema.model_validate(result))
 
-@router.get(
-    "/{task_id}", 
-    summary="Fetch a task by ID",
-    response_model=GetTaskResponseSchema,
-    responses={404: {"model": ErrorResponse}}
-)
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    task = find_task_by_id(task_id, db)
-    
-    if not task:
+def changes_response(changes: dict) -> ModelResponse:
+    result = {"message": "Task changes fetched successfully", **changes}
+    return ModelResponse(TaskChangesResponseSchema.model_validate(result))
+
+def stream_response(filters: TaskFilters) -> StreamingResponse:
+    if not task_event_hub.running:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail="Task not found"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Task streaming is disabled"
         )
-    result = task
 
-    return GetTaskResponseSchema.model_validate(result)
+    return StreamingResponse(stream_task_events(filters), media_type="text/event-stream", headers=STREAM_HEADERS)
+
+def export_response(body, export_format: ExportFormat) -> StreamingResponse:
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[export_format], headers=export_headers(export_format))
+
+def bulk_response(action: str, results: List[dict]) -> BulkTaskResponseSchema:
+    result = {"message": f"Bulk {action} processed", "results": results}
+    return BulkTaskResponseSchema.model_validate(result)
+
+def task_response(request: Request, task_id: int, query: TaskReadQuery, task: Optional[dict]):
+    if not task:
+        raise task_not_found()
+
+    etag, last_modified = None, None
+    if not query.includes:
+        last_modified = task["updated_on"] or task["created_at"]
+        etag = task_etag(task_id, last_modified, query.fields)
+
+    # Single reads go through the task cache, which holds whole rows, so fields only narrow the response
+    schema = task_fields_schema(response_fields(query.fields, query.includes)) if query.fields else GetTaskResponseSchema
+    return conditional_response(request, schema.model_validate(task), etag, last_modified)
+
+def updated_response(success: bool) -> UpdateTaskResponseSchema:
+    if not success:
+        raise task_not_found()
+    result = {"message": "Task data updated successfully"}
+    return UpdateTaskResponseSchema.model_validate(result)
+
+def removed_response(success: bool) -> DeleteTaskResponseSchema:
+    if not success:
+        raise task_not_found()
+    result = {"message": "Task removed successfully"}
+    return DeleteTaskResponseSchema.model_validate(result)
+
+EXPORT_FIELDS = [column.key for column in TASK_COLUMNS]
 
-@router.put(
-    "/{task_id}", 
-    summary="Update a task details",
-    response_model=UpdateTaskResponseSchema,
-    responses={404: {"model": ErrorResponse}}
-)
+router = APIRouter(tags=["Tasks"], prefix="/task", dependencies=[Depends(get_current_user)])
+
+@router.post("/add", **CREATE_ROUTE)
+def create(task_data: CreateTaskRequestSchema, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return created_response(create_task(task_data, db, current_user))
+
+@router.get("/list", **LIST_ROUTE)
+def get_task_list(request: Request, db: Session = Depends(get_db), query: TaskListQuery = Depends(), filters: TaskFilters = Depends(get_task_filters), sort: TaskSort = Depends()):
+    try:
+        etag = None
+        if query.versioned:
+            etag = task_list_etag(request, filters, get_tasks_version(db, filters))
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+
+        tasks, pagination = get_tasks_page(db, filters, sort, page=query.page, limit=query.records_per_page, cursor=query.cursor, count_strategy=query.count_strategy, includes=query.includes, fields=query.fields)
+    except ValueError as e:
+        raise bad_request(e)
+
+    return task_list_response(request, query, tasks, pagination, etag)
+
+@router.get("/stats", **STATS_ROUTE)
+def get_stats(db: Session = Depends(get_db)):
+    return stats_response(get_task_stats(db))
+
+@router.get("/changes", **CHANGES_ROUTE)
+def get_changes(
+    db: Session = Depends(get_db),
+    since: Optional[str] = Query(None, description="nextCursor from the previous sync, omit for a full sync"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes returned")
+):
+    try:
+        return changes_response(get_task_changes(db, since=since, limit=limit))
+    except SyncCursorExpiredError:
+        raise cursor_expired()
+    except ValueError as e:
+        raise bad_request(e)
+
+@router.get("/stream", **STREAM_ROUTE)
+def stream_task_changes(filters: TaskFilters = Depends(get_task_filters)):
+    return stream_response(filters)
+
+@router.get("/export", **EXPORT_ROUTE)
+def export_tasks(
+    db: Session = Depends(get_db),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson or csv"),
+    filters: TaskFilters = Depends(get_task_filters),
+    sort: TaskSort = Depends()
+):
+    # The request session is closed before the body is sent, so the stream reads through its own session
+    export_db = SessionLocal(bind=db.get_bind())
+
+    def generate():
+        try:
+            yield export_header(EXPORT_FIELDS, export_format)
+            for rows in stream_tasks(export_db, filters, sort, batch_size=settings.task_export_batch_size):
+                yield serialize_rows(rows, EXPORT_FIELDS, export_format)
+        finally:
+            export_db.close()
+
+    return export_response(generate(), export_format)
+
+@router.post("/bulk", **BULK_CREATE_ROUTE)
+def bulk_create(tasks_data: BulkCreateTaskRequestSchema, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return bulk_response("create", bulk_create_tasks(tasks_data, db, current_user))
+
+@router.put("/bulk", **BULK_UPDATE_ROUTE)
+def bulk_update(tasks_data: BulkUpdateTaskRequestSchema, db: Session = Depends(get_db)):
+    return bulk_response("update", bulk_update_tasks(tasks_data, db))
+
+@router.delete("/bulk", **BULK_DELETE_ROUTE)
+def bulk_delete(task_data: BulkDeleteTaskRequestSchema, db: Session = Depends(get_db)):
+    return bulk_response("delete", bulk_remove_tasks(task_data.ids, db))
+
+@router.get("/{task_id}", **GET_ROUTE)
+def get_task(request: Request, task_id: int, db: Session = Depends(get_db), query: TaskReadQuery = Depends()):
+    if not query.includes and has_validators(request):
+        # Revalidation reads only the version of one indexed row, the full row is loaded only when it changed
+        not_modified = task_not_modified(request, task_id, query, get_task_version(task_id, db))
+        if not_modified is not None:
+            return not_modified
+
+    return task_response(request, task_id, query, find_task_by_id(task_id, db, includes=query.includes))
+
+@router.put("/{task_id}", **UPDATE_ROUTE)
 def update_task(task_id: int, task_data: UpdateTaskRequestSchema, db: Session = Depends(get_db)):
-    success = update_task_details(task_id, task_data, db)
-    
-    if success:
-        result = {"message": "Task data updated successfully"}
-        return UpdateTaskResponseSchema.model_validate(result)
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
+    return updated_response(update_task_details(task_id, task_data, db))
 
-@router.delete(
-    "/{task_id}",
-    summary="Remove a task by ID",
-    response_model=DeleteTaskResponseSchema,
-    responses={404: {"model": ErrorResponse}}
-)
+@router.delete("/{task_id}", **DELETE_ROUTE)
 def delete_task(task_id: int, db: Session = Depends(get_db)):
-    success = remove_task(task_id, db)
-    if success:
-        result = {"message": "Task removed successfully"}
-        return DeleteTaskResponseSchema.model_validate(result)
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
\ No newline at end of file
+    return removed_response(remove_task(task_id, db))
@@ -0,0 +1,117 @@
+from fastapi import Request, Response, APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from coe.db.session import get_async_db
+from coe.schemas.user import CreateUser, UserLogin, UpdateUser, UserRegisterResponse, ErrorResponse, UserLoginResponse, UserUpdateResponse, UserDeleteResponse, RefreshTokenResponse, UserLogoutResponse, LoggedInUserResponse
+from coe.services.async_user_service import create_user, login_user, logout_user, remove_user, update_user
+from coe.services.rate_limit_service import check_login_rate_async, check_register_rate_async
+from coe.services.auth_service import get_current_user_async
+from coe.api.user.routes import set_auth_cookies, clear_auth_cookies, refresh_access_token
+from coe.models.user import User
+
+router = APIRouter(tags=["User"], prefix="/user")
+
+# Refreshing only verifies a JWT and never touches the database
+router.add_api_route("/token/refresh", refresh_access_token, methods=["POST"], response_model=RefreshTokenResponse)
+
+@router.post(
+    "/register",
+    response_model=UserRegisterResponse,
+    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"is_public": True}
+)
+async def register(request: Request, user: CreateUser, db: AsyncSession = Depends(get_async_db)):
+    await check_register_rate_async(request)
+    new_user = await create_user(user, db)
+    result = {"message": "User registered successfully", "user_id": new_user.id}
+
+    return UserRegisterResponse.model_validate(result)
+
+@router.get(
+    "/me",
+    summary="Get current logged-in user info",
+    response_model=LoggedInUserResponse
+)
+async def get_me(current_user: User = Depends(get_current_user_async)):
+    return LoggedInUserResponse.model_validate(current_user)
+
+@router.post(
+    "/login",
+    response_model=UserLoginResponse,
+    responses={401: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
+    openapi_extra={"is_public": True}
+)
+async def login(request: Request, response: Response, user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    await check_login_rate_async(request, user.email)
+    token_data = await login_user(user, db)
+
+    if not token_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+
+    set_auth_cookies(response, token_data)
+
+    result = {"message": "User authenticated successfully", **token_data}
+    return UserLoginResponse.model_validate(result)
+
+@router.post(
+    "/logout",
+    response_model=UserLogoutResponse,
+    summary="Logout user by revoking its tokens and clearing auth cookies",
+    status_code=status.HTTP_200_OK
+)
+async def logout(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    await logout_user(request.cookies.get("access_token"), request.cookies.get("refresh_token"), db)
+    clear_auth_cookies(response)
+    result = {"message": "Logged out successfully"}
+    return UserLogoutResponse.model_validate(result)
+
+@router.put(
+    "/{user_id}",
+    summary="Update user data by ID",
+    response_model=UserUpdateResponse,
+    responses={404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}}
+)
+async def update_user_details(
+    user_id: int,
+    user_data: UpdateUser,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    success = await update_user(user_id, user_data, db)
+    if success:
+        result = {"message": "User data updated successfully"}
+        return UserUpdateResponse.model_validate(result)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+@router.delete(
+    "/{user_id}",
+    summary="Remove a user by ID",
+    response_model=UserDeleteResponse,
+    responses={404: {"model": ErrorResponse}}
+)
+async def delete_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    success = await remove_user(user_id, db)
+    if success:
+        result = {"message": "User removed successfully"}
+        return UserDeleteResponse.model_validate(result)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
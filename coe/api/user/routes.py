@@ -2,14 +2,52 @@ from fastapi import Request, Response, APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from coe.db.session import get_db
 from coe.schemas.user import CreateUser, UserLogin, UpdateUser, UserRegisterResponse, ErrorResponse, UserLoginResponse, UserUpdateResponse, UserDeleteResponse, RefreshToken, RefreshTokenResponse, UserLogoutResponse, LoggedInUserResponse
-from coe.services.user_service import create_user, login_user, remove_user, update_user
-from coe.services.auth_service import create_access_token, get_current_user
+from coe.services.user_service import create_user, login_user, logout_user, remove_user, update_user
+from coe.services.rate_limit_service import check_login_rate, check_register_rate
+from coe.services.auth_service import create_access_token, decode_claims, get_current_user
 from coe.models.user import User
-from jose import JWTError, jwt
+from jose import JWTError
 from config import settings
 
 router = APIRouter(tags=["User"], prefix="/user")
 
+def set_auth_cookies(response: Response, token_data: dict):
+    response.set_cookie(
+        key="access_token",
+        value=token_data["access_token"],
+        httponly=True,
+        secure=True,
+        samesite="None",
+        max_age=settings.access_token_expire_minutes * 60,
+        path="/",
+    )
+    response.set_cookie(
+        key="refresh_token",
+        value=token_data["refresh_token"],
+        httponly=True,
+        secure=True,
+        samesite="None",
+        max_age=settings.refresh_token_expire_minutes * 60,
+        path="/user/token/refresh",
+    )
+
+def clear_auth_cookies(response: Response):
+    response.delete_cookie(
+        key="access_token",
+        path="/",
+        httponly=True,
+        secure=True,
+        samesite="None"
+    )
+
+    response.delete_cookie(
+        key="refresh_token",
+        path="/user/token/refresh",
+        httponly=True,
+        secure=True,
+        samesite="None"
+    )
+
 @router.post(
     "/token/refresh", 
     response_model=RefreshTokenResponse
@@ -20,7 +58,7 @@ def refresh_access_token(request: Request, response: Response):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing refresh token")
 
     try:
-        payload = jwt.decode(refresh_token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        payload = decode_claims(refresh_token)
         if payload.get("type") != "refresh":
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid refresh token")
 
@@ -44,11 +82,12 @@ def refresh_access_token(request: Request, response: Response):
 @router.post(
     "/register",
     response_model=UserRegisterResponse,
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
     status_code=status.HTTP_201_CREATED,
     openapi_extra={"is_public": True}
 )
-def register(user: CreateUser, db: Session = Depends(get_db)):
+def register(request: Request, user: CreateUser, db: Session = Depends(get_db)):
+    check_register_rate(request)
     new_user = create_user(user, db)
     result = {"message": "User registered successfully", "user_id": new_user.id}
     
@@ -65,10 +104,11 @@ def get_me(current_user: User = Depends(get_current_user)):
 @router.post(
     "/login",
     response_model=UserLoginResponse,
-    responses={401: {"model": ErrorResponse}},
+    responses={401: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
     openapi_extra={"is_public": True}
 )
-def login(response: Response, user: UserLogin, db: Session = Depends(get_db)):
+def login(request: Request, response: Response, user: UserLogin, db: Session = Depends(get_db)):
+    check_login_rate(request, user.email)
     token_data = login_user(user, db)
 
     if not token_data:
@@ -77,50 +117,25 @@ def login(response: Response, user: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid email or password"
         )
 
-    response.set_cookie(
-        key="access_token",
-        value=token_data["access_token"],
-        httponly=True,
-        secure=True,
-        samesite="None",
-        max_age=settings.access_token_expire_minutes * 60,
-        path="/",
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=token_data["refresh_token"],
-        httponly=True,
-        secure=True,
-        samesite="None",
-        max_age=settings.refresh_token_expire_minutes * 60,
-        path="/user/token/refresh",
-    )
-    
+    set_auth_cookies(response, token_data)
+
     result = {"message": "User authenticated successfully", **token_data}
     return UserLoginResponse.model_validate(result)
 
 @router.post(
     "/logout",
     response_model=UserLogoutResponse,
-    summary="Logout user by clearing auth cookies",
+    summary="Logout user by revoking its tokens and clearing auth cookies",
     status_code=status.HTTP_200_OK
 )
-def logout(response: Response, current_user: User = Depends(get_current_user)):
-    response.delete_cookie(
-        key="access_token",
-        path="/",
-        httponly=True,
-        secure=True,
-        samesite="None"
-    )
-
-    response.delete_cookie(
-        key="refresh_token",
-        path="/user/token/refresh",
-        httponly=True,
-        secure=True,
-        samesite="None"
-    )
+def logout(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    logout_user(request.cookies.get("access_token"), request.cookies.get("refresh_token"), db)
+    clear_auth_cookies(response)
     result = {"message": "Logged out successfully"}
     return UserLogoutResponse.model_validate(result)
 
@@ -128,7 +143,7 @@ def logout(response: Response, current_user: User = Depends(get_current_user)):
     "/{user_id}",
     summary="Update user data by ID",
     response_model=UserUpdateResponse,
-    responses={404: {"model": ErrorResponse}}
+    responses={404: {"model": ErrorResponse}, 503: {"model": ErrorResponse}}
 )
 def update_user_details(
     user_id: int, 
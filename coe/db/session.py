@@ -1,9 +1,59 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from coe.db.pool import engine_options, configure_engine
+from coe.utils.metrics_utils import instrument_engine
 from config import settings
+from typing import Callable, Dict
 
-engine = create_engine(settings.database_url, echo=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# Engines are created on first use, or by the startup warm-up, instead of as an import side effect
+_engines: Dict[str, Engine] = {}
+
+def get_engine() -> Engine:
+    if "sync" not in _engines:
+        engine = create_engine(settings.database_url, echo=settings.db_echo, **engine_options())
+        configure_engine(engine)
+        instrument_engine(engine, "sync")
+        _engines["sync"] = engine
+    return _engines["sync"]
+
+def get_async_engine() -> AsyncEngine:
+    if "async" not in _engines:
+        async_engine = create_async_engine(settings.async_database_url, echo=settings.db_echo, **engine_options(is_async=True))
+        configure_engine(async_engine.sync_engine)
+        instrument_engine(async_engine.sync_engine, "async")
+        _engines["async"] = async_engine
+    return _engines["async"]
+
+def created_engines() -> Dict[str, Engine]:
+    return {name: getattr(engine, "sync_engine", engine) for name, engine in _engines.items()}
+
+class LazySessionMaker(sessionmaker):
+    """sessionmaker that binds to its engine the first time a session is made without an explicit bind."""
+
+    def __init__(self, engine_factory: Callable, **kwargs):
+        super().__init__(**kwargs)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+class LazyAsyncSessionMaker(async_sessionmaker):
+    def __init__(self, engine_factory: Callable, **kwargs):
+        super().__init__(**kwargs)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw and self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionMaker(get_engine, autocommit=False, autoflush=False)
+# Objects must stay readable after commit, async sessions can't lazy load expired attributes
+AsyncSessionLocal = LazyAsyncSessionMaker(get_async_engine, autoflush=False, expire_on_commit=False)
 
 def get_db():
     db = SessionLocal()
@@ -11,3 +61,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,2 +1,3 @@
 from .user import User
-from .task import Task
\ No newline at end of file
+from .task import Task, TaskTombstone, TaskStat, TaskOpenDueCount
+from .revoked_token import RevokedToken
\ No newline at end of file
@@ -6,8 +6,11 @@ from coe.utils.format_utils import to_camel
 Base = declarative_base()
 
 class TimestampMixin:
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_on = Column(DateTime(timezone=True), onupdate=func.now())
+    # clock_timestamp() rather than now(), so several writes in one transaction still get distinct versions for ETags,
+    # and a row written late in a long transaction isn't dated back to its start, behind delta sync cursors
+    created_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False)
+    # Only covers UPDATEs sent through SQLAlchemy, tasks also get it from a trigger for the database's own writes
+    updated_on = Column(DateTime(timezone=True), onupdate=func.clock_timestamp())
 
 class CamelModel(BaseModel):
     model_config = {
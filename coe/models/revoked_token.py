@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
+from .base import Base
+
+class RevokedToken(Base):
+    """A revoked token id, or with user_id and issued_before every token of that user issued before then."""
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(32), unique=True)
+    user_id = Column(Integer)
+    issued_before = Column(DateTime(timezone=True))
+    # Once every token a row covers has expired it is pruned
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Text, ForeignKey, Enum, Date, DateTime, Computed, Index, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from .base import Base, TimestampMixin
 import enum
 
@@ -13,18 +14,70 @@ class StatusEnum(enum.Enum):
     in_progress = "in_progress"
     completed = "completed"
 
+SEARCH_CONFIG = "english"
+
+# Name matches are weighted above description matches when ranking search results
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
+
 class Task(Base, TimestampMixin):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+        Index("ix_tasks_start_date_id", "start_date", "id"),
+        Index("ix_tasks_name_id", "name", "id"),
+        Index("ix_tasks_priority_id", "priority", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_status_due_date_id", "status", "due_date", "id"),
+        Index("ix_tasks_priority_due_date_id", "priority", "due_date", "id"),
+        Index("ix_tasks_assignee_due_date_id", "assignee_id", "due_date", "id"),
+        Index("ix_tasks_created_by_due_date_id", "created_by_id", "due_date", "id"),
+        Index("ix_tasks_open_due_date_id", "due_date", "id", postgresql_where=text("status <> 'completed'")),
+        Index("ix_tasks_version_id", text("coalesce(updated_on, created_at)"), "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
-    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     due_date = Column(Date, nullable=False)
     start_date = Column(Date, nullable=True)
     priority = Column(Enum(PriorityEnum, name="priority_enum"), nullable=False, default=PriorityEnum.low)
     status = Column(Enum(StatusEnum, name="status_enum"), nullable=False, default=StatusEnum.pending)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
 
     assignee = relationship("User", back_populates="tasks", passive_deletes=True,  foreign_keys=[assignee_id])
-    created_by = relationship("User", back_populates="created_tasks", passive_deletes=True, foreign_keys=[created_by_id])
\ No newline at end of file
+    created_by = relationship("User", back_populates="created_tasks", passive_deletes=True, foreign_keys=[created_by_id])
+
+class TaskTombstone(Base):
+    """Filled by a trigger on tasks deletes, so every delete path is recorded for delta sync."""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_deleted_at_task_id", "deleted_at", "task_id"),
+    )
+
+    task_id = Column(Integer, primary_key=True, autoincrement=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False)
+
+class TaskStat(Base):
+    """Task counts per status, priority and assignee, kept current by a trigger on tasks."""
+    __tablename__ = "task_stats"
+
+    dimension = Column(String(16), primary_key=True)
+    # Unassigned tasks are counted under an empty assignee
+    value = Column(String(32), primary_key=True)
+    # Each connection adds to its own shard so concurrent writes don't queue on one row, reads sum them
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
+
+class TaskOpenDueCount(Base):
+    """Tasks not completed per due date, so the overdue count is a sum over dates rather than over tasks."""
+    __tablename__ = "task_open_due_counts"
+
+    due_date = Column(Date, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
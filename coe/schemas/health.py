@@ -0,0 +1,21 @@
+from coe.models.base import CamelModel
+from typing import Dict
+
+### Response Schemas
+class DBHealthResponseSchema(CamelModel):
+    status: str
+    latency_ms: float
+
+class PoolStatsSchema(CamelModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+class PoolStatsResponseSchema(CamelModel):
+    pools: Dict[str, PoolStatsSchema]
@@ -1,13 +1,15 @@
-from pydantic import Field, constr, conint, field_validator
+from pydantic import BeforeValidator, Field, create_model, constr, conint, conlist, field_validator
 from coe.models.base import CamelModel
-from typing import Optional, List, Literal
+from typing import Annotated, Dict, Optional, List, Literal, Tuple, Type
 from enum import Enum
+from functools import lru_cache
 from datetime import date, datetime
 
 NameStr = constr(strip_whitespace=True, min_length=1, max_length=128)
 TextStr = constr(strip_whitespace=True, min_length=0, max_length=20000)
 PasswordStr = constr(min_length=8, max_length=128)
 ID = conint(gt=0)
+BULK_MAX_ITEMS = 1000
 
 class PriorityEnum(str, Enum):
     low = "low"
@@ -20,21 +22,61 @@ class StatusEnum(str, Enum):
     completed = "completed"
 
 class PaginationSchema(CamelModel):
-    page: int
+    page: Optional[int] = None
     limit: int
     count: int
-    total: int
-    total_pages: int
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    count_strategy: str = "exact"
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 ### Request Schemas
 
+CountStrategy = Literal["exact", "estimated", "cached", "none"]
+
+ExportFormat = Literal["ndjson", "csv"]
+
+def parse_choices(value: Optional[str], choices: type[Enum]) -> Optional[str]:
+    # Kept as one canonical string, so equal filters share count cache keys and ETags
+    if value is None:
+        return None
+
+    values = {item.strip().lower() for item in value.split(",") if item.strip()}
+    unknown = values - {choice.value for choice in choices}
+    if unknown:
+        raise ValueError(f"Unknown value: {', '.join(sorted(unknown))}. Allowed: {', '.join(choice.value for choice in choices)}")
+    return ",".join(choice.value for choice in choices if choice.value in values) or None
+
+def parse_user(value: Optional[str], *keywords: str) -> Optional[str]:
+    if value is None:
+        return None
+
+    value = str(value).strip().lower()
+    if value not in keywords and not (value.isdigit() and int(value) > 0):
+        raise ValueError(f"Must be a user id or {' or '.join(keywords)}")
+    return value
+
+# Validators sit on the types, so FastAPI checks the query parameters against them and answers 422
+StatusList = Annotated[Optional[str], BeforeValidator(lambda value: parse_choices(value, StatusEnum))]
+PriorityList = Annotated[Optional[str], BeforeValidator(lambda value: parse_choices(value, PriorityEnum))]
+AssigneeFilter = Annotated[Optional[str], BeforeValidator(lambda value: parse_user(value, "me", "none"))]
+CreatorFilter = Annotated[Optional[str], BeforeValidator(lambda value: parse_user(value, "me"))]
+
 class TaskFilters(CamelModel):
-    status: Optional[Literal["pending", "in_progress", "completed"]] = None
-    priority: Optional[Literal["low", "medium", "high"]] = None
+    status: StatusList = Field(default=None, description="Comma separated statuses: pending, in_progress, completed")
+    priority: PriorityList = Field(default=None, description="Comma separated priorities: low, medium, high")
     search: Optional[str] = None
+    assignee_id: AssigneeFilter = Field(default=None, description="A user id, me, or none for unassigned tasks")
+    created_by_id: CreatorFilter = Field(default=None, description="A user id or me")
+    due_from: Optional[date] = Field(default=None, description="Tasks due on or after this date")
+    due_to: Optional[date] = Field(default=None, description="Tasks due on or before this date")
+    start_from: Optional[date] = Field(default=None, description="Tasks starting on or after this date")
+    start_to: Optional[date] = Field(default=None, description="Tasks starting on or before this date")
+    overdue: Optional[bool] = Field(default=None, description="Tasks not completed and due before today, or false for the rest")
 
 class TaskSort(CamelModel):
-    sort_by: Optional[str] = None
+    sort_by: Optional[str] = Field(default=None, description="id, name, dueDate, startDate, priority, or relevance together with search")
     sort_order: Optional[Literal["asc", "desc"]] = None
 
 class CreateTaskRequestSchema(CamelModel):
@@ -62,6 +104,15 @@ class UpdateTaskRequestSchema(CamelModel):
             raise ValueError(f"{field.field_name} cannot be null")
         return value
 
+class BulkUpdateTaskItemSchema(UpdateTaskRequestSchema):
+    id: ID
+
+BulkCreateTaskRequestSchema = conlist(CreateTaskRequestSchema, min_length=1, max_length=BULK_MAX_ITEMS)
+BulkUpdateTaskRequestSchema = conlist(BulkUpdateTaskItemSchema, min_length=1, max_length=BULK_MAX_ITEMS)
+
+class BulkDeleteTaskRequestSchema(CamelModel):
+    ids: conlist(ID, min_length=1, max_length=BULK_MAX_ITEMS)
+
 ### Response Schemas
 class CreateTaskResponseSchema(CamelModel):
     message: str
@@ -70,6 +121,12 @@ class CreateTaskResponseSchema(CamelModel):
 class UpdateTaskResponseSchema(CamelModel):
     message: str
 
+class UserSummarySchema(CamelModel):
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+
 class GetTaskResponseSchema(CamelModel):
     id: int
     name: str
@@ -82,17 +139,69 @@ class GetTaskResponseSchema(CamelModel):
     status: StatusEnum
     created_at: datetime
     updated_on: Optional[datetime]
+    assignee: Optional[UserSummarySchema] = Field(default=None, description="Set when requested with include=assignee")
+    created_by: Optional[UserSummarySchema] = Field(default=None, description="Set when requested with include=createdBy")
 
 class GetTaskListResponseSchema(CamelModel):
     message: str
-    tasks: List[GetTaskResponseSchema]
+    tasks: List[GetTaskResponseSchema] = Field(description="Only the requested fields, by default all but description")
     pagination: PaginationSchema
 
+@lru_cache(maxsize=256)
+def task_fields_schema(fields: Tuple[str, ...]) -> Type[CamelModel]:
+    """GetTaskResponseSchema narrowed to fields, so responses leave out the rest rather than sending nulls."""
+    return create_model(
+        f"TaskFields[{','.join(fields)}]",
+        __base__=CamelModel,
+        **{name: (GetTaskResponseSchema.model_fields[name].annotation, GetTaskResponseSchema.model_fields[name]) for name in fields},
+    )
+
+@lru_cache(maxsize=256)
+def task_list_schema(fields: Tuple[str, ...]) -> Type[GetTaskListResponseSchema]:
+    return create_model(
+        f"GetTaskListResponseSchema[{','.join(fields)}]",
+        __base__=GetTaskListResponseSchema,
+        tasks=(List[task_fields_schema(fields)], ...),
+    )
+
 class UpdateTaskResponseSchema(CamelModel):
     message: str
 
+class TaskTombstoneSchema(CamelModel):
+    id: int
+    deleted_at: datetime
+
+class TaskChangesResponseSchema(CamelModel):
+    message: str
+    tasks: List[GetTaskResponseSchema] = Field(description="Tasks created or modified after the cursor")
+    deleted: List[TaskTombstoneSchema] = Field(description="Tasks removed after the cursor, empty on a sync without since")
+    next_cursor: str = Field(description="Pass as since on the next sync")
+    has_more: bool
+
+class AssigneeTaskCountSchema(CamelModel):
+    assignee_id: Optional[int] = Field(description="Null for unassigned tasks")
+    count: int
+
+class TaskStatsResponseSchema(CamelModel):
+    message: str
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_assignee: List[AssigneeTaskCountSchema] = Field(description="Assignees with at least one task, most tasks first")
+    overdue: int = Field(description="Tasks not completed whose due date has passed")
+
 class DeleteTaskResponseSchema(CamelModel):
     message: str
 
+class BulkTaskResultSchema(CamelModel):
+    index: int
+    task_id: Optional[int] = None
+    status: Literal["created", "updated", "deleted", "not_found", "failed"]
+    detail: Optional[str] = None
+
+class BulkTaskResponseSchema(CamelModel):
+    message: str
+    results: List[BulkTaskResultSchema]
+
 class ErrorResponse(CamelModel):
     detail: str
\ No newline at end of file
@@ -0,0 +1,85 @@
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from coe.models.task import Task
+from coe.models.user import User
+from coe.schemas.task import CreateTaskRequestSchema, UpdateTaskRequestSchema, BulkUpdateTaskItemSchema, TaskFilters, TaskSort
+from coe.services import task_service
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Sequence, Tuple
+
+# Each query runs the sync implementation on the async connection via run_sync,
+# so the event loop never blocks on the database and both stacks share one implementation
+
+async def cache_call(fn: Callable, *args):
+    # run_sync executes on the event loop, so the task cache is called outside of it. Without a shared tier
+    # every call is an in-memory lookup and a thread hop would cost more than it saves
+    if task_service.task_cache.shared is None:
+        return fn(*args)
+    return await run_in_threadpool(fn, *args)
+
+async def create_task(task_data: CreateTaskRequestSchema, db: AsyncSession, current_user: User) -> Task:
+    db_task = await db.run_sync(lambda session: task_service.insert_task(task_data, session, current_user))
+    await cache_call(task_service.task_cache.set, db_task.id, task_service.task_to_dict(db_task))
+    return db_task
+
+async def find_task_by_id(task_id: int, db: AsyncSession, includes: Sequence[str] = ()) -> Optional[dict]:
+    task = await cache_call(task_service.task_cache.get, task_id)
+    if task is None:
+        task = await db.run_sync(lambda session: task_service.load_task(task_id, session))
+        if task is None:
+            return None
+        await cache_call(task_service.task_cache.set, task_id, task)
+
+    if includes:
+        return (await db.run_sync(lambda session: task_service.attach_includes([task], includes, session)))[0]
+    return task
+
+async def get_task_version(task_id: int, db: AsyncSession) -> Optional[datetime]:
+    task = await cache_call(task_service.task_cache.get, task_id)
+    if task is not None:
+        return task["updated_on"] or task["created_at"]
+    return await db.run_sync(lambda session: task_service.load_task_version(task_id, session))
+
+async def get_tasks_version(db: AsyncSession, filters: TaskFilters) -> Tuple[int, Optional[datetime]]:
+    return await db.run_sync(lambda session: task_service.get_tasks_version(session, filters))
+
+async def get_tasks_page(db: AsyncSession, filters: TaskFilters, sort: TaskSort, page: int = 1, limit: int = 10, cursor: Optional[str] = None, count_strategy: str = "exact", includes: Sequence[str] = (), fields: Sequence[str] = ()) -> Tuple[List[Row | dict], dict]:
+    return await db.run_sync(lambda session: task_service.get_tasks_page(session, filters, sort, page=page, limit=limit, cursor=cursor, count_strategy=count_strategy, includes=includes, fields=fields))
+
+async def get_task_changes(db: AsyncSession, since: Optional[str] = None, limit: int = 100) -> dict:
+    return await db.run_sync(lambda session: task_service.get_task_changes(session, since=since, limit=limit))
+
+async def get_task_stats(db: AsyncSession) -> dict:
+    return await db.run_sync(task_service.get_task_stats)
+
+async def update_task_details(task_id: int, task_data: UpdateTaskRequestSchema, db: AsyncSession) -> bool:
+    task = await db.run_sync(lambda session: task_service.save_task_details(task_id, task_data, session))
+    if task is None:
+        return False
+    await cache_call(task_service.task_cache.set, task_id, task)
+    return True
+
+async def remove_task(task_id: int, db: AsyncSession) -> bool:
+    versions = await db.run_sync(lambda session: task_service.delete_task_row(task_id, session))
+    await cache_call(task_service.invalidate_tasks, versions)
+    return bool(versions)
+
+async def bulk_create_tasks(tasks_data: List[CreateTaskRequestSchema], db: AsyncSession, current_user: User) -> List[dict]:
+    return await db.run_sync(lambda session: task_service.bulk_create_tasks(tasks_data, session, current_user))
+
+async def bulk_update_tasks(tasks_data: List[BulkUpdateTaskItemSchema], db: AsyncSession) -> List[dict]:
+    results, versions = await db.run_sync(lambda session: task_service.update_task_rows(tasks_data, session))
+    await cache_call(task_service.invalidate_tasks, versions)
+    return results
+
+async def bulk_remove_tasks(task_ids: List[int], db: AsyncSession) -> List[dict]:
+    results, versions = await db.run_sync(lambda session: task_service.delete_task_rows(task_ids, session))
+    await cache_call(task_service.invalidate_tasks, versions)
+    return results
+
+async def stream_tasks(db: AsyncSession, filters: TaskFilters, sort: TaskSort, batch_size: int = 1000) -> AsyncIterator[Sequence]:
+    statement = task_service.build_task_query(filters, sort).execution_options(yield_per=batch_size)
+    result = await db.stream(statement)
+    async for rows in result.partitions():
+        yield rows
@@ -0,0 +1,35 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from coe.models.user import User
+from coe.schemas.user import CreateUser, UserLogin, UpdateUser
+from coe.services import user_service
+from coe.services.password_service import password_hasher
+
+# Password hashing is CPU bound, so it is awaited on the hashing pool before the database work
+
+async def create_user(user: CreateUser, db: AsyncSession) -> User:
+    hashed_password = await password_hasher.hash_async(user.password)
+    return await db.run_sync(lambda session: user_service.add_user(user, hashed_password, session))
+
+async def login_user(login_cred: UserLogin, db: AsyncSession) -> dict | None:
+    user = await db.run_sync(lambda session: user_service.find_user_by_email(login_cred.email, session))
+
+    if not user:
+        return None
+
+    if not await password_hasher.verify_async(login_cred.password, user.password):
+        return None
+
+    return user_service.issue_tokens(user)
+
+async def logout_user(access_token: str | None, refresh_token: str | None, db: AsyncSession):
+    await db.run_sync(lambda session: user_service.logout_user(access_token, refresh_token, session))
+
+async def update_user(user_id: int, user_data: UpdateUser, db: AsyncSession) -> bool:
+    update_fields = user_service.get_user_update_fields(user_data)
+    if "password" in update_fields:
+        update_fields["password"] = await password_hasher.hash_async(update_fields["password"])
+
+    return await db.run_sync(lambda session: user_service.apply_user_update(user_id, update_fields, session))
+
+async def remove_user(user_id: int, db: AsyncSession) -> bool:
+    return await db.run_sync(lambda session: user_service.remove_user(user_id, session))
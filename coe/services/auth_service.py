@@ -1,40 +1,61 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from fastapi import Request, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from coe.models import User
-from coe.db.session import get_db
+from coe.db.session import get_db, get_async_db
+from coe.services.token_revocation_service import token_revocations
+from coe.utils.cache_utils import TTLCache
+from coe.utils.metrics_utils import cache_collector
 from config import settings
+from uuid import uuid4
 
 SECRET_KEY = settings.jwt_secret_key
 ALGORITHM = settings.jwt_algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_MINUTES = settings.refresh_token_expire_minutes
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/login")
 
-def create_access_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+principal_cache = TTLCache(max_size=settings.principal_cache_max_size, ttl_seconds=settings.principal_cache_ttl_seconds)
+cache_collector.add("principal", principal_cache)
+
+def create_token(data: dict, expires_delta: timedelta, **claims) -> str:
+    issued_at = datetime.now(timezone.utc)
+    # iat keeps sub-second precision so a token issued right after a user wide revocation isn't caught by it
+    to_encode = {**data, **claims, "jti": uuid4().hex, "iat": issued_at.timestamp(), "exp": issued_at + expires_delta}
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def create_access_token(data: dict):
+    return create_token(data, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
 def create_refresh_token(data: dict):
-    expire = datetime.utcnow() + timedelta(days=7)
-    to_encode = data.copy()
-    to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return create_token(data, timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES), type="refresh")
 
-def decode_token(token: str):
+def decode_claims(token: str) -> dict:
     payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if token_revocations.is_revoked(payload):
+        raise JWTError("Token has been revoked")
+    return payload
+
+def read_claims(token: str | None) -> dict | None:
+    # Expired, invalid and already revoked tokens need no revoking
+    if not token:
+        return None
+    try:
+        return decode_claims(token)
+    except JWTError:
+        return None
+
+def decode_token(token: str):
+    payload = decode_claims(token)
     user_id: int = payload.get("user_id")
     return user_id
 
 
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> User:
+def get_user_id_from_request(request: Request) -> int:
     access_token = request.cookies.get("access_token")
     if not access_token:
         raise HTTPException(
@@ -43,17 +64,58 @@ def get_current_user(
         )
 
     try:
-        user_id = decode_token(access_token)
+        return decode_token(access_token)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+
+def cache_principal(user: User) -> User:
+    # Detached copy without the password hash, shared read-only by every request of this user
+    principal = User(**{
+        column.key: getattr(user, column.key)
+        for column in User.__table__.columns
+        if column.key != "password"
+    })
+    principal_cache.set(principal.id, principal)
+    return principal
+
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
+) -> User:
+    user_id = get_user_id_from_request(request)
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
\ No newline at end of file
+    return cache_principal(user)
+
+
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id = get_user_id_from_request(request)
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(User, user_id) if user_id is not None else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    return cache_principal(user)
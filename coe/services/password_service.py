@@ -0,0 +1,167 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from coe.utils import password_utils
+from coe.utils.metrics_utils import password_hash_duration_seconds, password_hash_queue_depth, password_hash_rejected_total
+from config import settings
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+class PasswordHasherBusyError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so hashing never competes with request handling for the GIL.
+
+    At most workers + queue_size hashes are admitted at once; anything beyond that
+    fails fast with PasswordHasherBusyError instead of piling up behind the pool.
+    A pool broken by a dying worker is replaced, and the hash it lost is retried once.
+    """
+
+    def __init__(self, workers: int = 0, queue_size: int = 64, retry_after: int = 1):
+        self.workers = workers or available_cores()
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Forking a threaded server is unsafe, workers are spawned fresh instead
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        # A broken pool refuses all work, the next submit spawns a new one
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _pool_submit(self, fn, *args) -> Future:
+        pool = self._get_pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard(pool)
+            pool = self._get_pool()
+            future = pool.submit(fn, *args)
+
+        def on_done(done: Future):
+            if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+                self._discard(pool)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _set_in_flight(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+            password_hash_queue_depth.set(max(0, self.in_flight - self.workers))
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            password_hash_rejected_total.inc()
+            raise PasswordHasherBusyError(self.retry_after)
+
+        self._set_in_flight(1)
+        started = time.perf_counter()
+
+        def on_done(_):
+            elapsed = time.perf_counter() - started
+            self._set_in_flight(-1)
+            with self._lock:
+                self.completed += 1
+                self.latency_seconds_total += elapsed
+                self.latency_seconds_max = max(self.latency_seconds_max, elapsed)
+            password_hash_duration_seconds.observe(elapsed)
+            self._slots.release()
+
+        try:
+            future = self._pool_submit(fn, *args)
+        except Exception:
+            self._set_in_flight(-1)
+            self._slots.release()
+            raise
+        future.add_done_callback(on_done)
+        return future
+
+    def _run(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result()
+        except BrokenProcessPool:
+            return self._submit(fn, *args).result()
+
+    async def _run_async(self, fn, *args):
+        try:
+            return await asyncio.wrap_future(self._submit(fn, *args))
+        except BrokenProcessPool:
+            return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def hash(self, password: str) -> str:
+        return self._run(password_utils.hash_password, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(password_utils.verify_password, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(password_utils.hash_password, password)
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await self._run_async(password_utils.verify_password, password, hashed_password)
+
+    def warm_up(self):
+        # One hash per worker spawns every process and loads bcrypt in it, instead of on the first logins
+        futures = [self._submit(password_utils.hash_password, "warm-up") for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "latency_seconds_total": self.latency_seconds_total,
+                "latency_seconds_max": self.latency_seconds_max,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+    retry_after=settings.password_hash_retry_after_seconds,
+)
+
+def hash_password(password: str) -> str:
+    return password_hasher.hash(password)
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return password_hasher.verify(password, hashed_password)
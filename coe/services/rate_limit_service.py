@@ -0,0 +1,65 @@
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from coe.utils.cache_utils import InMemoryBackend, create_shared_backend
+from coe.utils.metrics_utils import multiprocess_enabled
+from coe.utils.rate_limit_utils import SlidingWindowLimiter
+from config import settings
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+class RateLimitExceededError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Too many requests")
+        self.retry_after = retry_after
+
+shared_backend = create_shared_backend(settings.rate_limit_url)
+window_seconds = settings.rate_limit_window_seconds
+
+login_ip_limiter = SlidingWindowLimiter(settings.login_rate_limit_per_ip, window_seconds, shared_backend, "rate:login:ip:")
+login_email_limiter = SlidingWindowLimiter(settings.login_rate_limit_per_email, window_seconds, shared_backend, "rate:login:email:")
+register_ip_limiter = SlidingWindowLimiter(settings.register_rate_limit_per_ip, window_seconds, shared_backend, "rate:register:ip:")
+
+def counted_per_worker() -> bool:
+    # memory:// lives in one process like the default counters, only redis:// is shared
+    return shared_backend is None or isinstance(shared_backend, InMemoryBackend)
+
+def warn_if_counted_per_worker():
+    # uvicorn and gunicorn take their worker count from WEB_CONCURRENCY, and several workers share metrics
+    # through PROMETHEUS_MULTIPROC_DIR. Either one means each worker would grant the whole budget
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    if settings.rate_limit_enabled and counted_per_worker() and (workers > 1 or multiprocess_enabled()):
+        logger.warning("Rate limits are counted per worker process, so every worker allows the full budget. Set RATE_LIMIT_URL to a redis:// URL to share them")
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy this is only the client's address when uvicorn trusts its X-Forwarded-For
+    return request.client.host if request.client else "unknown"
+
+def enforce(*checks):
+    if not settings.rate_limit_enabled:
+        return
+    # Stops at the first exceeded limit, so a blocked client doesn't also use up the budgets behind it
+    for limiter, key in checks:
+        retry_after = limiter.hit(key)
+        if retry_after:
+            raise RateLimitExceededError(retry_after)
+
+def check_login_rate(request: Request, email: str):
+    enforce((login_ip_limiter, client_ip(request)), (login_email_limiter, email.lower()))
+
+def check_register_rate(request: Request):
+    enforce((register_ip_limiter, client_ip(request)))
+
+async def run_check(check, *args):
+    # The shared backend is a blocking Redis client, so async routes call it from the thread pool
+    if settings.rate_limit_enabled and shared_backend is not None:
+        await run_in_threadpool(check, *args)
+    else:
+        check(*args)
+
+async def check_login_rate_async(request: Request, email: str):
+    await run_check(check_login_rate, request, email)
+
+async def check_register_rate_async(request: Request):
+    await run_check(check_register_rate, request)
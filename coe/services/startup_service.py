@@ -0,0 +1,80 @@
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from coe.db.session import get_engine, get_async_engine
+from coe.services.auth_service import create_access_token, decode_token
+from coe.services.password_service import password_hasher
+from coe.utils.metrics_utils import startup_duration_seconds
+from coe.utils.swagger_utils import custom_openapi, load_openapi
+from config import settings
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+def warm_openapi(app: FastAPI):
+    if settings.openapi_schema_path and load_openapi(app, settings.openapi_schema_path):
+        return
+    if settings.openapi_schema_path:
+        logger.warning("Prebuilt OpenAPI schema at %s is missing or stale, building it", settings.openapi_schema_path)
+    custom_openapi(app)
+
+def warm_connections() -> int:
+    return settings.db_pool_warm_connections or settings.db_pool_size
+
+def warm_sync_pool():
+    # Connections are checked out together so the pool really opens that many, then all go back idle
+    engine = get_engine()
+    connections = [engine.connect() for _ in range(warm_connections())]
+    try:
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+async def warm_async_pool():
+    engine = get_async_engine()
+    connections = [await engine.connect() for _ in range(warm_connections())]
+    try:
+        for connection in connections:
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+async def warm_database():
+    await run_in_threadpool(warm_sync_pool)
+    if settings.db_async_enabled:
+        await warm_async_pool()
+
+def warm_auth():
+    decode_token(create_access_token({"sub": "0"}))
+    password_hasher.warm_up()
+
+async def timed(step: str, timings: dict, fn, *args):
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        # A failed warm-up only costs the first request its latency, it must not keep the app from starting
+        logger.exception("Startup warm-up step %s failed", step)
+    finally:
+        timings[step] = time.perf_counter() - started
+        startup_duration_seconds.labels(step=step).set(timings[step])
+
+async def run_startup(app: FastAPI) -> dict:
+    timings = {}
+    started = time.perf_counter()
+    await timed("openapi", timings, warm_openapi, app)
+    await asyncio.gather(
+        timed("database", timings, warm_database),
+        timed("auth", timings, run_in_threadpool, warm_auth),
+    )
+    timings["total"] = time.perf_counter() - started
+    startup_duration_seconds.labels(step="total").set(timings["total"])
+    logger.info("Startup warm-up finished in %.3fs: %s", timings["total"], timings)
+    return timings
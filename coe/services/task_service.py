@@ -1,100 +1,736 @@
 from sqlalchemy.orm import Session
-from coe.models.task import Task
+from coe.models.task import Task, TaskTombstone, TaskStat, TaskOpenDueCount, PriorityEnum, StatusEnum, SEARCH_CONFIG
 from coe.models.user import User
-from coe.schemas.task import CreateTaskRequestSchema, UpdateTaskRequestSchema, TaskFilters, TaskSort
-from typing import List, Tuple
-from sqlalchemy import or_, func, asc, desc
+from coe.schemas.task import CreateTaskRequestSchema, UpdateTaskRequestSchema, BulkUpdateTaskItemSchema, TaskFilters, TaskSort
+from coe.services.tombstone_service import tombstone_retention
+from coe.utils.pagination_utils import encode_cursor, decode_cursor
+from coe.utils.cache_utils import TTLCache, TieredCache, create_shared_backend
+from coe.utils.export_utils import to_export_value
+from coe.utils.metrics_utils import cache_collector
+from coe.utils.format_utils import to_camel
+from config import settings
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import Row, Integer, or_, and_, func, asc, desc, tuple_, literal, literal_column, text, bindparam, any_, select, insert, update, delete, false
+from sqlalchemy.dialects import postgresql
+import enum
+import json
+import math
+import re
+
+# Define allowed fields to prevent SQL injection
+ALLOWED_SORT_FIELDS = {
+    "id": Task.id,
+    "name": Task.name,
+    "dueDate": Task.due_date,
+    "startDate": Task.start_date,
+    "priority": Task.priority,
+}
+
+RELEVANCE_SORT = "relevance"
+
+# Read paths select these columns as plain rows instead of hydrating Task objects into the identity map
+TASK_COLUMNS = [
+    Task.id, Task.name, Task.description, Task.created_by_id, Task.assignee_id, Task.due_date,
+    Task.start_date, Task.priority, Task.status, Task.created_at, Task.updated_on,
+]
+
+# fields= names mapped to the columns they are read from
+TASK_FIELDS = {to_camel(column.key): column for column in TASK_COLUMNS}
+
+# Descriptions are unbounded text that list views don't show, so lists only load them when asked to
+LIST_FIELDS = tuple(column.key for column in TASK_COLUMNS if column is not Task.description)
+
+# include= names mapped to the response field and the foreign key the related user is loaded by
+TASK_INCLUDES = {
+    "assignee": ("assignee", Task.assignee_id),
+    "createdBy": ("created_by", Task.created_by_id),
+}
+
+# A trigger stamps updated_on on every UPDATE of a task, including the ones the database makes for a removed
+# user, so this changes whenever a task's representation does
+TASK_VERSION = func.coalesce(Task.updated_on, Task.created_at)
+
+USER_SUMMARY_COLUMNS = [User.id, User.first_name, User.last_name, User.email]
+
+COUNT_STRATEGIES = ("exact", "estimated", "cached", "none")
+
+# Totals from these follow the data exactly, so a data version can validate the whole list response
+VERSIONED_COUNT_STRATEGIES = ("exact", "none")
+
+# Filters whose matches can be decided from a task's own values, so cached counts for them are adjusted in place
+INCREMENTAL_COUNT_FILTERS = {"status", "priority"}
+
+# Written to by the tasks_notify_events trigger on every insert, update and delete
+TASK_EVENTS_CHANNEL = "task_events"
+
+task_count_cache = TTLCache(max_size=settings.task_count_cache_max_size, ttl_seconds=settings.task_count_cache_ttl_seconds)
+
+def encode_cached_task(task: dict) -> bytes:
+    return json.dumps(task, default=to_export_value).encode("utf-8")
+
+def decode_cached_task(raw: bytes) -> dict:
+    task = json.loads(raw)
+    for column in TASK_COLUMNS:
+        value = task.get(column.key)
+        python_type = column.type.python_type
+        if value is None:
+            continue
+        if issubclass(python_type, datetime):
+            task[column.key] = datetime.fromisoformat(value)
+        elif issubclass(python_type, date):
+            task[column.key] = date.fromisoformat(value)
+        elif issubclass(python_type, enum.Enum):
+            task[column.key] = python_type(value)
+    return task
+
+def version_us(moment: datetime) -> int:
+    return round(moment.timestamp() * 1_000_000)
+
+# Writes on this worker invalidate both tiers, so only other workers' local copies can lag, by at most task_cache_ttl_seconds
+def task_version_us(task: dict) -> int:
+    return version_us(task["updated_on"] or task["created_at"])
+
+task_cache = TieredCache(
+    TTLCache(max_size=settings.task_cache_max_size, ttl_seconds=settings.task_cache_ttl_seconds),
+    shared=create_shared_backend(settings.task_cache_shared_url),
+    shared_ttl_seconds=settings.task_cache_shared_ttl_seconds,
+    namespace="task:",
+    encode=encode_cached_task,
+    decode=decode_cached_task,
+    version=task_version_us,
+)
+
+cache_collector.add("task", task_cache)
+cache_collector.add("task_count", task_count_cache)
+
+def task_to_dict(task: Task) -> dict:
+    return {column.key: getattr(task, column.key) for column in TASK_COLUMNS}
+
+def get_task_event_state(db: Session, task_id: int, searches: Sequence[str] = ()) -> Tuple[Optional[dict], dict]:
+    # Search subscriptions are matched by the database in the same query that loads the task
+    search_columns = []
+    for index, search in enumerate(searches):
+        search_columns.append(build_search_condition(search).label(f"search_{index}"))
+
+    row = db.execute(select(*TASK_COLUMNS, *search_columns).where(Task.id == task_id)).first()
+    if row is None:
+        return None, {}
+    task = row._asdict()
+    return task, {search: task.pop(f"search_{index}") for index, search in enumerate(searches)}
+
+# Writes and reads are split in the database work and the task cache calls around it. The async stack runs
+# the first on its connection and the second off the event loop, the shared tier is a blocking client
 
 def create_task(task_data: CreateTaskRequestSchema, db: Session, current_user: User) -> Task:
-    db_task = Task(
+    db_task = insert_task(task_data, db, current_user)
+    task_cache.set(db_task.id, task_to_dict(db_task))
+    return db_task
+
+def insert_task(task_data: CreateTaskRequestSchema, db: Session, current_user: User) -> Task:
+    # INSERT ... RETURNING loads the generated columns, no flush and refresh round trips
+    db_task = db.scalar(insert(Task).values(
         name=task_data.name,
         description=task_data.description,
         created_by_id=current_user.id,
         assignee_id=task_data.assignee_id,
         due_date=task_data.due_date,
         start_date=task_data.start_date,
-        priority=task_data.priority
-    )
-    db.add(db_task)
+        priority=task_data.priority or PriorityEnum.low
+    ).returning(Task))
+    # Detached before the commit expires it, so reading it afterwards doesn't reload the row
+    db.expunge(db_task)
     db.commit()
-    db.refresh(db_task)
-    
+    update_cached_counts(db_task, 1)
+
     return db_task
 
-def find_task_by_id(task_id: int, db: Session) -> Task:
-    return db.query(Task).filter(Task.id == task_id).first()
+def find_task_by_id(task_id: int, db: Session, includes: Sequence[str] = ()) -> Optional[dict]:
+    task = task_cache.get(task_id)
+    if task is None:
+        task = load_task(task_id, db)
+        if task is None:
+            return None
+        task_cache.set(task_id, task)
+
+    if includes:
+        return attach_includes([task], includes, db)[0]
+    return task
+
+def load_task(task_id: int, db: Session) -> Optional[dict]:
+    row = db.query(*TASK_COLUMNS).filter(Task.id == task_id).first()
+    return row._asdict() if row is not None else None
+
+def get_task_version(task_id: int, db: Session) -> Optional[datetime]:
+    task = task_cache.get(task_id)
+    if task is not None:
+        return task["updated_on"] or task["created_at"]
+    return load_task_version(task_id, db)
+
+def load_task_version(task_id: int, db: Session) -> Optional[datetime]:
+    return db.query(TASK_VERSION).filter(Task.id == task_id).scalar()
+
+def get_tasks_version(db: Session, filters: TaskFilters) -> Tuple[int, Optional[datetime]]:
+    # The count changes on deletes, the newest version on inserts and updates
+    queryset = apply_task_filters(db.query(func.count(Task.id), func.max(TASK_VERSION)), filters)
+    count, version = queryset.one()
+    return count, version
+
+def parse_includes(include: Optional[str]) -> List[str]:
+    if not include:
+        return []
+
+    includes = []
+    for name in include.split(","):
+        name = to_camel(name.strip())
+        if name not in TASK_INCLUDES:
+            raise ValueError(f"Unknown include: {name}. Allowed: {', '.join(TASK_INCLUDES)}")
+        if name not in includes:
+            includes.append(name)
+    return includes
+
+def parse_fields(fields: Optional[str], default: Sequence[str] = ()) -> Tuple[str, ...]:
+    if not fields:
+        return tuple(default)
+
+    keys = {"id"}
+    for name in fields.split(","):
+        name = to_camel(name.strip())
+        if name not in TASK_FIELDS:
+            raise ValueError(f"Unknown field: {name}. Allowed: {', '.join(TASK_FIELDS)}")
+        keys.add(TASK_FIELDS[name].key)
+    # Column order keeps equal field sets equal, whatever order they were asked in
+    return tuple(column.key for column in TASK_COLUMNS if column.key in keys)
+
+def select_task_columns(fields: Sequence[str], sort: TaskSort, includes: Sequence[str] = ()) -> list:
+    # Cursors are built from the sort column and includes are looked up by their foreign keys, so those are read too
+    keys = set(fields) | {TASK_INCLUDES[name][1].key for name in includes}
+    sort_column = ALLOWED_SORT_FIELDS.get(sort.sort_by)
+    if sort_column is not None:
+        keys.add(sort_column.key)
+    return [column for column in TASK_COLUMNS if column.key in keys or column is Task.id]
+
+def response_fields(fields: Sequence[str], includes: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(fields) + tuple(TASK_INCLUDES[name][0] for name in includes)
+
+def attach_includes(tasks: List[dict], includes: Sequence[str], db: Session) -> List[dict]:
+    # All related users of the page come from one query, however many tasks reference them
+    user_ids = {task[TASK_INCLUDES[name][1].key] for task in tasks for name in includes} - {None}
+    users = {user.id: user._asdict() for user in db.execute(select(*USER_SUMMARY_COLUMNS).where(User.id.in_(user_ids)))} if user_ids else {}
+
+    result = []
+    for task in tasks:
+        item = dict(task)
+        for name in includes:
+            field, foreign_key = TASK_INCLUDES[name]
+            item[field] = users.get(item[foreign_key.key])
+        result.append(item)
+    return result
+
+def resolve_task_filters(filters: TaskFilters, user_id: int) -> TaskFilters:
+    # "me" becomes the caller's id before the filters reach queries, cache keys or subscriptions
+    update = {field: str(user_id) for field in ("assignee_id", "created_by_id") if getattr(filters, field) == "me"}
+    return filters.model_copy(update=update) if update else filters
 
 def apply_task_filters(queryset, filters: TaskFilters):
+    # Every filter compares a bare column, so each can be served by an index on it
     if filters.status:
-        queryset = queryset.filter(Task.status == filters.status.lower())
+        queryset = queryset.filter(Task.status.in_(filters.status.split(",")))
 
     if filters.priority:
-        queryset = queryset.filter(Task.priority == filters.priority.lower())
+        queryset = queryset.filter(Task.priority.in_(filters.priority.split(",")))
+
+    if filters.assignee_id == "none":
+        queryset = queryset.filter(Task.assignee_id.is_(None))
+    elif filters.assignee_id:
+        queryset = queryset.filter(Task.assignee_id == int(filters.assignee_id))
+
+    if filters.created_by_id:
+        queryset = queryset.filter(Task.created_by_id == int(filters.created_by_id))
+
+    if filters.due_from:
+        queryset = queryset.filter(Task.due_date >= filters.due_from)
+    if filters.due_to:
+        queryset = queryset.filter(Task.due_date <= filters.due_to)
+    if filters.start_from:
+        queryset = queryset.filter(Task.start_date >= filters.start_from)
+    if filters.start_to:
+        queryset = queryset.filter(Task.start_date <= filters.start_to)
+
+    # The status condition is rendered inline, so the planner can match it to the partial open tasks index
+    open_task = Task.status != literal_column("'completed'")
+    if filters.overdue is True:
+        queryset = queryset.filter(open_task, Task.due_date < func.current_date())
+    elif filters.overdue is False:
+        queryset = queryset.filter(or_(~open_task, Task.due_date >= func.current_date()))
 
     if filters.search:
-        search_term = f"%{filters.search.lower()}%"
-        queryset = queryset.filter(
-            or_(
-                func.lower(Task.name).like(search_term),
-                func.lower(Task.description).like(search_term)
-            )
-        )
+        queryset = queryset.filter(build_search_condition(filters.search))
 
     return queryset
 
-def apply_sorting(queryset, sort_by: str, sort_order: str):
-    # Define allowed fields to prevent SQL injection
-    allowed_sort_fields = {
-        "id": Task.id,
-        "name": Task.name,
-        "dueDate": Task.due_date,
-        "startDate": Task.start_date,
-        "priority": Task.priority,
-    }
+def search_words(search: str) -> List[str]:
+    return re.findall(r"\w+", search.lower())
 
-    sort_column = allowed_sort_fields.get(sort_by)
-    if sort_column is not None:
-        if sort_order == "desc":
-            queryset = queryset.order_by(desc(sort_column))
+def build_search_query(search: str):
+    # Every word is prefix matched, so partially typed terms still find tasks
+    words = search_words(search)
+    if not words:
+        return None
+
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words))
+
+def build_search_condition(search: str):
+    search_query = build_search_query(search)
+    if search_query is None:
+        # Nothing to search for matches nothing, not everything
+        return false()
+
+    return Task.search_vector.op("@@")(search_query)
+
+def apply_sorting(queryset, sort_by: str, sort_order: str, search: Optional[str] = None):
+    sort_column = ALLOWED_SORT_FIELDS.get(sort_by)
+    direction = desc if sort_order == "desc" else asc
+
+    if sort_by == RELEVANCE_SORT and search:
+        search_query = build_search_query(search)
+        if search_query is not None:
+            rank = func.ts_rank_cd(Task.search_vector, search_query)
+            # Best matches first unless ascending order is explicitly requested
+            queryset = queryset.order_by(asc(rank) if sort_order == "asc" else desc(rank))
+
+    if sort_column is not None and sort_column is not Task.id:
+        queryset = queryset.order_by(direction(sort_column))
+
+    # Task.id is unique, so it breaks ties and keeps page boundaries stable
+    return queryset.order_by(direction(Task.id))
+
+def get_cursor_sort(sort: TaskSort) -> Tuple[Optional[str], str]:
+    # Ranks are computed floats and can't be seeked on reliably
+    if sort.sort_by == RELEVANCE_SORT:
+        raise ValueError("Relevance sorting only supports page pagination")
+
+    sort_by = sort.sort_by if sort.sort_by in ALLOWED_SORT_FIELDS else None
+    sort_order = "desc" if sort.sort_order == "desc" else "asc"
+    return sort_by, sort_order
+
+def encode_task_cursor(task: Row, sort: TaskSort, direction: str = "next") -> Optional[str]:
+    if sort.sort_by == RELEVANCE_SORT:
+        return None
+
+    sort_by, sort_order = get_cursor_sort(sort)
+    sort_column = ALLOWED_SORT_FIELDS.get(sort_by, Task.id)
+
+    value = getattr(task, sort_column.key)
+    if isinstance(value, enum.Enum):
+        value = value.value
+    elif isinstance(value, date):
+        value = value.isoformat()
+
+    return encode_cursor({"s": sort_by, "o": sort_order, "v": value, "id": task.id, "d": direction})
+
+def decode_task_cursor(cursor: str, sort: TaskSort) -> Tuple[object, int, str]:
+    sort_by, sort_order = get_cursor_sort(sort)
+    data = decode_cursor(cursor)
+
+    # A cursor only makes sense for the ordering it was issued for
+    if data.get("s") != sort_by or data.get("o") != sort_order:
+        raise ValueError("Cursor does not match the requested sort")
+    if data.get("d") not in ("next", "prev") or not isinstance(data.get("id"), int):
+        raise ValueError("Invalid cursor")
+
+    value = data.get("v")
+    python_type = ALLOWED_SORT_FIELDS.get(sort_by, Task.id).type.python_type
+    try:
+        if value is not None and issubclass(python_type, date):
+            value = date.fromisoformat(value)
+        elif value is not None and issubclass(python_type, enum.Enum):
+            value = python_type(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    return value, data["id"], data["d"]
+
+def apply_cursor(queryset, sort_by: Optional[str], ascending: bool, value, last_id: int):
+    sort_column = ALLOWED_SORT_FIELDS.get(sort_by, Task.id)
+
+    if sort_column is Task.id:
+        return queryset.filter(Task.id > last_id if ascending else Task.id < last_id)
+
+    # Postgres orders NULLs as the largest value, both ascending and descending
+    if value is not None:
+        value = literal(value, sort_column.type)
+    if ascending:
+        if value is None:
+            condition = and_(sort_column.is_(None), Task.id > last_id)
         else:
-            queryset = queryset.order_by(asc(sort_column))
-    
-    return queryset
+            condition = tuple_(sort_column, Task.id) > tuple_(value, last_id)
+            if sort_column.nullable:
+                condition = or_(condition, sort_column.is_(None))
+    else:
+        if value is None:
+            condition = or_(sort_column.isnot(None), Task.id < last_id)
+        else:
+            condition = tuple_(sort_column, Task.id) < tuple_(value, last_id)
 
-def get_tasks_list(db: Session, filters: TaskFilters, sort: TaskSort, skip: int = 0, limit: int = 10,) -> Tuple[List[Task], int]:
-    queryset = db.query(Task)
+    return queryset.filter(condition)
+
+def get_tasks_by_cursor(db: Session, filters: TaskFilters, sort: TaskSort, cursor: str, limit: int = 10, columns: Sequence = TASK_COLUMNS) -> Tuple[List[Row], Optional[str], Optional[str]]:
+    sort_by, sort_order = get_cursor_sort(sort)
+    value, last_id, direction = decode_task_cursor(cursor, sort)
+
+    # Walking backwards is a forward seek over the reversed ordering
+    ascending = (sort_order == "asc") != (direction == "prev")
+    queryset = db.query(*columns)
+    queryset = apply_task_filters(queryset, filters)
+    queryset = apply_cursor(queryset, sort_by, ascending, value, last_id)
+    queryset = apply_sorting(queryset, sort_by, "asc" if ascending else "desc")
+
+    # One extra row tells us whether another page exists without counting
+    rows = queryset.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    tasks = rows[:limit]
+    if direction == "prev":
+        tasks.reverse()
+
+    next_cursor = None
+    prev_cursor = None
+    if tasks:
+        if direction == "prev" or has_more:
+            next_cursor = encode_task_cursor(tasks[-1], sort, "next")
+        if direction == "next" or has_more:
+            prev_cursor = encode_task_cursor(tasks[0], sort, "prev")
+
+    return (tasks, next_cursor, prev_cursor)
+
+def get_count_cache_key(filters: TaskFilters) -> tuple:
+    return tuple(sorted(filters.model_dump(exclude_none=True).items()))
+
+def explain_plan(db: Session, statement) -> dict:
+    compiled = statement.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"render_postcompile": True})
+    # IN lists are expanded into one parameter per value, named after the list's parameter
+    explain = text(f"EXPLAIN (FORMAT JSON) {compiled}").bindparams(*(
+        bindparam(name, value, type_=compiled.binds[name if name in compiled.binds else name.rsplit("_", 1)[0]].type)
+        for name, value in compiled.params.items()
+    ))
+    return db.execute(explain).scalar()[0]["Plan"]
+
+def estimate_count(queryset) -> int:
+    # The planner's row estimate comes from table statistics and costs no scan
+    return int(explain_plan(queryset.session, queryset.statement)["Plan Rows"])
+
+def count_tasks(queryset, filters: TaskFilters, count_strategy: str = "exact") -> Optional[int]:
+    if count_strategy == "none":
+        return None
+
+    if count_strategy == "estimated":
+        return estimate_count(queryset)
+
+    if count_strategy == "cached":
+        key = get_count_cache_key(filters)
+        total = task_count_cache.get(key)
+        if total is None:
+            total = queryset.count()
+            task_count_cache.set(key, total)
+        return total
+
+    return queryset.count()
+
+def update_cached_counts(task: Task, delta: int):
+    for key in task_count_cache.keys():
+        key_filters = dict(key)
+        if not set(key_filters) <= INCREMENTAL_COUNT_FILTERS:
+            task_count_cache.invalidate(key)
+        elif all(getattr(task, field).value in value.split(",") for field, value in key_filters.items()):
+            task_count_cache.update(key, lambda total: total + delta)
+
+def get_tasks_list(db: Session, filters: TaskFilters, sort: TaskSort, skip: int = 0, limit: int = 10, count_strategy: str = "exact", columns: Sequence = TASK_COLUMNS) -> Tuple[List[Row], Optional[int]]:
+    queryset = db.query(*columns)
     queryset = apply_task_filters(queryset, filters)
-    queryset = apply_sorting(queryset, sort.sort_by, sort.sort_order)
-    total = queryset.count()
+    total = count_tasks(queryset, filters, count_strategy)
+    queryset = apply_sorting(queryset, sort.sort_by, sort.sort_order, filters.search)
     tasks = queryset.offset(skip).limit(limit).all()
 
     return (tasks, total)
 
+def get_tasks_page(db: Session, filters: TaskFilters, sort: TaskSort, page: int = 1, limit: int = 10, cursor: Optional[str] = None, count_strategy: str = "exact", includes: Sequence[str] = (), fields: Sequence[str] = ()) -> Tuple[List[Row | dict], dict]:
+    columns = select_task_columns(fields, sort, includes) if fields else TASK_COLUMNS
+    if cursor:
+        tasks, next_cursor, prev_cursor = get_tasks_by_cursor(db, filters, sort, cursor, limit=limit, columns=columns)
+
+        return attach_includes([task._asdict() for task in tasks], includes, db) if includes else tasks, {
+            "limit": limit,
+            "count": len(tasks),
+            "count_strategy": "none",
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor
+        }
+
+    skip = (page - 1) * limit
+    tasks, total_records = get_tasks_list(db, filters, sort, skip=skip, limit=limit, count_strategy=count_strategy, columns=columns)
+
+    # Only an exact total proves there is another page, otherwise a full page is taken to mean there may be
+    if count_strategy == "exact":
+        has_more = skip + len(tasks) < total_records
+    else:
+        has_more = len(tasks) == limit
+
+    return attach_includes([task._asdict() for task in tasks], includes, db) if includes else tasks, {
+        "page": page,
+        "limit": limit,
+        "count": len(tasks),
+        "total": total_records,
+        "total_pages": (math.ceil(total_records / limit) if limit else 1) if total_records is not None else None,
+        "count_strategy": count_strategy,
+        # Lets clients continue from any page in keyset mode
+        "next_cursor": encode_task_cursor(tasks[-1], sort, "next") if tasks and has_more else None,
+        "prev_cursor": encode_task_cursor(tasks[0], sort, "prev") if tasks and page > 1 else None
+    }
+
+def build_task_query(filters: TaskFilters, sort: TaskSort):
+    statement = select(*TASK_COLUMNS)
+    statement = apply_task_filters(statement, filters)
+    return apply_sorting(statement, sort.sort_by, sort.sort_order, filters.search)
+
+def stream_tasks(db: Session, filters: TaskFilters, sort: TaskSort, batch_size: int = 1000) -> Iterator[Sequence]:
+    # yield_per reads through a server-side cursor, so only one batch of rows is ever held in memory
+    statement = build_task_query(filters, sort).execution_options(yield_per=batch_size)
+    yield from db.execute(statement).partitions()
+
+class SyncCursorExpiredError(Exception):
+    """The cursor is older than the tombstone retention, deletes since then may be gone."""
+
+def encode_changes_cursor(version: datetime, task_id: int) -> str:
+    return encode_cursor({"k": "changes", "t": version.isoformat(), "id": task_id})
+
+def decode_changes_cursor(cursor: str) -> Tuple[datetime, int]:
+    data = decode_cursor(cursor)
+    if data.get("k") != "changes" or not isinstance(data.get("id"), int):
+        raise ValueError("Invalid cursor")
+    try:
+        version = datetime.fromisoformat(data.get("t"))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if version.tzinfo is None:
+        raise ValueError("Invalid cursor")
+    return version, data["id"]
+
+# Both seeks run on (version, id) indexes, so a sync reads only the rows changed after the cursor
+def build_changed_tasks_query(position: Optional[Tuple[datetime, int]], limit: int):
+    statement = select(*TASK_COLUMNS).order_by(TASK_VERSION, Task.id).limit(limit)
+    if position:
+        statement = statement.where(tuple_(TASK_VERSION, Task.id) > tuple_(literal(position[0], Task.created_at.type), position[1]))
+    return statement
+
+def build_tombstones_query(position: Tuple[datetime, int], limit: int):
+    return (
+        select(TaskTombstone.deleted_at, TaskTombstone.task_id)
+        .where(tuple_(TaskTombstone.deleted_at, TaskTombstone.task_id) > tuple_(literal(position[0], TaskTombstone.deleted_at.type), position[1]))
+        .order_by(TaskTombstone.deleted_at, TaskTombstone.task_id)
+        .limit(limit)
+    )
+
+def get_task_changes(db: Session, since: Optional[str] = None, limit: int = 100) -> dict:
+    position = decode_changes_cursor(since) if since else None
+    now = db.scalar(select(func.clock_timestamp()))
+    if position and position[0] < now - tombstone_retention():
+        raise SyncCursorExpiredError()
+
+    changes = [(row.updated_on or row.created_at, row.id, row) for row in db.execute(build_changed_tasks_query(position, limit + 1))]
+    # A first sync has nothing to delete locally
+    if position:
+        changes += [(row.deleted_at, row.task_id, None) for row in db.execute(build_tombstones_query(position, limit + 1))]
+
+    changes.sort(key=lambda change: change[:2])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # Changes inside the settle window are sent again on the next sync rather than risk skipping a late commit
+    horizon = (now - timedelta(seconds=settings.task_sync_settle_seconds), 0)
+    last = changes[-1][:2] if changes else position or horizon
+    next_position = min(last, horizon)
+    # Paging stops at the settle window, what is left there comes with the next sync
+    has_more = has_more and last < horizon
+
+    return {
+        "tasks": [row for _, _, row in changes if row is not None],
+        "deleted": [{"id": task_id, "deleted_at": deleted_at} for deleted_at, task_id, row in changes if row is None],
+        "next_cursor": encode_changes_cursor(*next_position),
+        "has_more": has_more,
+    }
+
 def get_total_tasks(db: Session) -> int:
-    return db.query(Task).count()
+    # Every task has exactly one status, so its counters add up to the table
+    statement = select(func.coalesce(func.sum(TaskStat.count), 0)).where(TaskStat.dimension == "status")
+    return db.scalar(statement)
 
-def update_task_details(task_id:int, task_data: UpdateTaskRequestSchema, db: Session) -> bool:
-    task = db.query(Task).filter_by(id=task_id).first()
+def get_task_stats(db: Session) -> dict:
+    # Both reads go over the summary tables, whose size doesn't depend on the number of tasks
+    overdue = select(
+        literal("overdue").label("dimension"), literal("").label("value"), func.coalesce(func.sum(TaskOpenDueCount.count), 0)
+    ).where(TaskOpenDueCount.due_date < func.current_date())
+    counts = (
+        select(TaskStat.dimension, TaskStat.value, func.sum(TaskStat.count))
+        .group_by(TaskStat.dimension, TaskStat.value)
+        .having(func.sum(TaskStat.count) > 0)
+    )
+    statement = counts.union_all(overdue)
 
-    if not task:
+    stats = {
+        "by_status": {status.value: 0 for status in StatusEnum},
+        "by_priority": {priority.value: 0 for priority in PriorityEnum},
+        "by_assignee": [],
+        "overdue": 0,
+    }
+    for dimension, value, count in db.execute(statement):
+        if dimension == "overdue":
+            stats["overdue"] = count
+        elif dimension == "assignee":
+            stats["by_assignee"].append({"assignee_id": int(value) if value else None, "count": count})
+        else:
+            stats[f"by_{dimension}"][value] = count
+
+    stats["total"] = sum(stats["by_status"].values())
+    stats["by_assignee"].sort(key=lambda item: -item["count"])
+    return stats
+
+def update_task_details(task_id:int, task_data: UpdateTaskRequestSchema, db: Session) -> bool:
+    task = save_task_details(task_id, task_data, db)
+    if task is None:
         return False
+    task_cache.set(task_id, task)
+    return True
 
-    # Use dict and setattr to dynamically update only non-None fields
+def save_task_details(task_id:int, task_data: UpdateTaskRequestSchema, db: Session) -> Optional[dict]:
+    # Only the fields sent are updated, and RETURNING hands back the new row in the same round trip
     update_fields = task_data.model_dump(exclude_unset=True, exclude={"id"})
-    for field, value in update_fields.items():
-        setattr(task, field, value)
+    statement = update(Task).where(Task.id == task_id).values(**update_fields).returning(*TASK_COLUMNS)
+    task = db.execute(statement).first()
+
+    if not task:
+        return None
 
     db.commit()
-    db.refresh(task) 
+    # An update can move a task between any cached filter combinations
+    task_count_cache.clear()
 
-    return True
+    return task._asdict()
+
+def invalidate_tasks(versions: Dict[int, int]):
+    for task_id, version in versions.items():
+        task_cache.invalidate(task_id, version)
 
 def remove_task(task_id: int, db: Session) -> bool:
-    task = db.query(Task).filter(Task.id == task_id).first()
+    versions = delete_task_row(task_id, db)
+    invalidate_tasks(versions)
+    return bool(versions)
+
+def delete_task_row(task_id: int, db: Session) -> Dict[int, int]:
+    # The database clock stamps the delete, like updated_on stamps every version the cache compares it with
+    statement = delete(Task).where(Task.id == task_id).returning(Task.id, Task.status, Task.priority, func.clock_timestamp())
+    task = db.execute(statement).first()
     if task:
-        db.delete(task)
         db.commit()
+        update_cached_counts(task, -1)
+        return {task_id: version_us(task[-1])}
+
+    return {}
+
+def id_array(ids: Iterable[int]):
+    # A single array parameter keeps the statement the same whatever the number of ids
+    return any_(bindparam("ids", list(ids), type_=postgresql.ARRAY(Integer)))
+
+def find_existing_user_ids(user_ids: Set[int], db: Session) -> Set[int]:
+    if not user_ids:
+        return set()
+    return set(db.scalars(select(User.id).where(User.id == id_array(user_ids))))
+
+def bulk_create_tasks(tasks_data: List[CreateTaskRequestSchema], db: Session, current_user: User) -> List[dict]:
+    assignee_ids = find_existing_user_ids({t.assignee_id for t in tasks_data if t.assignee_id}, db)
+
+    results = []
+    rows = []
+    for index, task_data in enumerate(tasks_data):
+        if task_data.assignee_id and task_data.assignee_id not in assignee_ids:
+            results.append({"index": index, "status": "failed", "detail": "Assignee not found"})
+            continue
+
+        results.append({"index": index, "status": "created"})
+        rows.append({
+            "name": task_data.name,
+            "description": task_data.description,
+            "created_by_id": current_user.id,
+            "assignee_id": task_data.assignee_id,
+            "due_date": task_data.due_date,
+            "start_date": task_data.start_date,
+            "priority": task_data.priority or PriorityEnum.low
+        })
+
+    if rows:
+        # Multi-row INSERT ... RETURNING, ids come back in the order the rows were sent
+        task_ids = iter(db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).all())
+        for result in results:
+            if result["status"] == "created":
+                result["task_id"] = next(task_ids)
+
+        db.commit()
+        task_count_cache.clear()
+
+    return results
+
+def bulk_update_tasks(tasks_data: List[BulkUpdateTaskItemSchema], db: Session) -> List[dict]:
+    results, versions = update_task_rows(tasks_data, db)
+    invalidate_tasks(versions)
+    return results
+
+def update_task_rows(tasks_data: List[BulkUpdateTaskItemSchema], db: Session) -> Tuple[List[dict], Dict[int, int]]:
+    # The executemany below updates rows grouped by field set, so the rows are locked here first in id order,
+    # otherwise two overlapping batches can each hold a row the other one waits for
+    statement = select(Task.id).where(Task.id == id_array({t.id for t in tasks_data})).order_by(Task.id).with_for_update()
+    task_ids = set(db.scalars(statement))
+    assignee_ids = find_existing_user_ids({t.assignee_id for t in tasks_data if t.assignee_id}, db)
+
+    results = []
+    rows = []
+    for index, task_data in enumerate(tasks_data):
+        if task_data.id not in task_ids:
+            results.append({"index": index, "task_id": task_data.id, "status": "not_found", "detail": "Task not found"})
+            continue
+        if task_data.assignee_id and task_data.assignee_id not in assignee_ids:
+            results.append({"index": index, "task_id": task_data.id, "status": "failed", "detail": "Assignee not found"})
+            continue
+
+        results.append({"index": index, "task_id": task_data.id, "status": "updated"})
+        rows.append({"id": task_data.id, **task_data.model_dump(exclude_unset=True, exclude={"id"})})
+
+    versions = {}
+    if rows:
+        # Bulk UPDATE by primary key, executed as executemany per distinct set of fields
+        db.execute(update(Task), rows)
+        # Bulk updates by primary key can't return rows, the new versions are read while the rows are still locked
+        statement = select(Task.id, Task.updated_on).where(Task.id == id_array({row["id"] for row in rows}))
+        versions = {task_id: version_us(updated_on) for task_id, updated_on in db.execute(statement)}
+        db.commit()
+        task_count_cache.clear()
+
+    return results, versions
+
+def bulk_remove_tasks(task_ids: List[int], db: Session) -> List[dict]:
+    results, versions = delete_task_rows(task_ids, db)
+    invalidate_tasks(versions)
+    return results
+
+def delete_task_rows(task_ids: List[int], db: Session) -> Tuple[List[dict], Dict[int, int]]:
+    statement = delete(Task).where(Task.id == id_array(set(task_ids))).returning(Task.id, func.clock_timestamp())
+    versions = {task_id: version_us(deleted_at) for task_id, deleted_at in db.execute(statement.execution_options(synchronize_session=False))}
+    db.commit()
+    if versions:
+        task_count_cache.clear()
 
-        return True
-    
-    return False
+    results = [
+        {"index": index, "task_id": task_id, "status": "deleted"}
+        if task_id in versions else
+        {"index": index, "task_id": task_id, "status": "not_found", "detail": "Task not found"}
+        for index, task_id in enumerate(task_ids)
+    ]
+    return results, versions
@@ -0,0 +1,210 @@
+from sqlalchemy.engine import make_url
+from starlette.concurrency import run_in_threadpool
+from coe.db.session import SessionLocal
+from coe.schemas.task import TaskFilters, GetTaskResponseSchema
+from coe.services import task_service
+from config import settings
+from typing import AsyncIterator, Optional, Sequence, Tuple
+from datetime import date
+import asyncio
+import asyncpg
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 1
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def in_range(values: Sequence[Optional[str]], start: Optional[date], end: Optional[date]) -> bool:
+    dates = [date.fromisoformat(value) for value in values if value]
+    return any((start is None or value >= start) and (end is None or value <= end) for value in dates)
+
+def matches_overdue(overdue: bool, event: dict) -> bool:
+    today = date.today()
+    if overdue:
+        return any(status != "completed" for status in event["status"]) and any(date.fromisoformat(value) < today for value in event["due_date"])
+    return "completed" in event["status"] or any(date.fromisoformat(value) >= today for value in event["due_date"])
+
+def matches_event(filters: TaskFilters, event: dict) -> bool:
+    # Each field carries its values from before and after the write, a task matching either way is announced.
+    # The trigger sends them as text, like the user ids in filters
+    return (
+        (not filters.status or any(status in event["status"] for status in filters.status.split(","))) and
+        (not filters.priority or any(priority in event["priority"] for priority in filters.priority.split(","))) and
+        (not filters.assignee_id or (None if filters.assignee_id == "none" else filters.assignee_id) in event["assignee_id"]) and
+        (not filters.created_by_id or filters.created_by_id in event["created_by_id"]) and
+        (filters.due_from is None and filters.due_to is None or in_range(event["due_date"], filters.due_from, filters.due_to)) and
+        (filters.start_from is None and filters.start_to is None or in_range(event["start_date"], filters.start_from, filters.start_to)) and
+        (filters.overdue is None or matches_overdue(filters.overdue, event))
+    )
+
+def load_event_task(task_id: int, searches: Sequence[str]) -> Tuple[Optional[dict], dict]:
+    with SessionLocal() as db:
+        return task_service.get_task_event_state(db, task_id, searches)
+
+class TaskSubscription:
+    __slots__ = ("filters", "queue")
+
+    def __init__(self, filters: TaskFilters, queue_size: int):
+        self.filters = filters
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+class TaskEventHub:
+    """LISTENs on the task events channel and fans every event out to the subscribers of this worker.
+
+    Each event loads the task once, whatever the number of subscribers. A subscriber that falls
+    queue_size events behind, or that may have missed events while the listener reconnected,
+    gets None and is expected to catch up from /task/changes.
+    """
+
+    def __init__(self, dsn: str, queue_size: int = 1000, heartbeat_seconds: float = 15):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscriptions = set()
+        self.delivered = 0
+        self.dropped = 0
+        self.listening = False
+        self._pending = None
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._pending = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._dispatch_pending())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._close_all()
+
+    def subscribe(self, filters: TaskFilters) -> TaskSubscription:
+        subscription = TaskSubscription(filters, self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TaskSubscription):
+        self.subscriptions.discard(subscription)
+
+    def _close(self, subscription: TaskSubscription):
+        self.subscriptions.discard(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def _close_all(self):
+        for subscription in list(self.subscriptions):
+            self._close(subscription)
+
+    def _deliver(self, subscription: TaskSubscription, message: str):
+        try:
+            subscription.queue.put_nowait(message)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._close(subscription)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._pending.put_nowait(payload)
+
+    async def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(task_service.TASK_EVENTS_CHANNEL, self._on_notify)
+                self.listening = True
+                # Notifications arrive without any traffic of ours, the ping is what notices a dead connection
+                while True:
+                    await asyncio.sleep(self.heartbeat_seconds)
+                    await connection.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task event listener lost its connection")
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            # Events published while nobody listened are gone
+            self._close_all()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _dispatch_pending(self):
+        while True:
+            payload = await self._pending.get()
+            try:
+                await self.dispatch(payload)
+            except Exception:
+                logger.exception("Failed to dispatch task event")
+
+    async def dispatch(self, payload: str):
+        event = json.loads(payload)
+        if event["event"] != "created":
+            # The writer already dropped both tiers, this keeps the local copies of the other workers from lagging
+            task_service.task_cache.local.invalidate(event["id"])
+
+        targets = [subscription for subscription in list(self.subscriptions) if matches_event(subscription.filters, event)]
+        if not targets:
+            return
+
+        if event["event"] == "deleted":
+            message = format_event("deleted", {"id": event["id"]})
+        else:
+            searches = sorted({subscription.filters.search for subscription in targets if subscription.filters.search})
+            task, search_matches = await run_in_threadpool(load_event_task, event["id"], searches)
+            if task is None:
+                # Deleted in the meantime, its own event follows
+                return
+            targets = [subscription for subscription in targets if not subscription.filters.search or search_matches[subscription.filters.search]]
+            message = format_event(event["event"], GetTaskResponseSchema.model_validate(task).model_dump(mode="json", by_alias=True))
+
+        for subscription in targets:
+            self._deliver(subscription, message)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "listening": self.listening,
+            "subscribers": len(self.subscriptions),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+task_event_hub = TaskEventHub(
+    make_url(settings.async_database_url).set(drivername="postgresql").render_as_string(hide_password=False),
+    queue_size=settings.task_stream_queue_size,
+    heartbeat_seconds=settings.task_stream_heartbeat_seconds,
+)
+
+async def stream_task_events(filters: TaskFilters) -> AsyncIterator[str]:
+    subscription = task_event_hub.subscribe(filters)
+    try:
+        # Sent right away so clients and proxies see the stream open
+        yield ": connected\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), task_event_hub.heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message is None:
+                yield format_event("resync", {})
+                return
+            yield message
+    finally:
+        task_event_hub.unsubscribe(subscription)
@@ -0,0 +1,196 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from coe.db.session import SessionLocal
+from coe.models import RevokedToken
+from coe.utils.bloom_utils import BloomFilter
+from config import settings
+from typing import Dict, Iterable, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows committed this long before the last one seen are read again, so a slow commit from another worker isn't skipped
+SYNC_OVERLAP = timedelta(seconds=5)
+PRUNE_INTERVAL_SECONDS = 60
+
+def token_lifetime() -> timedelta:
+    return timedelta(minutes=max(settings.access_token_expire_minutes, settings.refresh_token_expire_minutes))
+
+class TokenRevocationList:
+    """Revoked token ids and per user cutoffs, mirrored from the revoked_tokens table into every worker.
+
+    A token is checked with a Bloom filter probe and two dict lookups, the exact set is only read on
+    the filter's rare positives. Workers apply their own revocations right away and pick up the
+    others' every sync_seconds. Entries are dropped, and the filter rebuilt, once the tokens they
+    cover have expired.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001, sync_seconds: float = 1):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.tokens: Dict[str, float] = {}
+        self.user_cutoffs: Dict[int, Tuple[float, float]] = {}
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.synced_until: Optional[datetime] = None
+        self.last_pruned = time.monotonic()
+        self.revoked_hits = 0
+        self._lock = threading.Lock()
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def is_revoked(self, claims: dict) -> bool:
+        cutoff = self.user_cutoffs.get(claims.get("user_id"))
+        # Tokens from before revocation existed carry no iat or jti, a user cutoff still covers them
+        if cutoff is not None and claims.get("iat", 0) < cutoff[0]:
+            self.revoked_hits += 1
+            return True
+
+        jti = claims.get("jti")
+        if jti is not None and jti in self.bloom and jti in self.tokens:
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def add_token(self, jti: str, expires_at: float):
+        with self._lock:
+            if jti in self.tokens:
+                return
+            self.tokens[jti] = expires_at
+            if self.bloom.count >= self.bloom.capacity:
+                self._rebuild()
+            else:
+                self.bloom.add(jti)
+
+    def add_user_cutoff(self, user_id: int, issued_before: float, expires_at: float):
+        with self._lock:
+            current = self.user_cutoffs.get(user_id)
+            if current is None or current[0] < issued_before:
+                self.user_cutoffs[user_id] = (issued_before, expires_at)
+
+    def _rebuild(self):
+        # Bloom filters can't forget keys, a fresh one is built from the live set and swapped in
+        bloom = BloomFilter(max(self.capacity, len(self.tokens) * 2), self.error_rate)
+        for jti in self.tokens:
+            bloom.add(jti)
+        self.bloom = bloom
+
+    def prune(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [jti for jti, expires_at in self.tokens.items() if expires_at <= now]
+            for jti in expired:
+                del self.tokens[jti]
+            for user_id in [user_id for user_id, cutoff in self.user_cutoffs.items() if cutoff[1] <= now]:
+                del self.user_cutoffs[user_id]
+            if expired:
+                self._rebuild()
+
+    def apply(self, rows: Iterable[RevokedToken]):
+        for row in rows:
+            if row.jti is not None:
+                self.add_token(row.jti, row.expires_at.timestamp())
+            else:
+                self.add_user_cutoff(row.user_id, row.issued_before.timestamp(), row.expires_at.timestamp())
+            if self.synced_until is None or row.revoked_at > self.synced_until:
+                self.synced_until = row.revoked_at
+
+    def sync(self, db: Session):
+        self.apply(load_revocations(db, self.synced_until - SYNC_OVERLAP if self.synced_until else None))
+
+        if time.monotonic() - self.last_pruned >= PRUNE_INTERVAL_SECONDS:
+            self.last_pruned = time.monotonic()
+            self.prune()
+            prune_revocations(db)
+
+    def _sync_once(self):
+        with SessionLocal() as db:
+            self.sync(db)
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self._sync_once)
+            except Exception:
+                logger.exception("Token revocation sync failed")
+            await asyncio.sleep(self.sync_seconds)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def clear(self):
+        with self._lock:
+            self.tokens.clear()
+            self.user_cutoffs.clear()
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+            self.synced_until = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "tokens": len(self.tokens),
+            "user_cutoffs": len(self.user_cutoffs),
+            "bloom_size_bytes": self.bloom.size // 8,
+            "revoked_hits": self.revoked_hits,
+        }
+
+
+token_revocations = TokenRevocationList(
+    capacity=settings.token_revocation_bloom_capacity,
+    error_rate=settings.token_revocation_error_rate,
+    sync_seconds=settings.token_revocation_sync_seconds,
+)
+
+def load_revocations(db: Session, since: Optional[datetime] = None) -> list:
+    statement = select(RevokedToken).where(RevokedToken.expires_at > datetime.now(timezone.utc))
+    if since is not None:
+        statement = statement.where(RevokedToken.revoked_at >= since)
+    return db.scalars(statement.order_by(RevokedToken.revoked_at)).all()
+
+def prune_revocations(db: Session):
+    db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+
+def revoke_tokens(claims: Iterable[dict], db: Session):
+    rows = [
+        {"jti": token["jti"], "user_id": token.get("user_id"), "expires_at": datetime.fromtimestamp(token["exp"], timezone.utc)}
+        for token in claims
+        if token.get("jti")
+    ]
+    if not rows:
+        return
+
+    db.execute(insert(RevokedToken).values(rows).on_conflict_do_nothing(index_elements=["jti"]))
+    db.commit()
+    for row in rows:
+        token_revocations.add_token(row["jti"], row["expires_at"].timestamp())
+
+def user_revocation(user_id: int) -> dict:
+    # Every token this user holds was issued before now and expires within one token lifetime
+    issued_before = datetime.now(timezone.utc)
+    return {"user_id": user_id, "issued_before": issued_before, "expires_at": issued_before + token_lifetime()}
+
+def apply_user_revocation(revocation: dict):
+    token_revocations.add_user_cutoff(revocation["user_id"], revocation["issued_before"].timestamp(), revocation["expires_at"].timestamp())
+
+def record_user_revocation(user_id: int, db: Session) -> dict:
+    # Part of the caller's transaction, applied locally with apply_user_revocation once that commits
+    revocation = user_revocation(user_id)
+    db.execute(insert(RevokedToken).values(**revocation))
+    return revocation
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from coe.db.session import SessionLocal
+from coe.models.task import TaskTombstone
+from config import settings
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def tombstone_retention() -> timedelta:
+    return timedelta(days=settings.task_tombstone_retention_days)
+
+def prune_task_tombstones(db: Session) -> int:
+    # Sync cursors older than the retention are refused, so no client can still need these rows
+    result = db.execute(delete(TaskTombstone).where(TaskTombstone.deleted_at < func.clock_timestamp() - tombstone_retention()))
+    db.commit()
+    return result.rowcount
+
+class TombstonePruner:
+    """Deletes the tombstones past their retention every interval_seconds, on every worker."""
+
+    def __init__(self, interval_seconds: float = 3600):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def _prune_once(self):
+        with SessionLocal() as db:
+            pruned = prune_task_tombstones(db)
+        if pruned:
+            logger.info("Pruned %d task tombstones", pruned)
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self._prune_once)
+            except Exception:
+                logger.exception("Task tombstone prune failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+tombstone_pruner = TombstonePruner(interval_seconds=settings.task_tombstone_prune_seconds)
@@ -1,32 +1,33 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, delete, select, func, literal, or_
 from coe.models.user import User
+from coe.models.task import Task
+from coe.models.revoked_token import RevokedToken
 from coe.schemas.user import CreateUser, UserLogin, UpdateUser
-from coe.services.auth_service import create_access_token, create_refresh_token
-import bcrypt
+from coe.services.auth_service import create_access_token, create_refresh_token, principal_cache, read_claims
+from coe.services.token_revocation_service import revoke_tokens, record_user_revocation, apply_user_revocation, user_revocation
+from coe.services.password_service import hash_password, verify_password
+from coe.services.task_service import task_cache, task_count_cache, version_us
 
 def create_user(user: CreateUser, db: Session) -> User:
-    hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-    
-    db_user = User(
+    return add_user(user, hash_password(user.password), db)
+
+def add_user(user: CreateUser, hashed_password: str, db: Session) -> User:
+    db_user = db.scalar(insert(User).values(
         first_name=user.first_name,
         last_name=user.last_name,
-        email=user.email, 
+        email=user.email,
         password=hashed_password
-    )
-    db.add(db_user)
+    ).returning(User))
+    # Detached before the commit expires it, so reading it afterwards doesn't reload the row
+    db.expunge(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
-def login_user(login_cred: UserLogin, db: Session) -> dict | None:
-    user = db.query(User).filter_by(email=login_cred.email).first()
-    
-    if not user:
-        return None
+def find_user_by_email(email: str, db: Session) -> User | None:
+    return db.query(User).filter_by(email=email).first()
 
-    if not bcrypt.checkpw(login_cred.password.encode(), user.password.encode()):
-        return None
-    
+def issue_tokens(user: User) -> dict:
     token_data = {"user_id": user.id}
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
@@ -37,30 +38,71 @@ def login_user(login_cred: UserLogin, db: Session) -> dict | None:
         "token_type": "bearer"
     }
 
-def update_user(user_id: int, user_data: UpdateUser, db: Session) -> bool:
-    user = db.query(User).filter_by(id=user_id).first()
+def login_user(login_cred: UserLogin, db: Session) -> dict | None:
+    user = find_user_by_email(login_cred.email, db)
 
     if not user:
-        return False
+        return None
+
+    if not verify_password(login_cred.password, user.password):
+        return None
+
+    return issue_tokens(user)
+
+def logout_user(access_token: str | None, refresh_token: str | None, db: Session):
+    claims = [token for token in (read_claims(access_token), read_claims(refresh_token)) if token is not None]
+    revoke_tokens(claims, db)
+
+def get_user_update_fields(user_data: UpdateUser) -> dict:
+    return user_data.model_dump(exclude_unset=True, exclude={"id"})
+
+def update_user(user_id: int, user_data: UpdateUser, db: Session) -> bool:
+    update_fields = get_user_update_fields(user_data)
+    if "password" in update_fields:
+        update_fields["password"] = hash_password(update_fields["password"])
+
+    return apply_user_update(user_id, update_fields, db)
 
-    # Use dict and setattr to dynamically update only non-None fields
-    update_fields = user_data.model_dump(exclude_unset=True, exclude={"id"})
-    for field, value in update_fields.items():
-        if field == 'password':
-            value = bcrypt.hashpw(value.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        setattr(user, field, value)
+def apply_user_update(user_id: int, update_fields: dict, db: Session) -> bool:
+    statement = update(User).where(User.id == user_id).values(**update_fields).returning(User.id)
+    updated_id = db.scalar(statement)
 
+    if updated_id is None:
+        return False
+
+    # A new password signs the user out of every session
+    revocation = record_user_revocation(user_id, db) if "password" in update_fields else None
     db.commit()
-    db.refresh(user) 
+    principal_cache.invalidate(user_id)
+    if revocation is not None:
+        apply_user_revocation(revocation)
 
     return True
 
 def remove_user(user_id: int, db: Session) -> bool:
-    user = db.query(User).filter(User.id == user_id).first()
-    if user:
-        db.delete(user)
+    # The ON DELETE rules on tasks run in the database. The ids of the tasks they touch are read from the
+    # snapshot before the delete, in the same statement
+    deleted = delete(User).where(User.id == user_id).returning(User.id).cte("deleted_user")
+    # Other workers may still hold the user as a cached principal, its tokens are revoked along with it
+    revocation = user_revocation(user_id)
+    revoked = insert(RevokedToken).from_select(
+        ["user_id", "issued_before", "expires_at"],
+        select(deleted.c.id, literal(revocation["issued_before"]), literal(revocation["expires_at"]))
+    ).cte("revoked_user")
+    task_ids = select(func.array_agg(Task.id)).where(or_(Task.created_by_id == user_id, Task.assignee_id == user_id)).scalar_subquery()
+    # clock_timestamp() is read before the ON DELETE rules run at the end of the statement, so it orders after
+    # every earlier version of these tasks and before the versions the rules stamp
+    row = db.execute(select(deleted.c.id, task_ids, func.clock_timestamp()).add_cte(revoked)).first()
+    if row is not None:
         db.commit()
+        principal_cache.invalidate(user_id)
+        apply_user_revocation(revocation)
+        # Deleting a user cascades to the tasks they created and unassigns the rest
+        if row[1]:
+            task_count_cache.clear()
+        for task_id in row[1] or ():
+            task_cache.invalidate(task_id, version_us(row[2]))
 
         return True
-    
+
     return False
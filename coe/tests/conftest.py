@@ -1,13 +1,22 @@
 import os
 os.environ["ENV"] = "test"
+# Tests exercise the warm-up directly, app startup stays fast
+os.environ["STARTUP_WARMUP"] = "false"
+# Every test client shares one address, the limits get their own tests
+os.environ["RATE_LIMIT_ENABLED"] = "false"
 
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
 from fastapi.testclient import TestClient
 from alembic.config import Config
 from alembic import command
 
 from coe.db.session import get_db
-from coe.db.session import engine, SessionLocal as TestingSessionLocal
+from coe.db.session import get_engine, SessionLocal as TestingSessionLocal
+from coe.services.auth_service import principal_cache
+from coe.services.task_service import task_count_cache, task_cache
+from coe.services.token_revocation_service import token_revocations
 from main import app
 
 @pytest.fixture(scope="session", autouse=True)
@@ -21,9 +30,18 @@ def run_migrations():
         del os.environ["ENV"]
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    principal_cache.clear()
+    task_count_cache.clear()
+    task_cache.clear()
+    token_revocations.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db(request):
-    connection = engine.connect()
+    connection = get_engine().connect()
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
 
@@ -41,6 +59,22 @@ def db(request):
         connection.close()
 
 
+@pytest.fixture
+def count_queries(db):
+    """Context manager collecting the statements sent on the db fixture's connection."""
+    @contextmanager
+    def counter():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    return counter
+
+
 @pytest.fixture(scope="function")
 def client(db):
     def override_get_db():
@@ -0,0 +1,121 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from datetime import date, datetime, timedelta, timezone
+from faker import Faker
+from coe.db.session import get_async_db
+from coe.api.user.async_routes import router as async_user_router
+from coe.api.task.async_routes import router as async_task_router
+from coe.services import task_service
+from coe.services.task_service import encode_changes_cursor
+from coe.utils.cache_utils import InMemoryBackend
+from config import settings
+import pytest
+import threading
+
+fake = Faker()
+
+@pytest.fixture
+def async_client():
+    # Every TestClient runs its own event loop, so connections must not be pooled across tests
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(async_user_router)
+    app.include_router(async_task_router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as c:
+        email = fake.unique.email()
+        c.post("/user/register", json={
+            "firstName": fake.first_name(),
+            "lastName": fake.last_name(),
+            "email": email,
+            "password": "secret123"
+        })
+        login_response = c.post("/user/login", json={"email": email, "password": "secret123"})
+        assert login_response.status_code == 200
+
+        c.cookies.set("access_token", login_response.cookies.get("access_token"))
+        yield c
+
+def test_async_me(async_client: TestClient):
+    res = async_client.get("/user/me")
+    assert res.status_code == 200
+    assert "email" in res.json()
+
+def test_async_task_lifecycle(async_client: TestClient):
+    payload = {
+        "name": "Async Task",
+        "description": "Created through the async stack",
+        "dueDate": str(date.today() + timedelta(days=2)),
+        "priority": "high"
+    }
+    res = async_client.post("/task/add", json=payload)
+    assert res.status_code == 201
+    task_id = res.json()["taskId"]
+
+    res = async_client.get(f"/task/{task_id}")
+    assert res.status_code == 200
+    assert res.json()["name"] == "Async Task"
+    assert async_client.get(f"/task/{task_id}?fields=name").json() == {"id": task_id, "name": "Async Task"}
+
+    stats = async_client.get("/task/stats").json()
+    assert stats["byPriority"]["high"] >= 1 and stats["total"] >= 1
+
+    res = async_client.put(f"/task/{task_id}", json={"status": "completed"})
+    assert res.status_code == 200
+    assert async_client.get(f"/task/{task_id}").json()["status"] == "completed"
+
+    res = async_client.get("/task/list?records_per_page=1")
+    assert res.status_code == 200
+    assert res.json()["pagination"]["count"] == 1
+    assert "description" not in res.json()["tasks"][0]
+
+    res = async_client.get("/task/export?format=csv&status=completed,pending&assigneeId=none&createdById=me")
+    assert res.status_code == 200
+    assert any(line.startswith(f"{task_id},Async Task,") for line in res.text.splitlines())
+
+    assert async_client.delete(f"/task/{task_id}").status_code == 200
+    assert async_client.get(f"/task/{task_id}").status_code == 404
+
+    since = encode_changes_cursor(datetime.now(timezone.utc) - timedelta(minutes=1), 0)
+    res = async_client.get("/task/changes", params={"since": since, "limit": 1000})
+    assert res.status_code == 200
+    assert task_id in [tombstone["id"] for tombstone in res.json()["deleted"]]
+
+    # This app has no lifespan, so the event listener never started
+    assert async_client.get("/task/stream").status_code == 503
+
+def test_async_task_cache_calls_leave_the_event_loop(async_client: TestClient, monkeypatch):
+    class RecordingBackend(InMemoryBackend):
+        threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return super().get(key)
+
+        def set_if_newer(self, key, value, version, ttl_seconds):
+            self.threads.add(threading.get_ident())
+            return super().set_if_newer(key, value, version, ttl_seconds)
+
+    # The portal runs the app's event loop on a thread of its own
+    loop_thread = async_client.portal.call(threading.get_ident)
+    monkeypatch.setattr(task_service.task_cache, "shared", RecordingBackend())
+    task_id = async_client.post("/task/add", json={"name": "Off the loop", "description": "Test", "dueDate": str(date.today())}).json()["taskId"]
+    task_service.task_cache.local.clear()
+    assert async_client.get(f"/task/{task_id}").json()["name"] == "Off the loop"
+    assert async_client.delete(f"/task/{task_id}").status_code == 200
+
+    # A blocking Redis client called from the loop would stall every other request on this worker
+    assert RecordingBackend.threads and loop_thread not in RecordingBackend.threads
+
+def test_async_login_with_wrong_password(async_client: TestClient):
+    res = async_client.post("/user/login", json={"email": fake.unique.email(), "password": "wrongpass"})
+    assert res.status_code == 401
@@ -5,8 +5,8 @@ from starlette.datastructures import Headers
 from starlette.testclient import TestClient
 from fastapi import HTTPException, Request
 from coe.services import auth_service
-from coe.schemas.user import CreateUser
-from coe.services.user_service import create_user
+from coe.schemas.user import CreateUser, UpdateUser
+from coe.services.user_service import create_user, update_user, remove_user
 from config import settings
 from faker import Faker
 
@@ -71,3 +71,41 @@ def test_get_current_user_invalid_token(db):
 
         auth_service.get_current_user(request=request, db=db)
     assert exc.value.status_code == 401
+
+def make_request(token: str) -> StarletteRequest:
+    headers = Headers({"cookie": f"access_token={token}"})
+    return StarletteRequest({"type": "http", "headers": headers.raw})
+
+def test_get_current_user_is_cached(db):
+    user = create_test_user(db)
+    request = make_request(auth_service.create_access_token({"user_id": user.id}))
+    misses = auth_service.principal_cache.misses
+
+    first = auth_service.get_current_user(request=request, db=db)
+    # A cache hit never touches the session
+    second = auth_service.get_current_user(request=request, db=None)
+
+    assert second is first
+    assert second.email == user.email
+    assert second.password is None
+    assert auth_service.principal_cache.misses == misses + 1
+
+def test_get_current_user_cache_invalidated_on_update(db):
+    user = create_test_user(db)
+    request = make_request(auth_service.create_access_token({"user_id": user.id}))
+    auth_service.get_current_user(request=request, db=db)
+
+    update_user(user.id, UpdateUser(first_name="Renamed"), db)
+
+    assert auth_service.get_current_user(request=request, db=db).first_name == "Renamed"
+
+def test_get_current_user_cache_invalidated_on_remove(db):
+    user = create_test_user(db)
+    request = make_request(auth_service.create_access_token({"user_id": user.id}))
+    auth_service.get_current_user(request=request, db=db)
+
+    remove_user(user.id, db)
+
+    with pytest.raises(HTTPException) as exc:
+        auth_service.get_current_user(request=request, db=db)
+    assert exc.value.status_code == 401
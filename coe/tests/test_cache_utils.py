@@ -0,0 +1,104 @@
+from coe.utils.cache_utils import TTLCache, TieredCache, InMemoryBackend
+import time
+
+
+def test_ttl_cache_hit_and_miss_counters():
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_size=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_invalidate():
+    cache = TTLCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
+
+def test_tiered_cache_fills_local_tier_from_shared():
+    shared = InMemoryBackend()
+    encode, decode = lambda value: value.encode(), lambda raw: raw.decode()
+    writer = TieredCache(TTLCache(max_size=10, ttl_seconds=60), shared, 60, "t:", encode, decode)
+    reader = TieredCache(TTLCache(max_size=10, ttl_seconds=60), shared, 60, "t:", encode, decode)
+
+    writer.set(1, "one")
+    assert reader.get(1) == "one"
+    assert reader.get(2) is None
+    assert reader.local.get(1) == "one"
+
+    stats = reader.stats()
+    assert stats["shared_hits"] == 1
+    assert stats["shared_misses"] == 1
+
+def test_tiered_cache_invalidate_clears_both_tiers():
+    shared = InMemoryBackend()
+    cache = TieredCache(TTLCache(max_size=10, ttl_seconds=60), shared, 60, "t:", str.encode, bytes.decode)
+
+    cache.set(1, "one")
+    cache.invalidate(1)
+
+    assert cache.get(1) is None
+    assert shared.get("t:1") is None
+
+def test_tiered_cache_survives_shared_backend_errors():
+    class BrokenBackend:
+        def get(self, key):
+            raise ConnectionError
+        set = delete = set_if_newer = get
+
+    cache = TieredCache(TTLCache(max_size=10, ttl_seconds=60), BrokenBackend(), 60, "t:", str.encode, bytes.decode)
+    cache.set(1, "one")
+    cache.local.clear()
+
+    assert cache.get(1) is None
+    assert cache.stats()["shared_errors"] == 2
+
+def test_tiered_cache_keeps_stale_reads_out_of_both_tiers():
+    shared = InMemoryBackend()
+    encode, decode = lambda value: value[1].encode(), lambda raw: (0, raw.decode())
+    cache = TieredCache(TTLCache(max_size=10, ttl_seconds=60), shared, 60, "t:", encode, decode, version=lambda value: value[0])
+
+    cache.set(1, (2, "new"))
+    # A slower writer or reader holding an older version can't replace the newer one
+    cache.set(1, (1, "old"))
+    assert cache.get(1) == (2, "new")
+    cache.local.clear()
+    assert cache.get(1) == (0, "new")
+
+    # A reader on this or another worker that loaded the row before the write can't put it back
+    cache.invalidate(1, 3)
+    cache.set(1, (2, "old"))
+    assert cache.get(1) is None
+    cache.local.clear()
+    assert cache.get(1) is None
+    assert cache.stats()["shared_misses"] == 2
+
+    # One that loaded it afterwards can
+    cache.set(1, (3, "newer"))
+    assert cache.get(1) == (3, "newer")
@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from coe.db.pool import engine_options, configure_engine, pool_stats
+from config import settings
+
+def test_db_health(client: TestClient):
+    res = client.get("/health/db")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["status"] == "ok"
+    assert data["latencyMs"] >= 0
+
+def test_db_pool_stats(client: TestClient):
+    res = client.get("/health/db/pool")
+    assert res.status_code == 200
+    pools = res.json()["pools"]
+    # Engines are created lazily, the async one only once something used it
+    assert "sync" in pools
+    assert pools["sync"]["size"] == settings.db_pool_size
+    assert pools["sync"]["checkedOut"] >= 1
+
+def test_pool_records_checkout_waits():
+    engine = create_engine(settings.database_url, **engine_options())
+    try:
+        with engine.connect():
+            pass
+        with engine.connect():
+            pass
+        stats = pool_stats(engine)
+        assert stats["checkouts"] == 2
+        assert stats["idle"] == 1
+        assert stats["wait_seconds_total"] >= stats["wait_seconds_max"] > 0
+    finally:
+        engine.dispose()
+
+def test_statement_timeout_is_applied(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 1234)
+    engine = create_engine(settings.database_url, **engine_options())
+    try:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "1234ms"
+    finally:
+        engine.dispose()
+
+def test_statement_timeout_with_pgbouncer_is_set_per_transaction(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 1234)
+    monkeypatch.setattr(settings, "db_pgbouncer", True)
+    engine = create_engine(settings.database_url, **engine_options())
+    configure_engine(engine)
+    try:
+        with engine.begin() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "1234ms"
+        # Autobegin on a plain connection fires the same event
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "1234ms"
+    finally:
+        engine.dispose()
@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from datetime import date
+from faker import Faker
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from coe.services.task_service import task_cache
+import os
+import pytest
+import subprocess
+import sys
+
+fake = Faker()
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_metrics_endpoint(client: TestClient):
+    before = sample("http_requests_total", method="GET", route="/hello-world", status="200")
+    client.get("/hello-world")
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in res.text
+    assert "db_pool_checked_out" in res.text
+    assert sample("http_requests_total", method="GET", route="/hello-world", status="200") == before + 1
+
+def test_metrics_record_db_queries_per_route_template(client: TestClient):
+    email = fake.unique.email()
+    client.post("/user/register", json={"firstName": "Metric", "lastName": "User", "email": email, "password": "secret123"})
+    login_response = client.post("/user/login", json={"email": email, "password": "secret123"})
+    client.cookies.set("access_token", login_response.cookies.get("access_token"))
+    task_id = client.post("/task/add", json={"name": "Metric task", "description": "Test", "dueDate": str(date.today())}).json()["taskId"]
+
+    # create_task fills the task cache, a cold read is what hits the database
+    task_cache.clear()
+    count_before = sample("http_request_db_queries_count", method="GET", route="/task/{task_id}")
+    queries_before = sample("http_request_db_queries_sum", method="GET", route="/task/{task_id}")
+    assert client.get(f"/task/{task_id}").status_code == 200
+
+    assert sample("http_request_db_queries_count", method="GET", route="/task/{task_id}") == count_before + 1
+    assert sample("http_request_db_queries_sum", method="GET", route="/task/{task_id}") > queries_before
+
+def test_metrics_expose_cache_counters(client: TestClient):
+    text = client.get("/metrics").text
+    for cache in ("task", "task_count", "principal"):
+        assert f'cache_hits_total{{cache="{cache}"}}' in text
+        assert f'cache_evictions_total{{cache="{cache}"}}' in text
+
+@pytest.mark.rollback
+def test_failed_queries_leave_no_start_time_behind(db):
+    savepoint = db.begin_nested()
+    with pytest.raises(ProgrammingError):
+        db.execute(text("SELECT * FROM missing_table"))
+    savepoint.rollback()
+
+    db.execute(text("SELECT 1"))
+    assert db.connection().info.get("query_started") == []
+
+def test_metrics_merge_workers_in_multiprocess_mode(tmp_path):
+    # The value class is picked when prometheus_client is imported, so every worker is a fresh interpreter
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from coe.utils.metrics_utils import http_requests_total; http_requests_total.labels('GET', '/merged', '200').inc()"
+    scrape = "from prometheus_client import generate_latest; from coe.utils.metrics_utils import metrics_registry; print(generate_latest(metrics_registry()).decode())"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    output = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/merged",status="200"} 2.0' in output
+    assert "db_pool_checked_out" in output
@@ -0,0 +1,60 @@
+from concurrent.futures.process import BrokenProcessPool
+from prometheus_client import REGISTRY
+import os
+import pytest
+from coe.services.password_service import PasswordHasher, PasswordHasherBusyError
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_size=1, retry_after=3)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify_in_pool(hasher):
+    hashed = hasher.hash("secret123")
+
+    assert hashed != "secret123"
+    assert hasher.verify("secret123", hashed) is True
+    assert hasher.verify("wrongpass", hashed) is False
+
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["latency_seconds_total"] > 0
+
+
+def test_rejects_when_queue_is_full(hasher):
+    # Occupy the worker slot and the single queue slot
+    hasher._slots.acquire()
+    hasher._slots.acquire()
+
+    with pytest.raises(PasswordHasherBusyError) as exc:
+        hasher.hash("secret123")
+
+    assert exc.value.retry_after == 3
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_exports_hash_metrics(hasher):
+    before = REGISTRY.get_sample_value("password_hash_duration_seconds_count") or 0
+
+    hasher.hash("secret123")
+
+    assert REGISTRY.get_sample_value("password_hash_duration_seconds_count") == before + 1
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
+
+
+def test_rebuilds_a_broken_pool(hasher):
+    broken = hasher._get_pool()
+
+    # A worker dying mid-task breaks the whole executor
+    with pytest.raises(BrokenProcessPool):
+        hasher._submit(os._exit, 1).result()
+
+    hashed = hasher.hash("secret123")
+
+    assert hasher._pool is not broken
+    assert hasher.verify("secret123", hashed) is True
+    assert hasher.stats()["in_flight"] == 0
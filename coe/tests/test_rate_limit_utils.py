@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from coe.services import rate_limit_service
+from coe.utils import rate_limit_utils
+from coe.utils.cache_utils import InMemoryBackend
+from coe.utils.rate_limit_utils import SlidingWindowLimiter
+from config import settings
+
+
+class BrokenBackend:
+    def incr(self, key, ttl_seconds):
+        raise ConnectionError("down")
+
+    def get(self, key):
+        raise ConnectionError("down")
+
+
+def test_previous_window_counts_for_its_remaining_share(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_utils.time, "time", lambda: now[0])
+    limiter = SlidingWindowLimiter(limit=4, window_seconds=10, shared=InMemoryBackend())
+
+    assert [limiter.hit("client") for _ in range(4)] == [0, 0, 0, 0]
+    assert limiter.hit("client") == 10
+
+    # Halfway into the next window half of the previous five hits, the rejected one included, still count
+    now[0] = 1015.0
+    assert limiter.hit("client") == 0
+    assert limiter.hit("client") == 5
+    assert limiter.hit("other") == 0
+    assert limiter.rejected == 2
+
+
+def test_falls_back_to_local_counters_when_the_backend_fails():
+    limiter = SlidingWindowLimiter(limit=1, window_seconds=60, shared=BrokenBackend())
+
+    assert limiter.hit("client") == 0
+    assert limiter.hit("client") > 0
+    assert limiter.shared_errors == 4
+
+
+def test_async_checks_leave_the_event_loop_for_a_shared_backend(monkeypatch):
+    monkeypatch.setattr(rate_limit_service, "shared_backend", InMemoryBackend())
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    threads = []
+
+    asyncio.run(rate_limit_service.run_check(lambda: threads.append(threading.get_ident())))
+
+    assert threads and threads != [threading.get_ident()]
+
+
+def test_warns_when_several_workers_count_on_their_own(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(rate_limit_service.logger, "warning", lambda message, *args: warnings.append(message))
+    monkeypatch.setattr(rate_limit_service.settings, "rate_limit_enabled", True)
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    monkeypatch.setattr(rate_limit_service, "shared_backend", None)
+    rate_limit_service.warn_if_counted_per_worker()
+    assert not warnings
+
+    # memory:// is no more shared than no backend at all
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setattr(rate_limit_service, "shared_backend", InMemoryBackend())
+    rate_limit_service.warn_if_counted_per_worker()
+    assert len(warnings) == 1
+
+    monkeypatch.setattr(rate_limit_service, "shared_backend", BrokenBackend())
+    rate_limit_service.warn_if_counted_per_worker()
+    assert len(warnings) == 1
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from coe.services import startup_service
+from coe.utils.swagger_utils import write_openapi, load_openapi
+from coe.db.session import get_engine
+from main import app
+
+
+def test_run_startup_warms_every_step(monkeypatch):
+    warmed = []
+    monkeypatch.setattr(startup_service.password_hasher, "warm_up", lambda: warmed.append("bcrypt"))
+    monkeypatch.setattr(startup_service.settings, "db_pool_warm_connections", 2)
+    app.openapi_schema = None
+
+    timings = asyncio.run(startup_service.run_startup(app))
+
+    assert set(timings) == {"openapi", "database", "auth", "total"}
+    assert app.openapi_schema is not None
+    assert warmed == ["bcrypt"]
+    assert get_engine().pool.checkedin() >= 2
+
+
+def test_run_startup_survives_a_failed_step(monkeypatch):
+    def fail():
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(startup_service, "warm_sync_pool", fail)
+    monkeypatch.setattr(startup_service.password_hasher, "warm_up", lambda: None)
+
+    timings = asyncio.run(startup_service.run_startup(app))
+
+    assert "database" in timings
+
+
+def test_prebuilt_openapi_is_served(tmp_path, monkeypatch):
+    path = tmp_path / "openapi.json"
+    write_openapi(app, str(path))
+    app.openapi_schema = None
+    monkeypatch.setattr(startup_service.settings, "openapi_schema_path", str(path))
+
+    startup_service.warm_openapi(app)
+
+    client = TestClient(app)
+    assert client.get("/openapi.json").json() == json.loads(path.read_text())
+
+
+def test_stale_openapi_is_not_loaded(tmp_path):
+    path = tmp_path / "openapi.json"
+    other = FastAPI()
+    other.get("/only-here")(lambda: None)
+    write_openapi(other, str(path))
+
+    assert load_openapi(app, str(path)) is False
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import text
+from coe.services import task_service
+from coe.services.user_service import create_user
+from coe.schemas.user import CreateUser
+from coe.schemas.task import TaskFilters, TaskSort
+from faker import Faker
+
+fake = Faker()
+
+SEED_TASKS = 10000
+
+# Each supported filter and sort combination, with the indexes allowed to serve it
+PLAN_CASES = [
+    ({}, {}, {"tasks_pkey", "ix_tasks_id"}),
+    ({}, {"sort_by": "dueDate"}, {"ix_tasks_due_date_id"}),
+    ({}, {"sort_by": "dueDate", "sort_order": "desc"}, {"ix_tasks_due_date_id"}),
+    ({}, {"sort_by": "startDate"}, {"ix_tasks_start_date_id"}),
+    ({}, {"sort_by": "name"}, {"ix_tasks_name_id"}),
+    ({}, {"sort_by": "priority", "sort_order": "desc"}, {"ix_tasks_priority_id"}),
+    # With evenly spread statuses walking the primary key and filtering is just as cheap
+    ({"status": "pending"}, {}, {"ix_tasks_status_id", "tasks_pkey", "ix_tasks_id"}),
+    ({"status": "pending"}, {"sort_by": "dueDate"}, {"ix_tasks_status_due_date_id", "ix_tasks_open_due_date_id"}),
+    ({"status": "completed"}, {"sort_by": "dueDate", "sort_order": "desc"}, {"ix_tasks_status_due_date_id"}),
+    ({"priority": "high"}, {}, {"ix_tasks_priority_id", "tasks_pkey", "ix_tasks_id"}),
+    ({"priority": "high"}, {"sort_by": "dueDate"}, {"ix_tasks_priority_due_date_id"}),
+]
+
+@pytest.fixture
+def seeded_tasks(db):
+    user = create_user(CreateUser(first_name="Plan", last_name="Seed", email=fake.unique.email(), password="testpassword"), db)
+    db.execute(text("""
+        INSERT INTO tasks (name, description, created_by_id, due_date, start_date, priority, status)
+        SELECT
+            'Plan task ' || g,
+            'Seeded for query plan checks',
+            :user_id,
+            DATE '2025-01-01' + (g % 365),
+            CASE WHEN g % 4 = 0 THEN NULL ELSE DATE '2024-12-01' + (g % 300) END,
+            (ARRAY['low', 'medium', 'high'])[g % 3 + 1]::priority_enum,
+            (ARRAY['pending', 'in_progress', 'completed'])[(g / 3) % 3 + 1]::status_enum
+        FROM generate_series(1, :count) AS g
+    """), {"user_id": user.id, "count": SEED_TASKS})
+    db.execute(text("ANALYZE tasks"))
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+@pytest.mark.rollback
+@pytest.mark.parametrize("filters,sort,expected_indexes", PLAN_CASES)
+def test_task_list_queries_use_an_index(db, seeded_tasks, filters, sort, expected_indexes):
+    statement = task_service.build_task_query(TaskFilters(**filters), TaskSort(**sort)).limit(10)
+    nodes = list(plan_nodes(task_service.explain_plan(db, statement)))
+    node_types = [node["Node Type"] for node in nodes]
+    indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+
+    assert "Seq Scan" not in node_types, node_types
+    assert "Sort" not in node_types, node_types
+    assert indexes & expected_indexes, indexes
+
+@pytest.mark.rollback
+def test_task_search_uses_the_search_index(db, seeded_tasks):
+    statement = task_service.build_task_query(TaskFilters(search="plan task 123"), TaskSort(sort_by="relevance")).limit(10)
+    nodes = list(plan_nodes(task_service.explain_plan(db, statement)))
+
+    assert "Seq Scan" not in [node["Node Type"] for node in nodes]
+    assert "ix_tasks_search_vector" in {node.get("Index Name") for node in nodes}
+
+@pytest.mark.rollback
+def test_task_changes_seek_on_the_version_indexes(db, seeded_tasks):
+    db.execute(text("INSERT INTO task_tombstones (task_id, deleted_at) SELECT -g, now() - g * interval '1 second' FROM generate_series(1, 10000) AS g"))
+    db.execute(text("ANALYZE task_tombstones"))
+    position = (db.scalar(text("SELECT now() - interval '1 minute'")), 0)
+
+    for statement, index in (
+        (task_service.build_changed_tasks_query(position, 101), "ix_tasks_version_id"),
+        (task_service.build_tombstones_query(position, 101), "ix_task_tombstones_deleted_at_task_id"),
+    ):
+        nodes = list(plan_nodes(task_service.explain_plan(db, statement)))
+        assert "Seq Scan" not in [node["Node Type"] for node in nodes]
+        assert index in {node.get("Index Name") for node in nodes}
@@ -1,7 +1,19 @@
+from fastapi.encoders import jsonable_encoder
 from fastapi.testclient import TestClient
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from faker import Faker
+import csv
+import fastapi.routing
+import io
+import json
 import pytest
+from config import settings
+from sqlalchemy.orm import noload
+from coe.models.task import Task
+from coe.schemas.user import CreateUser
+from coe.services.user_service import create_user
+from coe.schemas.task import GetTaskListResponseSchema, GetTaskResponseSchema
+from coe.services.task_service import encode_changes_cursor, TASK_FIELDS
 
 fake = Faker()
 
@@ -107,4 +119,319 @@ def test_get_task_list(auth_client: TestClient):
     data = res.json()
     assert "tasks" in data
     assert "pagination" in data
-    assert data["pagination"]["count"] == 2
\ No newline at end of file
+    assert data["pagination"]["count"] == 2
+
+def test_get_task_list_with_cursor(auth_client: TestClient):
+    tag = fake.unique.lexify("cursor??????")
+    for i in range(3):
+        auth_client.post("/task/add", json={
+            "name": f"{tag} {i}",
+            "description": f"Description {i}",
+            "dueDate": str(date.today() + timedelta(days=i))
+        })
+
+    first = auth_client.get(f"/task/list?records_per_page=2&search={tag}&sortBy=dueDate").json()
+    assert first["pagination"]["nextCursor"] is not None
+
+    res = auth_client.get(f"/task/list?records_per_page=2&search={tag}&sortBy=dueDate&cursor={first['pagination']['nextCursor']}")
+    assert res.status_code == 200
+    data = res.json()
+    assert [t["name"] for t in data["tasks"]] == [f"{tag} 2"]
+    assert data["pagination"]["nextCursor"] is None
+    assert data["pagination"]["prevCursor"] is not None
+
+def test_get_task_list_with_invalid_cursor(auth_client: TestClient):
+    res = auth_client.get("/task/list?cursor=garbage")
+    assert res.status_code == 400
+
+def test_get_task_list_without_count(auth_client: TestClient):
+    res = auth_client.get("/task/list?count_strategy=none")
+    assert res.status_code == 200
+    pagination = res.json()["pagination"]
+    assert pagination["countStrategy"] == "none"
+    assert pagination["total"] is None
+    assert pagination["totalPages"] is None
+
+def test_bulk_task_endpoints(auth_client: TestClient):
+    due_date = str(date.today() + timedelta(days=1))
+    res = auth_client.post("/task/bulk", json=[
+        {"name": "Bulk route 1", "description": "Test", "dueDate": due_date},
+        {"name": "Bulk route 2", "description": "Test", "dueDate": due_date},
+    ])
+    assert res.status_code == 200
+    task_ids = [r["taskId"] for r in res.json()["results"]]
+    assert len(task_ids) == 2
+
+    res = auth_client.put("/task/bulk", json=[{"id": task_ids[0], "status": "completed"}])
+    assert res.json()["results"][0]["status"] == "updated"
+    assert auth_client.get(f"/task/{task_ids[0]}").json()["status"] == "completed"
+
+    res = auth_client.request("DELETE", "/task/bulk", json={"ids": task_ids})
+    assert [r["status"] for r in res.json()["results"]] == ["deleted", "deleted"]
+    assert auth_client.get(f"/task/{task_ids[1]}").status_code == 404
+
+def test_bulk_create_rejects_empty_list(auth_client: TestClient):
+    res = auth_client.post("/task/bulk", json=[])
+    assert res.status_code == 422
+
+def test_export_tasks(auth_client: TestClient):
+    tag = fake.unique.lexify("export??????")
+    for i in range(3):
+        auth_client.post("/task/add", json={
+            "name": f"{tag} {i}",
+            "description": f"Description {i}",
+            "dueDate": str(date.today() + timedelta(days=i))
+        })
+
+    res = auth_client.get(f"/task/export?search={tag}&sortBy=dueDate&sortOrder=desc")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["name"] for row in rows] == [f"{tag} 2", f"{tag} 1", f"{tag} 0"]
+    assert rows[0]["dueDate"] == str(date.today() + timedelta(days=2))
+
+    res = auth_client.get(f"/task/export?format=csv&search={tag}&sortBy=dueDate")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(res.text)))
+    assert [record["name"] for record in records] == [f"{tag} 0", f"{tag} 1", f"{tag} 2"]
+    assert records[0]["status"] == "pending"
+
+def test_get_task_list_filters_by_me(auth_client: TestClient, client: TestClient):
+    tag = fake.unique.lexify("mine??????")
+    me = auth_client.get("/user/me").json()["id"]
+    for i, priority in enumerate(["high", "low", "high"]):
+        auth_client.post("/task/add", json={
+            "name": f"{tag} {i}",
+            "description": "Filter test",
+            "dueDate": str(date.today() - timedelta(days=1 - i)),
+            "priority": priority,
+            "assigneeId": me if i < 2 else None
+        })
+
+    res = auth_client.get(f"/task/list?search={tag}&assigneeId=me&overdue=true&priority=high,medium")
+    assert res.status_code == 200
+    assert [task["name"] for task in res.json()["tasks"]] == [f"{tag} 0"]
+
+    res = auth_client.get(f"/task/export?search={tag}&createdById=me&dueFrom={date.today()}&sortBy=dueDate")
+    assert [json.loads(line)["name"] for line in res.text.splitlines()] == [f"{tag} 1", f"{tag} 2"]
+
+    assert auth_client.get("/task/list?status=done").status_code == 422
+    assert auth_client.get("/task/list?assigneeId=someone").status_code == 422
+
+def test_export_tasks_rejects_unknown_format(auth_client: TestClient):
+    res = auth_client.get("/task/export?format=xml")
+    assert res.status_code == 422
+
+def test_get_task_with_include(auth_client: TestClient):
+    task_id = auth_client.post("/task/add", json={
+        "name": "Include task",
+        "description": "Test",
+        "dueDate": str(date.today())
+    }).json()["taskId"]
+    me = auth_client.get("/user/me").json()
+
+    data = auth_client.get(f"/task/{task_id}?include=createdBy").json()
+    assert data["createdBy"] == {"id": me["id"], "firstName": me["firstName"], "lastName": me["lastName"], "email": me["email"]}
+    assert data["assignee"] is None
+
+    res = auth_client.get("/task/list?include=createdBy,assignee&records_per_page=5")
+    assert res.status_code == 200
+    assert all(task["createdBy"] is not None for task in res.json()["tasks"])
+
+    assert auth_client.get(f"/task/{task_id}?include=password").status_code == 400
+
+def test_get_tasks_with_fields(auth_client: TestClient):
+    tag = fake.unique.lexify("sparse??????")
+    task_id = auth_client.post("/task/add", json={
+        "name": f"{tag} task",
+        "description": "Long description " * 100,
+        "dueDate": str(date.today())
+    }).json()["taskId"]
+
+    task, = auth_client.get(f"/task/list?search={tag}").json()["tasks"]
+    assert "description" not in task and task["name"] == f"{tag} task"
+
+    res = auth_client.get(f"/task/list?search={tag}&fields=status,name&include=createdBy")
+    assert list(res.json()["tasks"][0]) == ["id", "name", "status", "createdBy"]
+
+    full = auth_client.get(f"/task/{task_id}")
+    sparse = auth_client.get(f"/task/{task_id}?fields=dueDate")
+    assert "description" in full.json()
+    assert sparse.json() == {"id": task_id, "dueDate": str(date.today())}
+    assert sparse.headers["ETag"] != full.headers["ETag"]
+
+    assert auth_client.get(f"/task/{task_id}?fields=password").status_code == 400
+    assert auth_client.get("/task/list?fields=password").status_code == 400
+
+def test_task_reads_render_like_the_response_model_path(auth_client: TestClient, db, monkeypatch):
+    tag = fake.unique.lexify("render??????")
+    task_ids = [
+        auth_client.post("/task/add", json={"name": f"{tag} {i}", "description": "Render test", "dueDate": str(date.today())}).json()["taskId"]
+        for i in range(2)
+    ]
+
+    validations, serializations = [], []
+    def counting_model_validate(validate):
+        def model_validate(cls, *args, **kwargs):
+            validations.append(cls)
+            return validate(cls, *args, **kwargs)
+        return classmethod(model_validate)
+    # Also covers the list schemas narrowed by fields=, which subclass GetTaskListResponseSchema
+    for schema in (GetTaskResponseSchema, GetTaskListResponseSchema):
+        monkeypatch.setattr(schema, "model_validate", counting_model_validate(schema.model_validate.__func__))
+
+    serialize_response = fastapi.routing.serialize_response
+    async def counting_serialize_response(*args, **kwargs):
+        serializations.append(kwargs.get("response_content"))
+        return await serialize_response(*args, **kwargs)
+    monkeypatch.setattr(fastapi.routing, "serialize_response", counting_serialize_response)
+
+    single = auth_client.get(f"/task/{task_ids[0]}")
+    listed = auth_client.get(f"/task/list?search={tag}&fields={','.join(TASK_FIELDS)}")
+
+    # One model_validate per request, and FastAPI's response_model pass never runs
+    assert len(validations) == 2
+    assert serializations == []
+
+    # The previous path: ORM objects validated into the model, then encoded by FastAPI. Related users are
+    # only embedded on include=, so they are left unloaded
+    db.expunge_all()
+    tasks = db.query(Task).options(noload("*")).filter(Task.id.in_(task_ids)).order_by(Task.id).all()
+    previous_single = jsonable_encoder(GetTaskResponseSchema.model_validate(tasks[0]), by_alias=True)
+    previous_list = jsonable_encoder(GetTaskListResponseSchema.model_validate({
+        "message": "Task fetched successfully", "tasks": tasks, "pagination": listed.json()["pagination"],
+    }), by_alias=True)
+    # fields= narrows the schema, which also drops the embedded users that weren't included
+    for task in previous_list["tasks"]:
+        del task["assignee"], task["createdBy"]
+    assert single.json() == previous_single
+    assert listed.json() == previous_list
+
+    # Routes returning a plain model still go through it
+    auth_client.put(f"/task/{task_ids[1]}", json={"status": "in_progress"})
+    assert len(serializations) == 1
+
+def test_conditional_reads_see_tasks_unassigned_by_a_user_removal(auth_client: TestClient, db):
+    tag = fake.unique.lexify("unassign??????")
+    assignee = create_user(CreateUser(first_name="Leaving", last_name="User", email=fake.unique.email(), password="secret123"), db)
+    task_id = auth_client.post("/task/add", json={"name": f"{tag} task", "description": "Test", "dueDate": str(date.today()), "assigneeId": assignee.id}).json()["taskId"]
+
+    single_url, list_url = f"/task/{task_id}", f"/task/list?search={tag}"
+    single_etag, list_etag = auth_client.get(single_url).headers["ETag"], auth_client.get(list_url).headers["ETag"]
+    assert auth_client.get(single_url, headers={"If-None-Match": single_etag}).status_code == 304
+
+    # ON DELETE SET NULL rewrites the task in the database, its ETags have to change with it
+    assert auth_client.delete(f"/user/{assignee.id}").status_code == 200
+    single = auth_client.get(single_url, headers={"If-None-Match": single_etag})
+    listed = auth_client.get(list_url, headers={"If-None-Match": list_etag})
+
+    assert single.status_code == 200 and single.json()["assigneeId"] is None
+    assert listed.status_code == 200 and listed.json()["tasks"][0]["assigneeId"] is None
+
+def test_get_task_conditional_requests(auth_client: TestClient):
+    task_id = auth_client.post("/task/add", json={
+        "name": "Conditional task",
+        "description": "Test",
+        "dueDate": str(date.today())
+    }).json()["taskId"]
+
+    res = auth_client.get(f"/task/{task_id}")
+    etag = res.headers["etag"]
+    assert res.headers["last-modified"]
+
+    res = auth_client.get(f"/task/{task_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+
+    auth_client.put(f"/task/{task_id}", json={"status": "completed"})
+    res = auth_client.get(f"/task/{task_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+    assert res.json()["status"] == "completed"
+
+    res = auth_client.get(f"/task/{task_id}?include=createdBy")
+    res = auth_client.get(f"/task/{task_id}?include=createdBy", headers={"If-None-Match": res.headers["etag"]})
+    assert res.status_code == 304
+
+    assert auth_client.get("/task/999999", headers={"If-None-Match": etag}).status_code == 404
+
+def test_get_task_list_conditional_requests(auth_client: TestClient):
+    tag = fake.unique.lexify("etag??????")
+    auth_client.post("/task/add", json={"name": f"{tag} 1", "description": "Test", "dueDate": str(date.today())})
+
+    url = f"/task/list?search={tag}"
+    etag = auth_client.get(url).headers["etag"]
+    assert auth_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert auth_client.get(f"{url}&page=2", headers={"If-None-Match": etag}).status_code == 200
+
+    task_id = auth_client.post("/task/add", json={"name": f"{tag} 2", "description": "Test", "dueDate": str(date.today())}).json()["taskId"]
+    res = auth_client.get(url, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+
+    auth_client.delete(f"/task/{task_id}")
+    assert auth_client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+def sync_all(client: TestClient, since=None) -> dict:
+    tasks, deleted = {}, set()
+    while True:
+        res = client.get("/task/changes", params={"since": since, "limit": 1000} if since else {"limit": 1000})
+        assert res.status_code == 200
+        data = res.json()
+        tasks.update({task["id"]: task for task in data["tasks"]})
+        deleted.update(tombstone["id"] for tombstone in data["deleted"])
+        since = data["nextCursor"]
+        if not data["hasMore"]:
+            return {"tasks": tasks, "deleted": deleted, "cursor": since}
+
+def test_get_task_changes(auth_client: TestClient, monkeypatch):
+    # Nothing commits late here, so the cursor can follow the newest change
+    monkeypatch.setattr(settings, "task_sync_settle_seconds", 0)
+    due_date = str(date.today() + timedelta(days=1))
+    updated_id, removed_id = [
+        auth_client.post("/task/add", json={"name": f"Sync task {i}", "description": "Test", "dueDate": due_date}).json()["taskId"]
+        for i in range(2)
+    ]
+
+    first = sync_all(auth_client)
+    assert {updated_id, removed_id} <= set(first["tasks"])
+    assert not first["deleted"]
+
+    auth_client.put(f"/task/{updated_id}", json={"status": "completed"})
+    auth_client.delete(f"/task/{removed_id}")
+    created_id = auth_client.post("/task/add", json={"name": "Sync task 3", "description": "Test", "dueDate": due_date}).json()["taskId"]
+
+    second = sync_all(auth_client, first["cursor"])
+    assert second["tasks"][updated_id]["status"] == "completed"
+    assert created_id in second["tasks"]
+    assert removed_id in second["deleted"]
+    assert removed_id not in second["tasks"]
+
+def test_get_task_changes_with_invalid_cursor(auth_client: TestClient):
+    res = auth_client.get("/task/changes", params={"since": "not-a-cursor"})
+    assert res.status_code == 400
+
+def test_get_task_changes_with_expired_cursor(auth_client: TestClient):
+    since = encode_changes_cursor(datetime.now(timezone.utc) - timedelta(days=settings.task_tombstone_retention_days + 1), 0)
+    res = auth_client.get("/task/changes", params={"since": since})
+    assert res.status_code == 410
+    assert res.json()["detail"] == "Cursor too old, full resync required"
+
+def test_get_task_stats(auth_client: TestClient):
+    before = auth_client.get("/task/stats").json()
+    auth_client.post("/task/add", json={
+        "name": "Overdue task",
+        "description": "Test",
+        "dueDate": str(date.today() - timedelta(days=1)),
+        "priority": "high"
+    })
+
+    res = auth_client.get("/task/stats")
+    assert res.status_code == 200
+    stats = res.json()
+    assert stats["total"] == before["total"] + 1
+    assert stats["byStatus"]["pending"] == before["byStatus"]["pending"] + 1
+    assert stats["byPriority"]["high"] == before["byPriority"]["high"] + 1
+    assert stats["overdue"] == before["overdue"] + 1
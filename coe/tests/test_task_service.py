@@ -1,13 +1,19 @@
 import pytest
-from datetime import date
+import threading
+from sqlalchemy import event, func, select, text
+from datetime import date, timedelta
+from typing import List
+from coe.db.session import SessionLocal
 from coe.services import task_service
-from coe.services.user_service import create_user
-from coe.models.task import Task, PriorityEnum
+from coe.services.tombstone_service import prune_task_tombstones
+from coe.services.user_service import create_user, remove_user
+from coe.models.task import Task, PriorityEnum, StatusEnum
 from coe.schemas.user import CreateUser
 from faker import Faker
 from coe.schemas.task import (
     CreateTaskRequestSchema,
     UpdateTaskRequestSchema,
+    BulkUpdateTaskItemSchema,
     TaskFilters,
     TaskSort
 )
@@ -58,7 +64,7 @@ def test_find_task_by_id(db, sample_user):
     found_task = task_service.find_task_by_id(task.id, db)
 
     assert found_task is not None
-    assert found_task.id == task.id
+    assert found_task["id"] == task.id
 
 
 def test_get_tasks_list(db, sample_user):
@@ -144,3 +150,532 @@ def test_remove_task_found(db, sample_user):
 def test_remove_task_not_found(db):
     result = task_service.remove_task(99999, db)
     assert result is False, "Removing non-existent task should return False"
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [("dueDate", "asc"), ("startDate", "desc"), ("priority", "asc"), (None, None)])
+def test_get_tasks_by_cursor_walks_every_task_once(db, sample_user, sort_by, sort_order):
+    tag = fake.unique.lexify("cursor??????")
+    db.add_all([
+        Task(
+            name=f"{tag} {i}",
+            description="Cursor test",
+            created_by_id=sample_user.id,
+            due_date=date(2025, 6, 1 + i % 3),
+            start_date=date(2025, 5, 1 + i % 2) if i % 3 else None,
+            priority=list(PriorityEnum)[i % 3]
+        )
+        for i in range(8)
+    ])
+    db.commit()
+
+    filters = TaskFilters(search=tag)
+    sort = TaskSort(sort_by=sort_by, sort_order=sort_order)
+    expected, _ = task_service.get_tasks_list(db, filters, sort, limit=100)
+
+    tasks, _ = task_service.get_tasks_list(db, filters, sort, limit=3)
+    pages = [tasks]
+    next_cursor = task_service.encode_task_cursor(tasks[-1], sort)
+    while next_cursor:
+        tasks, next_cursor, prev_cursor = task_service.get_tasks_by_cursor(db, filters, sort, next_cursor, limit=3)
+        pages.append(tasks)
+
+    assert [t.id for page in pages for t in page] == [t.id for t in expected]
+
+    # Walking back from the last page returns the same pages in reverse
+    tasks, _, prev_cursor = task_service.get_tasks_by_cursor(db, filters, sort, prev_cursor, limit=3)
+    assert [t.id for t in tasks] == [t.id for t in pages[-2]]
+
+
+def test_get_tasks_by_cursor_rejects_cursor_for_other_sort(db, sample_user):
+    task = Task(name="Cursor sort", description="Test", created_by_id=sample_user.id, due_date=date(2025, 6, 1), priority=PriorityEnum.low)
+    db.add(task)
+    db.commit()
+
+    cursor = task_service.encode_task_cursor(task, TaskSort(sort_by="dueDate", sort_order="asc"))
+
+    with pytest.raises(ValueError):
+        task_service.get_tasks_by_cursor(db, TaskFilters(), TaskSort(sort_by="name", sort_order="asc"), cursor)
+    with pytest.raises(ValueError):
+        task_service.get_tasks_by_cursor(db, TaskFilters(), TaskSort(), "not-a-cursor")
+
+
+def test_get_tasks_list_search_ranks_by_relevance(db, sample_user):
+    # Words with digits skip the stemmer, so the typed prefix is never cut short
+    tag = fake.unique.numerify("search######")
+    db.add_all([
+        Task(name="Quarterly report", description=f"Mentions {tag} once", created_by_id=sample_user.id, due_date=date(2025, 6, 1), priority=PriorityEnum.low),
+        Task(name=f"{tag} planning", description=f"All about {tag}", created_by_id=sample_user.id, due_date=date(2025, 6, 2), priority=PriorityEnum.low),
+        Task(name="Unrelated", description="Nothing to see", created_by_id=sample_user.id, due_date=date(2025, 6, 3), priority=PriorityEnum.low),
+    ])
+    db.commit()
+
+    # A partially typed term still matches as a prefix
+    filters = TaskFilters(search=tag[:-2].upper())
+    tasks, total = task_service.get_tasks_list(db, filters, TaskSort(sort_by="relevance"))
+
+    assert total == 2
+    assert [t.name for t in tasks] == [f"{tag} planning", "Quarterly report"]
+
+
+def test_get_tasks_list_search_ignores_query_syntax(db):
+    # Without a single word there is nothing to match
+    _, total = task_service.get_tasks_list(db, TaskFilters(search="&|!():*"), TaskSort())
+    assert total == 0
+
+
+def test_get_tasks_list_search_skips_stopwords(db, sample_user):
+    tag = fake.unique.lexify("stop??????")
+    db.add(Task(name=f"The {tag} handover", description="Pass the keys on", created_by_id=sample_user.id, due_date=date(2025, 6, 1), priority=PriorityEnum.low))
+    db.commit()
+
+    # Stopwords have no lexeme, they neither match nor rule a task out
+    tasks, _ = task_service.get_tasks_list(db, TaskFilters(search=f"the {tag}"), TaskSort())
+    assert [t.name for t in tasks] == [f"The {tag} handover"]
+    _, total = task_service.get_tasks_list(db, TaskFilters(search="the"), TaskSort())
+    assert total == 0
+
+
+def test_get_tasks_list_count_strategies(db, sample_user):
+    tag = fake.unique.lexify("count??????")
+    db.add_all([
+        Task(name=f"{tag} {i}", description="Count test", created_by_id=sample_user.id, due_date=date(2025, 6, 1), priority=PriorityEnum.low)
+        for i in range(3)
+    ])
+    db.commit()
+    filters = TaskFilters(search=tag)
+
+    _, exact = task_service.get_tasks_list(db, filters, TaskSort(), count_strategy="exact")
+    _, estimated = task_service.get_tasks_list(db, filters, TaskSort(), count_strategy="estimated")
+    _, cached = task_service.get_tasks_list(db, filters, TaskSort(), count_strategy="cached")
+    tasks, skipped = task_service.get_tasks_list(db, filters, TaskSort(), count_strategy="none")
+
+    assert exact == cached == 3
+    assert isinstance(estimated, int) and estimated >= 0
+    assert skipped is None
+    assert len(tasks) == 3
+
+
+def test_cached_counts_follow_create_and_remove(db, sample_user):
+    pending = TaskFilters(status="pending")
+    open_tasks = TaskFilters(status="pending,in_progress")
+    searched = TaskFilters(search="anything")
+    _, before = task_service.get_tasks_list(db, pending, TaskSort(), count_strategy="cached")
+    _, open_before = task_service.get_tasks_list(db, open_tasks, TaskSort(), count_strategy="cached")
+    task_service.get_tasks_list(db, searched, TaskSort(), count_strategy="cached")
+
+    task = task_service.create_task(CreateTaskRequestSchema(name="Counted", description="Test", due_date=date(2025, 6, 1)), db, sample_user)
+
+    # Plain status counts are adjusted in place, search counts can't be and are dropped
+    assert task_service.task_count_cache.get(task_service.get_count_cache_key(pending)) == before + 1
+    assert task_service.task_count_cache.get(task_service.get_count_cache_key(open_tasks)) == open_before + 1
+    assert task_service.get_count_cache_key(searched) not in task_service.task_count_cache.keys()
+
+    task_service.remove_task(task.id, db)
+    _, after = task_service.get_tasks_list(db, pending, TaskSort(), count_strategy="cached")
+    assert after == before
+
+
+def test_bulk_create_tasks(db, sample_user):
+    tasks_data = [
+        CreateTaskRequestSchema(name="Bulk 1", description="Test", due_date=date(2025, 6, 1)),
+        CreateTaskRequestSchema(name="Bulk 2", description="Test", due_date=date(2025, 6, 2), assignee_id=999999),
+        CreateTaskRequestSchema(name="Bulk 3", description="Test", due_date=date(2025, 6, 3), priority=PriorityEnum.high),
+    ]
+
+    results = task_service.bulk_create_tasks(tasks_data, db, sample_user)
+
+    assert [r["status"] for r in results] == ["created", "failed", "created"]
+    assert db.get(Task, results[0]["task_id"]).name == "Bulk 1"
+    assert db.get(Task, results[2]["task_id"]).priority == PriorityEnum.high
+    assert "task_id" not in results[1]
+
+
+def test_bulk_update_tasks(db, sample_user):
+    created = task_service.bulk_create_tasks([
+        CreateTaskRequestSchema(name=f"Bulk update {i}", description="Test", due_date=date(2025, 6, 1))
+        for i in range(2)
+    ], db, sample_user)
+    first_id, second_id = (r["task_id"] for r in created)
+
+    results = task_service.bulk_update_tasks([
+        BulkUpdateTaskItemSchema(id=first_id, name="Renamed"),
+        BulkUpdateTaskItemSchema(id=second_id, priority=PriorityEnum.medium),
+        BulkUpdateTaskItemSchema(id=999999, name="Missing"),
+    ], db)
+
+    assert [r["status"] for r in results] == ["updated", "updated", "not_found"]
+    db.expire_all()
+    assert db.get(Task, first_id).name == "Renamed"
+    assert db.get(Task, second_id).priority == PriorityEnum.medium
+    assert db.get(Task, first_id).updated_on is not None
+
+
+def test_bulk_remove_tasks(db, sample_user):
+    created = task_service.bulk_create_tasks([
+        CreateTaskRequestSchema(name="Bulk delete", description="Test", due_date=date(2025, 6, 1))
+    ], db, sample_user)
+    task_id = created[0]["task_id"]
+
+    results = task_service.bulk_remove_tasks([task_id, 999999], db)
+
+    assert [r["status"] for r in results] == ["deleted", "not_found"]
+    assert db.query(Task).filter_by(id=task_id).first() is None
+
+
+def test_get_tasks_page_includes_users_with_constant_queries(db, sample_user):
+    tag = fake.unique.lexify("include??????")
+    filters = TaskFilters(search=tag)
+    sort = TaskSort(sort_by="id")
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+
+    def page_queries(limit):
+        queries.clear()
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+        try:
+            tasks, _ = task_service.get_tasks_page(db, filters, sort, limit=limit, count_strategy="none", includes=["assignee", "createdBy"])
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+        return tasks, len(queries)
+
+    for i in range(10):
+        assignee = create_user(CreateUser(first_name=fake.first_name(), last_name=fake.last_name(), email=fake.unique.email(), password="testpassword"), db)
+        db.add(Task(name=f"{tag} {i}", description="Test", created_by_id=sample_user.id, assignee_id=assignee.id, due_date=date(2025, 6, 1)))
+    db.commit()
+
+    small_page, small_page_queries = page_queries(2)
+    full_page, full_page_queries = page_queries(10)
+
+    assert small_page_queries == full_page_queries == 2
+    assert len({task["assignee"]["id"] for task in full_page}) == 10
+    assert all(task["created_by"]["email"] == sample_user.email for task in full_page)
+
+
+def test_parse_includes_rejects_unknown_names():
+    assert task_service.parse_includes("created_by,assignee,assignee") == ["createdBy", "assignee"]
+    with pytest.raises(ValueError):
+        task_service.parse_includes("password")
+
+
+def test_get_tasks_page_selects_only_requested_fields(db, sample_user, count_queries):
+    tag = fake.unique.lexify("fields??????")
+    for i in range(3):
+        db.add(Task(name=f"{tag} {i}", description="x" * 5000, created_by_id=sample_user.id, due_date=date(2025, 6, i + 1)))
+    db.commit()
+    filters = TaskFilters(search=tag)
+    sort = TaskSort(sort_by="dueDate")
+    fields = task_service.parse_fields("name, status", task_service.LIST_FIELDS)
+    assert fields == ("id", "name", "status")
+
+    with count_queries() as statements:
+        tasks, pagination = task_service.get_tasks_page(db, filters, sort, limit=2, count_strategy="none", fields=fields)
+        task_service.get_tasks_by_cursor(db, filters, sort, pagination["next_cursor"], columns=task_service.select_task_columns(fields, sort))
+
+    # The sort column is read for the cursor, the description never is
+    assert tasks[0]._fields == ("id", "name", "due_date", "status")
+    assert not any("description" in statement for statement in statements)
+
+
+def test_parse_fields_defaults_and_rejects_unknown_names():
+    assert task_service.parse_fields(None, task_service.LIST_FIELDS) == task_service.LIST_FIELDS
+    assert "description" not in task_service.LIST_FIELDS
+    assert task_service.parse_fields("") == ()
+    with pytest.raises(ValueError):
+        task_service.parse_fields("name,password")
+
+
+def test_find_task_by_id_is_read_through_and_invalidated_on_update(db, sample_user):
+    task = task_service.create_task(CreateTaskRequestSchema(name="Cached Task", description="Test", due_date=date(2025, 6, 1)), db, sample_user)
+    task_service.task_cache.clear()
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        first = task_service.find_task_by_id(task.id, db)
+        cold_queries = len(queries)
+        second = task_service.find_task_by_id(task.id, db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert cold_queries == 1
+    assert len(queries) == 1
+    assert first == second
+
+    task_service.update_task_details(task.id, UpdateTaskRequestSchema(name="Renamed Task"), db)
+    assert task_service.find_task_by_id(task.id, db)["name"] == "Renamed Task"
+
+    task_service.remove_task(task.id, db)
+    assert task_service.find_task_by_id(task.id, db) is None
+
+
+def test_get_task_changes_pages_through_updates_and_tombstones(db, sample_user, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "task_sync_settle_seconds", 0)
+    created = task_service.bulk_create_tasks([
+        CreateTaskRequestSchema(name=f"Delta {i}", description="Test", due_date=date(2025, 6, 1)) for i in range(4)
+    ], db, sample_user)
+    task_ids = [result["task_id"] for result in created]
+
+    changes = task_service.get_task_changes(db, limit=1000)
+    while changes["has_more"]:
+        changes = task_service.get_task_changes(db, since=changes["next_cursor"], limit=1000)
+    cursor = changes["next_cursor"]
+
+    task_service.bulk_update_tasks([BulkUpdateTaskItemSchema(id=task_ids[0], status="completed")], db)
+    task_service.bulk_remove_tasks(task_ids[1:3], db)
+
+    seen_tasks, seen_deleted = {}, set()
+    while True:
+        changes = task_service.get_task_changes(db, since=cursor, limit=2)
+        assert len(changes["tasks"]) + len(changes["deleted"]) <= 2
+        seen_tasks.update({task.id: task for task in changes["tasks"]})
+        seen_deleted.update(tombstone["id"] for tombstone in changes["deleted"])
+        cursor = changes["next_cursor"]
+        if not changes["has_more"]:
+            break
+
+    assert seen_tasks[task_ids[0]].status.value == "completed"
+    assert set(task_ids[1:3]) <= seen_deleted
+    assert not set(task_ids[1:3]) & set(seen_tasks)
+
+
+def test_get_task_changes_includes_tasks_unassigned_by_a_user_removal(db, sample_user, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "task_sync_settle_seconds", 0)
+    assignee = create_user(CreateUser(first_name="Gone", last_name="Soon", email=fake.unique.email(), password="testpassword"), db)
+    task = task_service.create_task(CreateTaskRequestSchema(name="Orphaned", description="Test", due_date=date(2025, 6, 1), assignee_id=assignee.id), db, sample_user)
+    since = task_service.get_task_changes(db, since=task_service.encode_changes_cursor(task.created_at, task.id))["next_cursor"]
+
+    # ON DELETE SET NULL is a write SQLAlchemy never sees, the trigger still moves the version
+    remove_user(assignee.id, db)
+    changes = task_service.get_task_changes(db, since=since)
+
+    assert [(t.id, t.assignee_id) for t in changes["tasks"]] == [(task.id, None)]
+
+
+def test_get_task_changes_stops_paging_at_the_settle_window(db, sample_user, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "task_sync_settle_seconds", 3600)
+    since = task_service.encode_changes_cursor(db.scalar(select(func.clock_timestamp())) - timedelta(days=1), 0)
+    task_service.bulk_create_tasks([
+        CreateTaskRequestSchema(name=f"Settling {i}", description="Test", due_date=date(2025, 6, 1)) for i in range(3)
+    ], db, sample_user)
+
+    changes = task_service.get_task_changes(db, since=since, limit=1)
+    version, _ = task_service.decode_changes_cursor(changes["next_cursor"])
+
+    # The cursor never moves into the window, the rest of it comes with a later sync
+    assert changes["has_more"] is False
+    assert version <= db.scalar(select(func.clock_timestamp())) - timedelta(hours=1)
+
+
+def test_get_task_changes_refuses_cursors_past_the_tombstone_retention(db, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "task_tombstone_retention_days", 30)
+    since = task_service.encode_changes_cursor(db.scalar(select(func.clock_timestamp())) - timedelta(days=31), 0)
+
+    with pytest.raises(task_service.SyncCursorExpiredError):
+        task_service.get_task_changes(db, since=since)
+
+
+def test_prune_task_tombstones_keeps_the_retention(db, monkeypatch):
+    monkeypatch.setattr(task_service.settings, "task_tombstone_retention_days", 30)
+    db.execute(text("""
+        INSERT INTO task_tombstones (task_id, deleted_at)
+        VALUES (-1, clock_timestamp() - interval '31 days'), (-2, clock_timestamp() - interval '29 days')
+    """))
+
+    assert prune_task_tombstones(db) >= 1
+    assert db.scalars(text("SELECT task_id FROM task_tombstones WHERE task_id < 0")).all() == [-2]
+
+
+def test_get_task_changes_rejects_other_cursors(db):
+    with pytest.raises(ValueError):
+        task_service.get_task_changes(db, since=task_service.encode_cursor({"s": None, "o": "asc", "v": 1, "id": 1, "d": "next"}))
+
+
+def test_task_mutations_are_single_statements(db, sample_user, count_queries):
+    with count_queries() as statements:
+        task = task_service.create_task(CreateTaskRequestSchema(name="One trip", description="Test", due_date=date(2025, 6, 1)), db, sample_user)
+    assert len(statements) == 1
+    assert task.id is not None and task.created_at is not None and task.priority == PriorityEnum.low
+
+    with count_queries() as statements:
+        assert task_service.update_task_details(task.id, UpdateTaskRequestSchema(status="completed"), db) is True
+    assert len(statements) == 1
+    # The returned row refreshed the cache, so the next read needs no query
+    with count_queries() as statements:
+        assert task_service.find_task_by_id(task.id, db)["status"].value == "completed"
+    assert not statements
+
+    with count_queries() as statements:
+        assert task_service.remove_task(task.id, db) is True
+    assert len(statements) == 1
+
+    with count_queries() as statements:
+        assert task_service.update_task_details(task.id, UpdateTaskRequestSchema(name="Gone"), db) is False
+        assert task_service.remove_task(task.id, db) is False
+    assert len(statements) == 2
+
+
+def exact_task_stats(db) -> dict:
+    stats = {
+        "by_status": dict(db.query(Task.status, func.count()).group_by(Task.status).all()),
+        "by_priority": dict(db.query(Task.priority, func.count()).group_by(Task.priority).all()),
+        "by_assignee": dict(db.query(Task.assignee_id, func.count()).group_by(Task.assignee_id).all()),
+        "overdue": db.query(Task).filter(Task.status != StatusEnum.completed, Task.due_date < func.current_date()).count(),
+    }
+    return {
+        "by_status": {status.value: stats["by_status"].get(status, 0) for status in StatusEnum},
+        "by_priority": {priority.value: stats["by_priority"].get(priority, 0) for priority in PriorityEnum},
+        "by_assignee": stats["by_assignee"],
+        "overdue": stats["overdue"],
+    }
+
+
+def test_task_stats_follow_every_write_path(db, sample_user):
+    assignee = create_user(CreateUser(first_name="Stats", last_name="User", email=fake.unique.email(), password="testpassword"), db)
+    overdue = task_service.create_task(CreateTaskRequestSchema(name="Late", description="Test", due_date=date(2020, 1, 1), priority="high"), db, sample_user)
+    results = task_service.bulk_create_tasks([
+        CreateTaskRequestSchema(name=f"Bulk {i}", description="Test", due_date=date(2099, 1, 1), assignee_id=assignee.id)
+        for i in range(3)
+    ], db, sample_user)
+    task_service.update_task_details(overdue.id, UpdateTaskRequestSchema(assignee_id=assignee.id), db)
+    task_service.bulk_update_tasks([BulkUpdateTaskItemSchema(id=results[0]["task_id"], status="completed", priority="medium")], db)
+    task_service.remove_task(results[1]["task_id"], db)
+
+    def check():
+        stats = task_service.get_task_stats(db)
+        exact = exact_task_stats(db)
+        assert stats["by_status"] == exact["by_status"]
+        assert stats["by_priority"] == exact["by_priority"]
+        assert {item["assignee_id"]: item["count"] for item in stats["by_assignee"]} == exact["by_assignee"]
+        assert stats["overdue"] == exact["overdue"] >= 1
+        assert stats["total"] == task_service.get_total_tasks(db) == db.query(Task).count()
+        return stats
+
+    stats = check()
+    assert {"assignee_id": assignee.id, "count": 3} in stats["by_assignee"]
+
+    # Deleting the user unassigns its tasks in the database, the trigger still sees it
+    remove_user(assignee.id, db)
+    stats = check()
+    assert assignee.id not in [item["assignee_id"] for item in stats["by_assignee"]]
+
+
+def test_task_stats_survive_concurrent_bulk_updates():
+    statuses, priorities = list(StatusEnum), list(PriorityEnum)
+    # Both writers need their own committed connections, so nothing here goes through the db fixture
+    with SessionLocal() as db:
+        user = create_user(CreateUser(first_name="Concurrent", last_name="Writer", email=fake.unique.email(), password="testpassword"), db)
+        task_ids = [result["task_id"] for result in task_service.bulk_create_tasks([
+            CreateTaskRequestSchema(name=f"Concurrent {i}", description="Test", due_date=date(2020, 1, 1)) for i in range(20)
+        ], db, user)]
+
+    barrier = threading.Barrier(2)
+
+    def writer(order: List[int], errors: list):
+        barrier.wait()
+        try:
+            for round in range(10):
+                # Mixed field sets split each batch into several UPDATE statements
+                items = [
+                    BulkUpdateTaskItemSchema(id=task_id, status=statuses[(round + i) % 3].value) if i % 2 else
+                    BulkUpdateTaskItemSchema(id=task_id, priority=priorities[(round + i) % 3].value)
+                    for i, task_id in enumerate(order)
+                ]
+                with SessionLocal() as db:
+                    task_service.bulk_update_tasks(items, db)
+        except Exception as e:
+            errors.append(e)
+
+    errors = []
+    threads = [threading.Thread(target=writer, args=(order, errors)) for order in (task_ids, task_ids[::-1])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    try:
+        assert not errors, errors
+        with SessionLocal() as db:
+            stats = task_service.get_task_stats(db)
+            exact = exact_task_stats(db)
+            assert stats["by_status"] == exact["by_status"]
+            assert stats["by_priority"] == exact["by_priority"]
+            assert stats["overdue"] == exact["overdue"]
+    finally:
+        with SessionLocal() as db:
+            remove_user(user.id, db)
+
+
+def test_task_stats_read_only_the_summary_tables(db, count_queries):
+    with count_queries() as statements:
+        task_service.get_task_stats(db)
+    assert len(statements) == 1
+    assert " tasks" not in statements[0]
+
+
+def test_task_filters_parse_lists_and_me():
+    filters = TaskFilters(status=" Completed,pending,pending", priority="high", assignee_id="ME")
+    assert filters.status == "pending,completed"
+    assert filters.assignee_id == "me"
+    assert task_service.resolve_task_filters(filters, 7).assignee_id == "7"
+
+    for invalid in ({"status": "done"}, {"assignee_id": "0"}, {"created_by_id": "none"}):
+        with pytest.raises(ValueError):
+            TaskFilters(**invalid)
+
+
+def test_get_tasks_list_combines_filters(db, sample_user):
+    other = create_user(CreateUser(first_name="Other", last_name="User", email=fake.unique.email(), password="testpassword"), db)
+    today = date.today()
+    tag = fake.unique.lexify("filter??????")
+    rows = [
+        ("overdue high", sample_user.id, today.replace(year=today.year - 1), None, PriorityEnum.high, StatusEnum.pending),
+        ("overdue done", sample_user.id, today.replace(year=today.year - 1), None, PriorityEnum.high, StatusEnum.completed),
+        ("later low", other.id, today.replace(year=today.year + 1), today, PriorityEnum.low, StatusEnum.in_progress),
+        ("unassigned", None, today, today.replace(year=today.year + 1), PriorityEnum.medium, StatusEnum.pending),
+    ]
+    db.add_all([
+        Task(name=f"{tag} {name}", description="Filter test", created_by_id=other.id if name == "later low" else sample_user.id,
+             assignee_id=assignee_id, due_date=due_date, start_date=start_date, priority=priority, status=status)
+        for name, assignee_id, due_date, start_date, priority, status in rows
+    ])
+    db.commit()
+
+    def names(**filters) -> list:
+        tasks, total = task_service.get_tasks_list(db, TaskFilters(search=tag, **filters), TaskSort(sort_by="name"))
+        assert total == len(tasks)
+        return [task.name.removeprefix(f"{tag} ") for task in tasks]
+
+    assert names(assignee_id=str(sample_user.id), overdue=True, priority="high") == ["overdue high"]
+    assert names(overdue=False) == ["later low", "overdue done", "unassigned"]
+    assert names(status="pending,in_progress") == ["later low", "overdue high", "unassigned"]
+    assert names(assignee_id="none") == ["unassigned"]
+    assert names(created_by_id=str(other.id)) == ["later low"]
+    assert names(due_from=today, due_to=today) == ["unassigned"]
+    assert names(start_from=today) == ["later low", "unassigned"]
+    assert names(start_to=today) == ["later low"]
+
+
+def index_conditions(plan: dict) -> List[str]:
+    conditions = [plan["Index Cond"]] if "Index Cond" in plan else []
+    for child in plan.get("Plans", []):
+        conditions += index_conditions(child)
+    return conditions
+
+
+@pytest.mark.parametrize("filters, column", [
+    ({"status": "in_progress,completed"}, "status"),
+    ({"priority": "high"}, "priority"),
+    ({"assignee_id": "1"}, "assignee_id"),
+    ({"assignee_id": "none"}, "assignee_id"),
+    ({"created_by_id": "1"}, "created_by_id"),
+    ({"due_from": date(2025, 1, 1), "due_to": date(2025, 2, 1)}, "due_date"),
+    ({"start_from": date(2025, 1, 1)}, "start_date"),
+    ({"overdue": True}, "due_date"),
+])
+def test_task_filters_are_index_conditions(db, filters, column):
+    # The test table is tiny, so sequential scans are priced out to see whether an index can take the filter
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    statement = task_service.apply_task_filters(select(Task.id), TaskFilters(**filters))
+    plan = task_service.explain_plan(db, statement)
+    assert any(column in condition for condition in index_conditions(plan)), plan
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import pytest
+from datetime import date
+from faker import Faker
+from coe.db.session import SessionLocal
+from coe.schemas.task import CreateTaskRequestSchema, UpdateTaskRequestSchema, TaskFilters
+from coe.schemas.user import CreateUser
+from coe.services import task_service
+from coe.services.user_service import create_user, remove_user
+from coe.services.task_stream_service import TaskEventHub, task_event_hub, stream_task_events, matches_event
+
+fake = Faker()
+
+def deleted_event(task_id: int, priority: str) -> str:
+    return json.dumps({"event": "deleted", "id": task_id, "status": ["pending"], "priority": [priority]})
+
+def updated_event(**fields) -> dict:
+    event = {"event": "updated", "id": 1, "status": ["pending"], "priority": ["low"], "assignee_id": [None],
+             "created_by_id": ["1"], "due_date": ["2025-06-01"], "start_date": [None]}
+    return {**event, **fields}
+
+async def next_message(subscription, timeout: float = 5) -> str:
+    return await asyncio.wait_for(subscription.queue.get(), timeout)
+
+async def wait_until_listening(hub: TaskEventHub):
+    for _ in range(100):
+        if hub.listening:
+            return
+        await asyncio.sleep(0.05)
+    pytest.fail("Task event listener did not connect")
+
+def test_task_events_reach_matching_subscribers():
+    tag = fake.unique.lexify("stream??????")
+
+    def write(fn, *args):
+        # Events are only sent on commit, so these writes go through their own committed sessions
+        with SessionLocal() as db:
+            return fn(*args, db)
+
+    async def scenario():
+        hub = TaskEventHub(task_event_hub.dsn, queue_size=10, heartbeat_seconds=1)
+        await hub.start()
+        user = await asyncio.to_thread(write, create_user, CreateUser(first_name="Stream", last_name="User", email=fake.unique.email(), password="testpassword"))
+        try:
+            await wait_until_listening(hub)
+            pending = hub.subscribe(TaskFilters(status="pending"))
+            completed = hub.subscribe(TaskFilters(status="completed"))
+            searched = hub.subscribe(TaskFilters(search=tag))
+            unmatched = hub.subscribe(TaskFilters(search=fake.unique.lexify("nomatch??????")))
+            created_by = hub.subscribe(TaskFilters(created_by_id=str(user.id), assignee_id="none"))
+            other_creator = hub.subscribe(TaskFilters(created_by_id=str(user.id + 1)))
+
+            task = await asyncio.to_thread(write, lambda db: task_service.create_task(
+                CreateTaskRequestSchema(name=f"{tag} task", description="Test", due_date=date(2025, 6, 1)), db, user
+            ))
+            message = await next_message(pending)
+            assert message.startswith("event: created\n")
+            assert f'"id":{task.id}' in message
+            assert await next_message(searched) == message
+            # Matched against the payload the trigger actually sent
+            assert await next_message(created_by) == message
+            assert other_creator.queue.empty()
+
+            await asyncio.to_thread(write, lambda db: task_service.update_task_details(task.id, UpdateTaskRequestSchema(status="completed"), db))
+            # A task leaving a filter is still announced to it
+            assert (await next_message(pending)).startswith("event: updated\n")
+            assert '"status":"completed"' in await next_message(completed)
+
+            await asyncio.to_thread(write, lambda db: task_service.remove_task(task.id, db))
+            assert await next_message(completed) == f'event: deleted\ndata: {{"id":{task.id}}}\n\n'
+
+            assert pending.queue.empty()
+            # Deleted tasks can't be searched anymore, so deletes skip the search filter
+            assert (await next_message(unmatched)).startswith("event: deleted\n")
+            assert unmatched.queue.empty()
+        finally:
+            await hub.stop()
+            await asyncio.to_thread(write, lambda db: remove_user(user.id, db))
+
+    asyncio.run(scenario())
+
+def test_task_event_hub_resyncs_slow_subscribers():
+    async def scenario():
+        hub = TaskEventHub("postgresql://unused", queue_size=1)
+        subscription = hub.subscribe(TaskFilters())
+        for task_id in (1, 2):
+            await hub.dispatch(deleted_event(task_id, "low"))
+
+        assert await next_message(subscription) is None
+        assert not hub.subscriptions
+        assert hub.stats()["dropped"] == 1
+
+    asyncio.run(scenario())
+
+def test_stream_task_events_unsubscribes_on_close():
+    async def scenario():
+        stream = stream_task_events(TaskFilters(priority="high"))
+        assert await anext(stream) == ": connected\n\n"
+        subscription, = task_event_hub.subscriptions
+
+        await task_event_hub.dispatch(deleted_event(1, "low"))
+        await task_event_hub.dispatch(deleted_event(2, "high"))
+        assert await anext(stream) == 'event: deleted\ndata: {"id":2}\n\n'
+
+        await stream.aclose()
+        assert subscription not in task_event_hub.subscriptions
+
+    asyncio.run(scenario())
+
+def test_matches_event_checks_every_filter_against_old_and_new_values():
+    reassigned = updated_event(assignee_id=[None, "5"], status=["pending", "completed"], due_date=["2025-06-01", "2999-01-01"])
+
+    assert matches_event(TaskFilters(status="completed,in_progress", assignee_id="5"), reassigned)
+    assert matches_event(TaskFilters(assignee_id="none", created_by_id="1"), reassigned)
+    assert not matches_event(TaskFilters(assignee_id="6"), reassigned)
+    assert matches_event(TaskFilters(due_from=date(2025, 6, 1), due_to=date(2025, 6, 1)), reassigned)
+    assert not matches_event(TaskFilters(start_from=date(2025, 1, 1)), reassigned)
+    assert matches_event(TaskFilters(overdue=True), reassigned)
+    assert not matches_event(TaskFilters(overdue=True), updated_event(status=["completed"]))
+    assert not matches_event(TaskFilters(overdue=False), updated_event())
@@ -0,0 +1,46 @@
+import time
+from uuid import uuid4
+from coe.utils.bloom_utils import BloomFilter
+from coe.services.auth_service import create_access_token, decode_claims
+from coe.services.token_revocation_service import TokenRevocationList, token_revocations, revoke_tokens
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [uuid4().hex for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_list_prunes_expired_tokens():
+    revocations = TokenRevocationList(capacity=2)
+    now = time.time()
+    revocations.add_token("expired", now - 1)
+    revocations.add_token("live", now + 60)
+    # Past capacity the filter is rebuilt larger instead of degrading
+    revocations.add_token("another", now + 60)
+    revocations.add_user_cutoff(7, now, now - 1)
+
+    revocations.prune(now)
+
+    assert set(revocations.tokens) == {"live", "another"}
+    assert "expired" not in revocations.bloom
+    assert not revocations.user_cutoffs
+    assert revocations.is_revoked({"jti": "live"})
+    assert not revocations.is_revoked({"jti": "expired"})
+
+
+def test_revocations_are_synced_from_the_database(db):
+    claims = decode_claims(create_access_token({"user_id": 1}))
+    revoke_tokens([claims], db)
+    assert token_revocations.is_revoked(claims)
+
+    # A worker that didn't see the logout picks it up from the table
+    other_worker = TokenRevocationList()
+    assert not other_worker.is_revoked(claims)
+    other_worker.sync(db)
+    assert other_worker.is_revoked(claims)
@@ -1,5 +1,9 @@
 from faker import Faker
 from fastapi.testclient import TestClient
+from coe.services import password_service, rate_limit_service
+from coe.services.auth_service import decode_claims
+from coe.services.token_revocation_service import TokenRevocationList
+from coe.utils.rate_limit_utils import SlidingWindowLimiter
 
 faker = Faker()
 
@@ -83,3 +87,75 @@ def test_refresh_token(client: TestClient):
 
     assert response.status_code == 200
     assert "accessToken" in response.json()
+
+
+def test_login_returns_503_when_hashing_queue_is_full(client: TestClient, monkeypatch):
+    _, email, password = register_user(client, "busy1234")
+
+    busy_hasher = password_service.PasswordHasher(workers=1, queue_size=0, retry_after=2)
+    busy_hasher._slots.acquire()
+    monkeypatch.setattr(password_service, "password_hasher", busy_hasher)
+
+    response = client.post("/user/login", json={"email": email, "password": password})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_logout_revokes_access_and_refresh_tokens(client: TestClient):
+    _, email, password = register_user(client, "logout123")
+    access_token, refresh_token = login_user(client, email, password)
+
+    response = client.post("/user/logout", cookies={"access_token": access_token, "refresh_token": refresh_token})
+    assert response.status_code == 200
+
+    response = client.get("/user/me", cookies={"access_token": access_token})
+    assert response.status_code == 401
+    response = client.post("/user/token/refresh", cookies={"refresh_token": refresh_token})
+    assert response.status_code == 403
+
+
+def test_password_change_revokes_every_token_of_the_user(client: TestClient):
+    user_id, email, password = register_user(client, "before123")
+    access_token, refresh_token = login_user(client, email, password)
+    other_session, _ = login_user(client, email, password)
+
+    response = client.put(f"/user/{user_id}", json={"password": "after1234"}, cookies={"access_token": access_token})
+    assert response.status_code == 200
+
+    assert client.get("/user/me", cookies={"access_token": other_session}).status_code == 401
+    assert client.post("/user/token/refresh", cookies={"refresh_token": refresh_token}).status_code == 403
+
+    new_token, _ = login_user(client, email, "after1234")
+    assert client.get("/user/me", cookies={"access_token": new_token}).status_code == 200
+
+
+def test_removing_a_user_revokes_its_tokens_on_every_worker(client: TestClient, db):
+    user_id, email, password = register_user(client, "removed123")
+    access_token, _ = login_user(client, email, password)
+    claims = decode_claims(access_token)
+
+    response = client.delete(f"/user/{user_id}", cookies={"access_token": access_token})
+    assert response.status_code == 200
+    assert client.get("/user/me", cookies={"access_token": access_token}).status_code == 401
+
+    # A worker that still caches the user as a principal rejects the token once it synced
+    other_worker = TokenRevocationList()
+    other_worker.sync(db)
+    assert other_worker.is_revoked(claims)
+
+
+def test_login_is_rate_limited_per_email_before_hashing(client: TestClient, monkeypatch):
+    _, email, password = register_user(client, "limited123")
+    monkeypatch.setattr(rate_limit_service.settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(rate_limit_service, "login_email_limiter", SlidingWindowLimiter(2, 60))
+    hashes = []
+    monkeypatch.setattr(password_service.password_hasher, "verify", lambda *args: hashes.append(args) or False)
+
+    statuses = [client.post("/user/login", json={"email": email, "password": "wrong123"}).status_code for _ in range(3)]
+
+    assert statuses == [401, 401, 429]
+    assert len(hashes) == 2
+    response = client.post("/user/login", json={"email": email.upper(), "password": password})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
@@ -2,6 +2,10 @@ from faker import Faker
 from coe.services.user_service import create_user, login_user, update_user, remove_user
 from coe.schemas.user import CreateUser, UserLogin, UpdateUser
 from coe.models.user import User
+from coe.schemas.task import CreateTaskRequestSchema, TaskFilters, TaskSort
+from coe.services import task_service
+from coe.utils.cache_utils import InMemoryBackend
+from datetime import date
 
 faker = Faker()
 
@@ -54,3 +58,47 @@ def test_remove_user(db):
     assert deleted is True
 
     assert db.get(User, user.id) is None
+
+
+def test_remove_user_invalidates_cascaded_tasks_in_the_shared_tier(db, monkeypatch):
+    monkeypatch.setattr(task_service.task_cache, "shared", InMemoryBackend())
+    creator, _, _ = create_test_user(db)
+    assignee, _, _ = create_test_user(db)
+    created = task_service.create_task(CreateTaskRequestSchema(name="Cascaded", description="Test", due_date=date(2025, 6, 1)), db, creator)
+    assigned = task_service.create_task(CreateTaskRequestSchema(name="Unassigned", description="Test", due_date=date(2025, 6, 1), assignee_id=assignee.id), db, creator)
+    task_service.task_cache.local.clear()
+    assert task_service.find_task_by_id(created.id, db) is not None
+
+    remove_user(assignee.id, db)
+    assert task_service.find_task_by_id(assigned.id, db)["assignee_id"] is None
+
+    remove_user(creator.id, db)
+    task_service.task_cache.local.clear()
+    assert task_service.find_task_by_id(created.id, db) is None
+
+
+def test_remove_user_clears_cached_task_counts(db):
+    creator, _, _ = create_test_user(db)
+    task_service.create_task(CreateTaskRequestSchema(name="Counted", description="Test", due_date=date(2025, 6, 1)), db, creator)
+    filters, sort = TaskFilters(created_by_id=creator.id), TaskSort()
+    assert task_service.get_tasks_list(db, filters, sort, count_strategy="cached")[1] == 1
+
+    remove_user(creator.id, db)
+    assert task_service.get_tasks_list(db, filters, sort, count_strategy="cached")[1] == 0
+
+
+def test_user_mutations_are_single_statements(db, count_queries):
+    user_data = CreateUser(first_name=faker.first_name(), last_name=faker.last_name(), email=faker.unique.email(), password="testpass")
+    with count_queries() as statements:
+        user = create_user(user_data, db)
+    assert len(statements) == 1
+    assert user.id is not None and user.email == user_data.email
+
+    with count_queries() as statements:
+        assert update_user(user.id, UpdateUser(last_name=faker.last_name()), db) is True
+    assert len(statements) == 1
+
+    with count_queries() as statements:
+        assert remove_user(user.id, db) is True
+        assert remove_user(user.id, db) is False
+    assert len(statements) == 2
@@ -0,0 +1,294 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import threading
+import time
+
+_MISSING = object()
+SWEEP_EVERY = 1024
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after ttl_seconds."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        # Sync routes run on a thread pool, so access has to be serialized
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set_unless(self, key: Hashable, value: Any, keep: Callable[[Any], bool]) -> bool:
+        # Compares and writes under one lock, a live entry for which keep is true stays in place
+        if self.max_size <= 0:
+            return False
+
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic() and keep(entry[1]):
+                return False
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def update(self, key: Hashable, fn: Callable[[Any], Any]):
+        # Replaces a live entry in place, keeping its expiry; missing or expired keys are left alone
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic():
+                self._data[key] = (entry[0], fn(entry[1]))
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data.keys())
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class InMemoryBackend:
+    """Stand-in for a shared backend inside one process, used in tests and single worker setups."""
+
+    def __init__(self):
+        self._data = {}
+        self._incrs = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def set_if_newer(self, key: str, value: bytes, version: int, ttl_seconds: float) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic() and entry_version(entry[1]) > version:
+                return False
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            return True
+
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        with self._lock:
+            now = time.monotonic()
+            self._incrs += 1
+            if self._incrs % SWEEP_EVERY == 0:
+                # Counters are rarely read again once their window is over, so expired ones are swept instead
+                for expired in [k for k, entry in self._data.items() if entry[0] <= now]:
+                    del self._data[expired]
+
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                entry = (now + ttl_seconds, 0)
+            self._data[key] = (entry[0], entry[1] + 1)
+            return entry[1] + 1
+
+# Compares and writes in one step on the server, so a concurrent newer write can't be overwritten in between
+SET_IF_NEWER_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local version = tonumber(string.match(current, '^(%d+)|'))
+    if version and version > tonumber(ARGV[2]) then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+return 1
+"""
+
+class RedisBackend:
+    def __init__(self, url: str):
+        # redis is only needed when a shared cache is configured
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("A redis:// cache URL needs the redis package installed")
+        self.client = redis.Redis.from_url(url)
+        self._set_if_newer = self.client.register_script(SET_IF_NEWER_SCRIPT)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        self.client.set(key, value, px=int(ttl_seconds * 1000))
+
+    def delete(self, key: str):
+        self.client.delete(key)
+
+    def set_if_newer(self, key: str, value: bytes, version: int, ttl_seconds: float) -> bool:
+        return bool(self._set_if_newer(keys=[key], args=[value, version, int(ttl_seconds * 1000)]))
+
+    def incr(self, key: str, ttl_seconds: float) -> int:
+        pipeline = self.client.pipeline()
+        pipeline.incr(key)
+        pipeline.pexpire(key, int(ttl_seconds * 1000))
+        return pipeline.execute()[0]
+
+def versioned(version: int, payload: bytes = b"") -> bytes:
+    # An empty payload is a tombstone left by an invalidation
+    return b"%d|" % version + payload
+
+def entry_version(raw: bytes) -> int:
+    version, _, _ = raw.partition(b"|")
+    return int(version) if version.isdigit() else 0
+
+def create_shared_backend(url: Optional[str]):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+class TieredCache:
+    """TTLCache in front of an optional shared backend that all workers read and invalidate.
+
+    With a version function, entries in both tiers carry the version of their value and a write never replaces
+    a newer one. Invalidations given the version of the write leave a tombstone in both tiers for as long as
+    local entries live, so a reader that loaded a row before the write can't put it back afterwards. Versions
+    have to come from one clock, like the database's, for the comparison to hold across hosts.
+    """
+
+    def __init__(self, local: TTLCache, shared=None, shared_ttl_seconds: float = 0, namespace: str = "",
+                 encode: Callable[[Any], bytes] = None, decode: Callable[[bytes], Any] = None,
+                 version: Callable[[Any], int] = None):
+        self.local = local
+        self.shared = shared
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.namespace = namespace
+        self.encode = encode
+        self.decode = decode
+        self.version = version
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def _shared_call(self, fn: Callable, *args):
+        # An unreachable shared backend degrades to database reads, entries it still holds expire after shared_ttl_seconds
+        try:
+            return fn(*args)
+        except Exception:
+            self.shared_errors += 1
+            return None
+
+    def _set_local(self, key: Hashable, version: int, value: Any):
+        # Local entries are (version, value) pairs, a None value is a tombstone
+        self.local.set_unless(key, (version, value), lambda current: current[0] > version)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING and self.version is not None:
+            value = value[1] if value[1] is not None else _MISSING
+        if value is not _MISSING:
+            return value
+        if self.shared is None:
+            return default
+
+        raw = self._shared_call(self.shared.get, f"{self.namespace}{key}")
+        version = None
+        if raw is not None and self.version is not None:
+            version = entry_version(raw)
+            raw = raw.partition(b"|")[2] or None
+        if raw is None:
+            self.shared_misses += 1
+            return default
+
+        self.shared_hits += 1
+        value = self.decode(raw)
+        if version is None:
+            self.local.set(key, value)
+        else:
+            self._set_local(key, version, value)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.version is None:
+            self.local.set(key, value)
+            if self.shared is not None:
+                self._shared_call(self.shared.set, f"{self.namespace}{key}", self.encode(value), self.shared_ttl_seconds)
+            return
+
+        version = self.version(value)
+        self._set_local(key, version, value)
+        if self.shared is not None:
+            self._shared_call(self.shared.set_if_newer, f"{self.namespace}{key}", versioned(version, self.encode(value)), version, self.shared_ttl_seconds)
+
+    def invalidate(self, key: Hashable, version: Optional[int] = None):
+        if self.version is None or version is None:
+            self.local.invalidate(key)
+            if self.shared is not None:
+                self._shared_call(self.shared.delete, f"{self.namespace}{key}")
+            return
+
+        self._set_local(key, version, None)
+        if self.shared is not None:
+            self._shared_call(self.shared.set_if_newer, f"{self.namespace}{key}", versioned(version), version, self.local.ttl_seconds)
+
+    def clear(self):
+        # Only the local tier, shared entries age out on their own TTL
+        self.local.clear()
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats["hits"] += self.shared_hits
+        stats["misses"] = self.shared_misses if self.shared is not None else stats["misses"]
+        stats.update(shared_hits=self.shared_hits, shared_misses=self.shared_misses, shared_errors=self.shared_errors)
+        return stats
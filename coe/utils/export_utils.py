@@ -0,0 +1,41 @@
+from datetime import date, datetime
+from typing import Iterable, List
+from coe.utils.format_utils import to_camel
+import csv
+import enum
+import io
+import json
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def to_export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def rows_to_ndjson(rows: Iterable, fields: List[str]) -> str:
+    keys = [to_camel(field) for field in fields]
+    return "".join(
+        json.dumps({key: to_export_value(value) for key, value in zip(keys, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+def rows_to_csv(rows: Iterable) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([to_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def export_header(fields: List[str], export_format: str) -> str:
+    return rows_to_csv([[to_camel(field) for field in fields]]) if export_format == "csv" else ""
+
+def serialize_rows(rows: Iterable, fields: List[str], export_format: str) -> str:
+    return rows_to_csv(rows) if export_format == "csv" else rows_to_ndjson(rows, fields)
+
+def export_headers(export_format: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="tasks.{export_format}"'}
@@ -0,0 +1,200 @@
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from coe.db.pool import pool_stats
+import os
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request", ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in database queries per HTTP request", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+db_queries_total = Counter("db_queries_total", "Database queries executed", ["engine"])
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "Database query latency", ["engine"], buckets=LATENCY_BUCKETS
+)
+# Gauges say how the values of several workers combine when PROMETHEUS_MULTIPROC_DIR is set
+startup_duration_seconds = Gauge(
+    "app_startup_duration_seconds", "Time spent in each startup warm-up step", ["step"], multiprocess_mode="max"
+)
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth", "Password hashes waiting for a free hashing process", multiprocess_mode="livesum"
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds", "Time from admitting a password hash or verify to its result", buckets=LATENCY_BUCKETS
+)
+password_hash_rejected_total = Counter(
+    "password_hash_rejected_total", "Password hashes turned away because the queue was full"
+)
+
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+# Set per request by MetricsMiddleware. Threadpool and run_sync calls inherit the context, so they update the same object
+request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+class PoolCollector:
+    def __init__(self):
+        self.engines = {}
+
+    def add(self, name: str, engine: Engine):
+        self.engines[name] = engine
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["engine"])
+        idle = GaugeMetricFamily("db_pool_idle", "Idle connections in the pool", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool_size", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        wait_seconds = CounterMetricFamily("db_pool_wait_seconds", "Time spent waiting for a pooled connection", labels=["engine"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that gave up after pool_timeout", labels=["engine"])
+
+        for name, engine in self.engines.items():
+            # NullPool and StaticPool don't track these
+            if not hasattr(engine.pool, "checkedout"):
+                continue
+            stats = pool_stats(engine)
+            checked_out.add_metric([name], stats["checked_out"])
+            idle.add_metric([name], stats["idle"])
+            overflow.add_metric([name], stats["overflow"])
+            size.add_metric([name], stats["size"])
+            wait_seconds.add_metric([name], stats["wait_seconds_total"])
+            timeouts.add_metric([name], stats["timeouts"])
+
+        return [checked_out, idle, overflow, size, wait_seconds, timeouts]
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+class CacheCollector:
+    def __init__(self):
+        self.caches = {}
+
+    def add(self, name: str, cache):
+        self.caches[name] = cache
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Lookups served from the cache", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Lookups that fell through to the database", labels=["cache"])
+        evictions = CounterMetricFamily("cache_evictions", "Entries dropped to stay within max_size", labels=["cache"])
+        size = GaugeMetricFamily("cache_size", "Entries held by this worker", labels=["cache"])
+        hit_ratio = GaugeMetricFamily("cache_hit_ratio", "Hits over all lookups since start", labels=["cache"])
+
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            lookups = stats["hits"] + stats["misses"]
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            evictions.add_metric([name], stats["evictions"])
+            size.add_metric([name], stats["size"])
+            hit_ratio.add_metric([name], stats["hits"] / lookups if lookups else 0)
+
+        return [hits, misses, evictions, size, hit_ratio]
+
+cache_collector = CacheCollector()
+REGISTRY.register(cache_collector)
+
+def instrument_engine(engine: Engine, name: str):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute, its start time would be left on the connection
+        if context.statement is not None and context.connection is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_queries_total.labels(name).inc()
+        db_query_duration_seconds.labels(name).observe(elapsed)
+
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    pool_collector.add(name, engine)
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+def metrics_registry() -> CollectorRegistry:
+    if not multiprocess_enabled():
+        return REGISTRY
+    # Each worker writes its samples to PROMETHEUS_MULTIPROC_DIR and a scrape merges them, whichever worker answers it
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # Pool and cache figures live in this worker's memory and can't be merged, these describe the worker that answered
+    registry.register(pool_collector)
+    registry.register(cache_collector)
+    return registry
+
+def mark_worker_dead():
+    # Drops the live gauges of a stopping worker, its counters and histograms stay in the totals
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+def get_route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    # Unmatched paths are grouped so that random URLs can't blow up label cardinality
+    return "unmatched"
+
+class MetricsMiddleware:
+    def __init__(self, app, excluded_paths=("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_db_stats.reset(token)
+
+            method = scope["method"]
+            route = get_route_template(scope["app"], scope)
+            http_requests_total.labels(method, route, str(status_code)).inc()
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            http_request_db_queries.labels(method, route).observe(stats.queries)
+            http_request_db_seconds.labels(method, route).observe(stats.seconds)
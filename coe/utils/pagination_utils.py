@@ -0,0 +1,19 @@
+import base64
+import binascii
+import json
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    # Cursors are opaque to clients, so anything that doesn't round-trip is rejected as invalid
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
@@ -0,0 +1,9 @@
+import bcrypt
+
+# Executed inside the hashing worker processes, so this module must stay import-light
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode(), hashed_password.encode())
@@ -0,0 +1,44 @@
+from coe.utils.cache_utils import InMemoryBackend
+import math
+import time
+
+class SlidingWindowLimiter:
+    """Allows limit hits per key in any window_seconds, estimated from the current and the previous fixed window.
+
+    Counters live in the shared backend when there is one, so every worker enforces the same budget.
+    If the backend fails, this worker counts on its own until it is back.
+    """
+
+    def __init__(self, limit: int, window_seconds: float, shared=None, namespace: str = ""):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.shared = shared
+        self.local = InMemoryBackend()
+        self.namespace = namespace
+        self.rejected = 0
+        self.shared_errors = 0
+
+    def _count(self, fn, *args):
+        if self.shared is not None:
+            try:
+                return getattr(self.shared, fn)(*args)
+            except Exception:
+                self.shared_errors += 1
+        return getattr(self.local, fn)(*args)
+
+    def hit(self, key: str) -> int:
+        """Counts a hit and returns 0 if it is allowed, else the seconds to wait before retrying."""
+        if self.limit <= 0:
+            return 0
+
+        position = time.time() / self.window_seconds
+        window = int(position)
+        current = self._count("incr", f"{self.namespace}{key}:{window}", self.window_seconds * 2)
+        previous = int(self._count("get", f"{self.namespace}{key}:{window - 1}") or 0)
+
+        # The previous window counts for the share of it still inside the sliding window
+        if previous * (1 - (position - window)) + current <= self.limit:
+            return 0
+
+        self.rejected += 1
+        return max(1, math.ceil((window + 1 - position) * self.window_seconds))
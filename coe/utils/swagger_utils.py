@@ -1,11 +1,15 @@
+from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
+import hashlib
+import json
+import sys
 
-def custom_openapi():
-    from main import app
-
-    if app.openapi_schema:
-        return app.openapi_schema
+def routes_fingerprint(app: FastAPI) -> str:
+    # Changes whenever a route is added, removed or renamed, so a prebuilt document from another build is not served
+    parts = sorted(f"{','.join(sorted(getattr(route, 'methods', None) or []))} {route.path} {route.name}" for route in app.routes)
+    return hashlib.blake2b("\n".join(parts).encode("utf-8"), digest_size=16).hexdigest()
 
+def build_openapi(app: FastAPI) -> dict:
     openapi_schema = get_openapi(
         title="COE App API Docs",
         version="1.0.0",
@@ -13,7 +17,7 @@ def custom_openapi():
     )
 
     # Define cookie-based authentication
-    openapi_schema["components"]["securitySchemes"] = {
+    openapi_schema.setdefault("components", {})["securitySchemes"] = {
         "CookieAuth": {
             "type": "apiKey",
             "in": "cookie",
@@ -30,5 +34,32 @@ def custom_openapi():
             else:
                 operation.pop("security", None)
 
+    openapi_schema["x-routes-fingerprint"] = routes_fingerprint(app)
+    return openapi_schema
+
+def custom_openapi(app: FastAPI) -> dict:
+    if not app.openapi_schema:
+        app.openapi_schema = build_openapi(app)
+    return app.openapi_schema
+
+def write_openapi(app: FastAPI, path: str):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(build_openapi(app), file, separators=(",", ":"))
+
+def load_openapi(app: FastAPI, path: str) -> bool:
+    try:
+        with open(path, encoding="utf-8") as file:
+            openapi_schema = json.load(file)
+    except (OSError, ValueError):
+        return False
+
+    if openapi_schema.get("x-routes-fingerprint") != routes_fingerprint(app):
+        return False
     app.openapi_schema = openapi_schema
-    return app.openapi_schema
\ No newline at end of file
+    return True
+
+if __name__ == "__main__":
+    # Build step: python -m coe.utils.swagger_utils openapi.json
+    from main import app
+
+    write_openapi(app, sys.argv[1] if len(sys.argv) > 1 else "openapi.json")
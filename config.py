@@ -1,14 +1,9 @@
 import os
-from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 env = os.getenv("ENV", "development")
-if env == "test":
-    load_dotenv(".env.test", override=True)
-else:
-    load_dotenv(".env", override=True)
-
+# Settings reads the env file itself, values already set in the environment take precedence
 env_file_path = ".env.test" if env == "test" else ".env"
 
 class Settings(BaseSettings):
@@ -23,6 +18,63 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int
     refresh_token_expire_minutes: int
     allowed_origins: str
+    db_async_enabled: bool = False
+    db_echo: bool = False
+    # Connections per worker are db_pool_size + db_max_overflow, size them against Postgres max_connections
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    # 0 leaves the server default in place
+    db_statement_timeout_ms: int = 0
+    # PgBouncer in transaction pooling mode drops startup options and can't hold prepared statements
+    db_pgbouncer: bool = False
+    # Authenticated users are cached per worker, the TTL bounds how long other workers see stale data
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_size: int = 10000
+    # 0 sizes the bcrypt process pool to the available cores
+    password_hash_workers: int = 0
+    password_hash_queue_size: int = 64
+    password_hash_retry_after_seconds: int = 1
+    task_count_cache_ttl_seconds: int = 30
+    task_count_cache_max_size: int = 1024
+    task_export_batch_size: int = 1000
+    # Other workers may serve a changed task for up to task_cache_ttl_seconds, set the shared URL to cut that short
+    task_cache_ttl_seconds: int = 5
+    task_cache_max_size: int = 10000
+    # memory:// or redis://, empty disables the shared tier
+    task_cache_shared_url: str = ""
+    task_cache_shared_ttl_seconds: int = 300
+    # Transactions can commit after later ones, sync cursors stay this far behind so late commits are still picked up
+    task_sync_settle_seconds: int = 5
+    # Deletes are kept this long for delta sync, an older cursor has to start over with a full sync
+    task_tombstone_retention_days: int = 30
+    task_tombstone_prune_seconds: int = 3600
+    # Every worker LISTENs for the NOTIFY sent by the tasks trigger, which needs a direct connection rather than PgBouncer
+    task_stream_enabled: bool = True
+    task_stream_heartbeat_seconds: int = 15
+    # A subscriber that falls this far behind is told to resync from /task/changes instead of buffering without bound
+    task_stream_queue_size: int = 1000
+    # Builds the OpenAPI document, opens the pool and loads JWT and bcrypt before the first request instead of during it
+    startup_warmup: bool = True
+    # 0 opens the whole pool
+    db_pool_warm_connections: int = 0
+    # Written at build time by python -m coe.utils.swagger_utils, empty builds the document during startup
+    openapi_schema_path: str = ""
+    # Sized for the revocations live at once, the filter is rebuilt larger if they outgrow it
+    token_revocation_bloom_capacity: int = 100000
+    token_revocation_error_rate: float = 0.001
+    # How soon a logout on one worker is enforced by the others
+    token_revocation_sync_seconds: float = 1
+    # Checked before any password hashing, a limit of 0 turns that limit off
+    rate_limit_enabled: bool = True
+    # redis:// shares the counters between workers, empty and memory:// count per worker process
+    rate_limit_url: str = ""
+    rate_limit_window_seconds: int = 60
+    login_rate_limit_per_ip: int = 30
+    login_rate_limit_per_email: int = 10
+    register_rate_limit_per_ip: int = 10
     model_config = SettingsConfigDict(env_file=env_file_path, extra="allow")
 
     def __init__(self, **kwargs):
@@ -38,5 +90,12 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def async_database_url(self):
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{self.db_password}"
+            f"@{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
 
 settings = Settings()
\ No newline at end of file
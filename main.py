@@ -1,12 +1,43 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from coe.api.routes import router as api_router
+from coe.api.health.routes import router as health_router
 from coe.api.user.routes import router as user_router
 from coe.api.task.routes import router as task_router
+from coe.api.user.async_routes import router as async_user_router
+from coe.api.task.async_routes import router as async_task_router
 from config import settings
 from coe.utils.swagger_utils import custom_openapi
+from coe.services.password_service import PasswordHasherBusyError, password_hasher
+from coe.services.rate_limit_service import RateLimitExceededError, warn_if_counted_per_worker
+from coe.utils.metrics_utils import MetricsMiddleware, mark_worker_dead
+from coe.services.task_stream_service import task_event_hub
+from coe.services.startup_service import run_startup
+from coe.services.token_revocation_service import token_revocations
+from coe.services.tombstone_service import tombstone_pruner
+from contextlib import asynccontextmanager
+from functools import partial
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.startup_warmup:
+        await run_startup(app)
+    warn_if_counted_per_worker()
+    await token_revocations.start()
+    await tombstone_pruner.start()
+    if settings.task_stream_enabled:
+        await task_event_hub.start()
+    try:
+        yield
+    finally:
+        await task_event_hub.stop()
+        await tombstone_pruner.stop()
+        await token_revocations.stop()
+        password_hasher.shutdown()
+        mark_worker_dead()
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,9 +46,33 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(PasswordHasherBusyError)
+def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(RateLimitExceededError)
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many requests, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 app.include_router(api_router)
-app.include_router(user_router)
-app.include_router(task_router)
+app.include_router(health_router)
+
+# Both stacks expose the same API, DB_ASYNC_ENABLED picks the one served
+if settings.db_async_enabled:
+    app.include_router(async_user_router)
+    app.include_router(async_task_router)
+else:
+    app.include_router(user_router)
+    app.include_router(task_router)
 
-app.openapi = custom_openapi
\ No newline at end of file
+app.openapi = partial(custom_openapi, app)
\ No newline at end of file